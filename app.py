@@ -1,8 +1,13 @@
 # app.py
 
 import streamlit as st
+import io
 import os
-from src.core.engine import encrypt, decrypt, encrypt_headerless, decrypt_headerless, encrypt_steganography, decrypt_steganography
+import tempfile
+import threading
+import time
+import weakref
+from src.core.engine import encrypt, decrypt, encrypt_headerless, decrypt_headerless, encrypt_steganography, decrypt_steganography, load_codebook, encrypt_stream, decrypt_stream
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(
@@ -11,13 +16,137 @@ st.set_page_config(
     layout="centered"
 )
 
-# --- Daftar Tema/Codebook ---
 THEME_DIR = "data"
-try:
-    # Cari semua file .json di dalam direktori data
-    AVAILABLE_THEMES = [f for f in os.listdir(THEME_DIR) if f.endswith('.json')]
-except FileNotFoundError:
-    AVAILABLE_THEMES = []
+MODE_LABELS = {
+    "Standar (Dengan Header)": "standard",
+    "Headerless (Tanpa Header, Trade-Off)": "headerless",
+    "Steganografi (Tanpa Header, Akurat)": "steganography",
+}
+CIPHER_FUNCTIONS = {
+    ("encrypt", "standard"): encrypt,
+    ("decrypt", "standard"): decrypt,
+    ("encrypt", "headerless"): encrypt_headerless,
+    ("decrypt", "headerless"): decrypt_headerless,
+    ("encrypt", "steganography"): encrypt_steganography,
+    ("decrypt", "steganography"): decrypt_steganography,
+}
+# Jeda antar-rerun saat memantau pekerjaan file di latar belakang.
+POLL_INTERVAL = 0.5
+
+# --- Cache (bertahan antar-rerun dan antar-sesi) ---
+@st.cache_data(ttl=30, show_spinner=False)
+def list_themes(theme_dir):
+    """Daftar tema .json; disimpan sebentar agar tidak memanggil os.listdir di setiap rerun."""
+    try:
+        return sorted(f for f in os.listdir(theme_dir) if f.endswith('.json'))
+    except FileNotFoundError:
+        return []
+
+def theme_version(theme_path):
+    """mtime tema ikut menjadi kunci cache, sehingga tema yang diubah dimuat ulang."""
+    try:
+        return os.stat(theme_path).st_mtime_ns
+    except OSError:
+        return None
+
+@st.cache_resource(max_entries=8, show_spinner="Memuat codebook...")
+def get_codebook(theme_path, mtime_ns):
+    return load_codebook(theme_path)
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def run_cipher(direction, mode, text, key, theme_path, mtime_ns):
+    """Hasil untuk input yang sama (teks, kunci, mode, versi tema) diambil dari cache."""
+    return CIPHER_FUNCTIONS[(direction, mode)](text, key, get_codebook(theme_path, mtime_ns))
+
+# --- Pekerjaan File di Latar Belakang ---
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class FileJob:
+    """
+    Memproses file unggahan per potongan (format stream) di thread terpisah,
+    menulis hasil ke file sementara, dan mencatat progres untuk ditampilkan.
+    File sementara (bisa berisi plaintext) dihapus setelah hasilnya dibaca,
+    saat pekerjaan gagal/dibatalkan, atau saat objeknya dibuang bersama sesi.
+    """
+
+    def __init__(self, direction, data, name, key, codebook, headerless):
+        self.direction = direction
+        self.name = name
+        self.total = len(data)
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.error = None
+        self.cancelled = False
+        fd, self.output_path = tempfile.mkstemp(prefix="wayang_", suffix=".txt")
+        os.close(fd)
+        self._output = None
+        self._cleanup = weakref.finalize(self, _remove_file, self.output_path)
+        self._source = io.BytesIO(data)
+        self._args = (key, codebook, headerless)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        key, codebook, headerless = self._args
+        stream_func = encrypt_stream if self.direction == "encrypt" else decrypt_stream
+        reader = io.TextIOWrapper(self._source, encoding='utf-8', newline='')
+        try:
+            with open(self.output_path, 'w', encoding='utf-8', newline='') as writer:
+                for piece in stream_func(reader, key, codebook, headerless=headerless):
+                    writer.write(piece)
+                    # Posisi buffer mentah: perkiraan byte input yang sudah dibaca.
+                    self.bytes_done = self._source.tell()
+                    if self.cancelled:
+                        raise RuntimeError("Dibatalkan oleh pengguna.")
+            self.bytes_done = self.total
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            # Hasil parsial dari pekerjaan yang gagal atau dibatalkan tidak disimpan.
+            if self.error or self.cancelled:
+                _remove_file(self.output_path)
+            self.finished = time.monotonic()
+
+    @property
+    def running(self):
+        return self.finished is None
+
+    @property
+    def progress(self):
+        return min(1.0, self.bytes_done / self.total) if self.total else 1.0
+
+    @property
+    def throughput(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def read_output(self):
+        """Membaca hasil sekali, lalu menghapus file sementaranya."""
+        if self._output is None:
+            with open(self.output_path, 'rb') as f:
+                self._output = f.read()
+            self._cleanup()
+        return self._output
+
+    def discard(self):
+        self.cancelled = True
+        self._output = None
+        self._cleanup()
+
+def format_size(num_bytes):
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+# --- Daftar Tema/Codebook ---
+AVAILABLE_THEMES = list_themes(THEME_DIR)
 
 # --- Tampilan Antarmuka (UI) ---
 st.title("📜 Enkripsi Puitis")
@@ -29,10 +158,8 @@ st.image("https://avatars.githubusercontent.com/u/234149534?", caption="Seni Enk
 # --- Sidebar untuk Kontrol ---
 st.sidebar.header("⚙️ Pengaturan")
 
-mode = st.sidebar.selectbox(
-    "Pilih Mode Enkripsi:",
-    ("Standar (Dengan Header)", "Headerless (Tanpa Header, Trade-Off)", "Steganografi (Tanpa Header, Akurat)")
-)
+mode_label = st.sidebar.selectbox("Pilih Mode Enkripsi:", tuple(MODE_LABELS))
+mode = MODE_LABELS[mode_label]
 
 key = st.sidebar.text_input("Masukkan Kunci Enkripsi:", placeholder="Contoh: RAHASIA")
 
@@ -49,42 +176,71 @@ else:
 
 # --- Area Input dan Tombol Aksi ---
 st.header("Masukkan Teks Anda")
-text_input = st.text_area("Plaintext atau Ciphertext Puitis", height=200, placeholder="Ketik atau tempel teks di sini...")
+tab_text, tab_file = st.tabs(["✍️ Teks", "📁 File Besar"])
 
-col1, col2 = st.columns(2)
+with tab_text:
+    text_input = st.text_area("Plaintext atau Ciphertext Puitis", height=200, placeholder="Ketik atau tempel teks di sini...")
 
-with col1:
-    if st.button("🔐 Enkripsi", use_container_width=True):
-        if not text_input or not key or not selected_theme:
-            st.error("Harap isi semua kolom: Teks, Kunci, dan pilih Tema.")
-        else:
-            try:
-                with st.spinner("Merangkai kata menjadi rahasia..."):
-                    if mode == "Standar (Dengan Header)":
-                        result = encrypt(text_input, key, theme_path)
-                    elif mode == "Headerless (Tanpa Header, Trade-Off)":
-                        result = encrypt_headerless(text_input, key, theme_path)
-                    else: # Steganografi
-                        result = encrypt_steganography(text_input, key, theme_path)
-                st.success("Enkripsi Berhasil!")
-                st.text_area("Hasil Ciphertext Puitis:", value=result, height=300)
-            except Exception as e:
-                st.error(f"Terjadi kesalahan saat enkripsi: {e}")
-
-with col2:
-    if st.button("🔓 Dekripsi", use_container_width=True):
-        if not text_input or not key or not selected_theme:
-            st.error("Harap isi semua kolom: Teks, Kunci, dan pilih Tema.")
+    col1, col2 = st.columns(2)
+    actions = (
+        (col1, "🔐 Enkripsi", "encrypt", "Merangkai kata menjadi rahasia...", "Enkripsi Berhasil!", "Hasil Ciphertext Puitis:", "enkripsi"),
+        (col2, "🔓 Dekripsi", "decrypt", "Mengungkap rahasia dari kata...", "Dekripsi Berhasil!", "Hasil Plaintext Asli:", "dekripsi"),
+    )
+    for column, button_label, direction, spinner_text, success_text, result_label, action_name in actions:
+        with column:
+            if st.button(button_label, use_container_width=True):
+                if not text_input or not key or not selected_theme:
+                    st.error("Harap isi semua kolom: Teks, Kunci, dan pilih Tema.")
+                else:
+                    try:
+                        with st.spinner(spinner_text):
+                            result = run_cipher(direction, mode, text_input, key, theme_path, theme_version(theme_path))
+                        st.success(success_text)
+                        st.text_area(result_label, value=result, height=300)
+                    except Exception as e:
+                        st.error(f"Terjadi kesalahan saat {action_name}: {e}")
+
+with tab_file:
+    st.write("File diproses per potongan di latar belakang dalam format stream (sama dengan `main.py --stream`), "
+             "sehingga halaman tetap responsif dan hasilnya diunduh sebagai file.")
+    uploaded = st.file_uploader("Pilih file teks (UTF-8)", type=None)
+    job = st.session_state.get("file_job")
+
+    if mode == "steganography":
+        st.warning("Mode stream belum mendukung Steganografi. Pilih mode Standar atau Headerless untuk file besar.")
+    elif job is None or not job.running:
+        col1, col2 = st.columns(2)
+        direction = None
+        with col1:
+            if st.button("🔐 Enkripsi File", use_container_width=True):
+                direction = "encrypt"
+        with col2:
+            if st.button("🔓 Dekripsi File", use_container_width=True):
+                direction = "decrypt"
+        if direction:
+            if uploaded is None or not key or not selected_theme:
+                st.error("Harap pilih file, isi Kunci, dan pilih Tema.")
+            else:
+                if job is not None:
+                    job.discard()
+                codebook = get_codebook(theme_path, theme_version(theme_path))
+                job = FileJob(direction, uploaded.getvalue(), uploaded.name, key, codebook, mode == "headerless")
+                st.session_state["file_job"] = job
+
+    if job is not None:
+        verb = "Enkripsi" if job.direction == "encrypt" else "Dekripsi"
+        st.progress(job.progress, text=f"{verb} '{job.name}': {format_size(job.bytes_done)} / "
+                                       f"{format_size(job.total)} ({format_size(job.throughput)}/detik)")
+        if job.running:
+            if st.button("⏹️ Batalkan"):
+                job.cancelled = True
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+        elif job.error:
+            st.error(f"Terjadi kesalahan saat memproses file: {job.error}")
         else:
-            try:
-                with st.spinner("Mengungkap rahasia dari kata..."):
-                    if mode == "Standar (Dengan Header)":
-                        result = decrypt(text_input, key, theme_path)
-                    elif mode == "Headerless (Tanpa Header, Trade-Off)":
-                        result = decrypt_headerless(text_input, key, theme_path)
-                    else: # Steganografi
-                        result = decrypt_steganography(text_input, key, theme_path)
-                st.success("Dekripsi Berhasil!")
-                st.text_area("Hasil Plaintext Asli:", value=result, height=300)
-            except Exception as e:
-                st.error(f"Terjadi kesalahan saat dekripsi: {e}")
\ No newline at end of file
+            st.success(f"{verb} selesai dalam {job.finished - job.started:.1f} detik.")
+            base, _ = os.path.splitext(job.name)
+            st.download_button("⬇️ Unduh Hasil", data=job.read_output(),
+                               file_name=f"{base}.{'puisi' if job.direction == 'encrypt' else 'asli'}.txt",
+                               mime="text/plain", use_container_width=True)
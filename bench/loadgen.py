@@ -0,0 +1,142 @@
+# bench/loadgen.py
+
+import argparse
+import asyncio
+import json
+import time
+
+# Pembangkit beban lokal untuk `main.py serve`. Setiap koneksi mengirim
+# beberapa request sekaligus (pipelining) lalu membaca responsnya berurutan.
+#   python bench/loadgen.py --port 8765 -c 8 --depth 4 --duration 10
+#   python bench/loadgen.py --unix /tmp/wayang.sock --mode steganography
+
+DEFAULT_TEXT = "Pada suatu hari, Raja Jawa membeli 12 ekor ayam! Lalu pulang dengan gembira."
+
+def _build_request(host, path, payload):
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n")
+    return head.encode('ascii') + body
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Koneksi ditutup oleh server.")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def _connection(open_connection, request, depth, deadline, max_requests, latencies, counts):
+    reader, writer = await open_connection()
+    try:
+        while time.perf_counter() < deadline and (max_requests is None or counts["sent"] < max_requests):
+            batch = depth if max_requests is None else min(depth, max_requests - counts["sent"])
+            counts["sent"] += batch
+            started = time.perf_counter()
+            writer.write(request * batch)
+            await writer.drain()
+            for _ in range(batch):
+                status, _ = await _read_response(reader)
+                latencies.append(time.perf_counter() - started)
+                counts["ok" if status == 200 else "error"] += 1
+    finally:
+        writer.close()
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, connections=8, depth=4, duration=5.0,
+                   max_requests=None, direction="encrypt", mode="standard", theme=None, text=DEFAULT_TEXT, key="RAHASIA"):
+    """
+    Menjalankan beban dan mengembalikan ringkasan: jumlah request, request/detik
+    dan latensi p50/p90/p99/maks (dalam ms, dihitung dari saat batch dikirim).
+    """
+    payload = {"text": text, "key": key, "mode": mode}
+    if theme:
+        payload["theme"] = theme
+    if direction == "decrypt":
+        # Siapkan ciphertext yang valid lewat server itu sendiri.
+        payload["text"] = await _fetch_ciphertext(host, port, unix_path, payload)
+    request = _build_request(host, f"/{direction}", payload)
+
+    def open_connection():
+        if unix_path:
+            return asyncio.open_unix_connection(unix_path)
+        return asyncio.open_connection(host, port)
+
+    latencies = []
+    counts = {"sent": 0, "ok": 0, "error": 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _connection(open_connection, request, depth, deadline, max_requests, latencies, counts)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))] * 1e3
+
+    return {
+        "requests": counts["ok"] + counts["error"],
+        "errors": counts["error"],
+        "elapsed_s": elapsed,
+        "requests_per_s": (counts["ok"] + counts["error"]) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1e3 if latencies else None,
+    }
+
+async def _fetch_ciphertext(host, port, unix_path, payload):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(_build_request(host, "/encrypt", payload))
+        await writer.drain()
+        status, body = await _read_response(reader)
+        if status != 200:
+            raise RuntimeError(f"Gagal menyiapkan ciphertext: {body.decode('utf-8', 'replace')}")
+        return json.loads(body)["result"]
+    finally:
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pembangkit beban untuk layanan Wayang Cipher.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', type=str, help="Path Unix socket (menggantikan TCP).")
+    parser.add_argument('-c', '--connections', type=int, default=8, help="Jumlah koneksi paralel (default: 8).")
+    parser.add_argument('--depth', type=int, default=4, help="Request yang dipipeline per koneksi (default: 4).")
+    parser.add_argument('--duration', type=float, default=5.0, help="Durasi dalam detik (default: 5).")
+    parser.add_argument('-n', '--requests', type=int, help="(Opsional) Berhenti setelah sejumlah request.")
+    parser.add_argument('--direction', choices=['encrypt', 'decrypt'], default='encrypt')
+    parser.add_argument('--mode', choices=['standard', 'headerless', 'steganography'], default='standard')
+    parser.add_argument('--theme', type=str, help="Nama tema (default: tema bawaan server).")
+    parser.add_argument('--size', type=int, help="Panjang teks uji dalam karakter (default: satu kalimat).")
+    args = parser.parse_args()
+
+    text = DEFAULT_TEXT
+    if args.size:
+        text = (DEFAULT_TEXT * (args.size // len(DEFAULT_TEXT) + 1))[:args.size]
+    if args.mode == 'headerless':
+        text = "".join(c for c in text if c.isalpha())
+        text = text[:len(text) - len(text) % 2]
+    summary = asyncio.run(run_load(args.host, args.port, args.unix, args.connections, args.depth, args.duration,
+                                   args.requests, args.direction, args.mode, args.theme, text))
+    print(f"{summary['requests']} request ({summary['errors']} gagal) dalam {summary['elapsed_s']:.2f} detik: "
+          f"{summary['requests_per_s']:.1f} req/detik")
+    print(f"latensi p50 {summary['p50_ms']:.2f} ms  p90 {summary['p90_ms']:.2f} ms  "
+          f"p99 {summary['p99_ms']:.2f} ms  maks {summary['max_ms']:.2f} ms")
+
+if __name__ == '__main__':
+    main()
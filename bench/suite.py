@@ -0,0 +1,261 @@
+# bench/suite.py
+
+import gc
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+from src.core.backends import DEFAULT_BACKEND
+from src.core.header import pack_header
+from src.core.wcb import CompiledCodebook
+from src.core.engine import (
+    Codebook,
+    MappedCodebook,
+    compile_theme,
+    load_codebook,
+    core_encrypt,
+    core_decrypt,
+    vigenere_process,
+    encrypt,
+    decrypt,
+    encrypt_headerless,
+    decrypt_headerless,
+    encrypt_steganography,
+    decrypt_steganography,
+    _bytes_to_zero_width,
+    _split_zero_width_payload
+)
+
+THEME_DIR = "data"
+DEFAULT_BASELINE_PATH = os.path.join("bench", "baseline.json")
+# 100 B sampai 100 MB; ukuran di atas --max-size dilewati.
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+DEFAULT_MAX_SIZE = 1_000_000
+DEFAULT_TOLERANCE = 0.25
+BENCH_KEY = "RAHASIA"
+
+TARGETS = [
+    'encrypt_standard', 'decrypt_standard',
+    'encrypt_headerless', 'decrypt_headerless',
+    'encrypt_steganography', 'decrypt_steganography',
+    'core_encrypt', 'core_decrypt', 'vigenere_process',
+    'stego_encode', 'stego_decode', 'theme_load', 'theme_load_compiled',
+]
+
+# Setiap pengukuran diulang sampai total waktunya melewati anggaran ini
+# (dengan batas jumlah ulangan), agar p99 tetap bermakna di ukuran kecil.
+TIME_BUDGET = 0.5
+MIN_RUNS = 3
+MAX_RUNS = 200
+
+_WORDS = ("Pada suatu hari Raja Jawa berjalan ke pasar membeli ayam dan telur "
+          "lalu pulang dengan gembira karena semua orang tersenyum").split()
+_PUNCTUATION = [" ", " ", " ", " ", ", ", ". ", "! ", " 12 ", "\n"]
+
+def make_text(size, seed=0):
+    """Prosa sintetis deterministik sepanjang `size` karakter (huruf, kapital, angka, tanda baca)."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        if rng.random() < 0.1:
+            word = word.capitalize()
+        sep = rng.choice(_PUNCTUATION)
+        parts.append(word + sep)
+        length += len(word) + len(sep)
+    return "".join(parts)[:size]
+
+def list_themes(theme_dir=THEME_DIR):
+    return sorted(os.path.join(theme_dir, f) for f in os.listdir(theme_dir) if f.endswith('.json'))
+
+def _prepare(target, theme_path, size):
+    """Mengembalikan fungsi tanpa argumen yang mengerjakan satu ulangan target."""
+    codebook = load_codebook(theme_path)
+    text = make_text(size)
+    if target == 'theme_load':
+        return lambda: Codebook.from_file(theme_path)
+    if target == 'theme_load_compiled':
+        wcb_path = os.path.join(tempfile.gettempdir(), os.path.basename(theme_path) + ".bench.wcb")
+        compile_theme(theme_path, wcb_path)
+        return lambda: MappedCodebook(CompiledCodebook(wcb_path))
+    if target == 'vigenere_process':
+        letters = "".join(c for c in text.upper() if c.isalpha())
+        return lambda: vigenere_process(letters, BENCH_KEY, 'encrypt')
+    if target == 'core_encrypt':
+        return lambda: core_encrypt(text, BENCH_KEY, codebook)
+    if target == 'core_decrypt':
+        poem, header_obj = core_encrypt(text, BENCH_KEY, codebook)
+        return lambda: core_decrypt(poem, BENCH_KEY, codebook, header_obj)
+    if target == 'stego_encode':
+        payload = pack_header(core_encrypt(text, BENCH_KEY, codebook)[1])
+        return lambda: _bytes_to_zero_width(payload)
+    if target == 'stego_decode':
+        stego = encrypt_steganography(text, BENCH_KEY, codebook)
+        return lambda: _split_zero_width_payload(stego)
+    if target.endswith('headerless'):
+        # Mode headerless hanya menerima huruf dengan jumlah genap.
+        text = "".join(c for c in text if c.isalpha())
+        text = text[:len(text) - len(text) % 2]
+    encrypt_func, decrypt_func = {
+        'standard': (encrypt, decrypt),
+        'headerless': (encrypt_headerless, decrypt_headerless),
+        'steganography': (encrypt_steganography, decrypt_steganography),
+    }[target.split('_', 1)[1]]
+    if target.startswith('encrypt_'):
+        return lambda: encrypt_func(text, BENCH_KEY, codebook)
+    ciphertext = encrypt_func(text, BENCH_KEY, codebook)
+    return lambda: decrypt_func(ciphertext, BENCH_KEY, codebook)
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(func, size, time_budget=TIME_BUDGET):
+    """Mengukur latensi (p50/p99), throughput, dan puncak memori tracemalloc satu fungsi."""
+    gc.collect()
+    timings = []
+    spent = 0.0
+    while len(timings) < MIN_RUNS or (spent < time_budget and len(timings) < MAX_RUNS):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        spent += elapsed
+    timings.sort()
+
+    # Puncak memori diukur terpisah karena tracemalloc memperlambat eksekusi.
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50 = _percentile(timings, 0.50)
+    return {
+        "runs": len(timings),
+        "p50_ms": p50 * 1e3,
+        "p99_ms": _percentile(timings, 0.99) * 1e3,
+        "throughput_mb_s": (size / 1e6) / p50 if size and p50 > 0 else None,
+        "peak_kb": peak / 1024,
+    }
+
+def run_suite(sizes=None, themes=None, targets=None, time_budget=TIME_BUDGET, progress=None):
+    """Menjalankan semua kombinasi target x tema x ukuran; mengembalikan dict hasil."""
+    sizes = sizes or [s for s in SIZES if s <= DEFAULT_MAX_SIZE]
+    themes = themes or list_themes()
+    targets = targets or TARGETS
+    results = {}
+    for theme_path in themes:
+        theme_name = os.path.splitext(os.path.basename(theme_path))[0]
+        for target in targets:
+            # Memuat tema tidak bergantung pada ukuran input.
+            for size in ([0] if target.startswith('theme_load') else sizes):
+                func = _prepare(target, theme_path, size)
+                result = measure(func, size, time_budget)
+                name = f"{target}|{theme_name}|{size}"
+                results[name] = result
+                if progress:
+                    progress(name, result)
+                del func
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": DEFAULT_BACKEND,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Membandingkan hasil dengan baseline. Mengembalikan daftar regresi berupa
+    (nama, metrik, nilai baseline, nilai sekarang) untuk p50 dan puncak memori
+    yang naik lebih dari `tolerance`.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "peak_kb"):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((name, metric, previous[metric], current[metric]))
+    return regressions
+
+def load_baseline(path=DEFAULT_BASELINE_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_report(report, path=DEFAULT_BASELINE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def format_result(name, result):
+    throughput = result["throughput_mb_s"]
+    throughput_str = f"{throughput:9.2f} MB/s" if throughput is not None else "         -     "
+    return (f"{name:<55} {throughput_str}  p50 {result['p50_ms']:10.3f} ms  "
+            f"p99 {result['p99_ms']:10.3f} ms  peak {result['peak_kb']:12.1f} KB")
+
+# --- SKALA PARALEL (SATU PESAN BESAR) ---
+SCALING_SIZE = 20_000_000
+SCALING_REPEATS = 3
+SCALING_THEME = os.path.join(THEME_DIR, "parikan_jowo_final.json")
+
+def run_scaling(size=SCALING_SIZE, max_workers=None, modes=('standard',), theme_path=SCALING_THEME,
+                repeats=SCALING_REPEATS, progress=None):
+    """
+    Mengukur enkripsi/dekripsi satu pesan `size` karakter dengan workers 1 sampai
+    `max_workers` (default: jumlah core), median dari `repeats` ulangan. Output
+    setiap jumlah worker dibandingkan dengan output workers=1 ("identical").
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    codebook = load_codebook(theme_path)
+    text = make_text(size)
+    results = []
+    for mode in modes:
+        encrypt_func, decrypt_func = {
+            'standard': (encrypt, decrypt),
+            'steganography': (encrypt_steganography, decrypt_steganography),
+        }[mode]
+        ciphertext = encrypt_func(text, BENCH_KEY, codebook)
+        for direction, func, source in (('encrypt', encrypt_func, text), ('decrypt', decrypt_func, ciphertext)):
+            serial_seconds = expected = None
+            for workers in range(1, max_workers + 1):
+                timings = []
+                for _ in range(repeats):
+                    gc.collect()
+                    start = time.perf_counter()
+                    output = func(source, BENCH_KEY, codebook, workers=workers)
+                    timings.append(time.perf_counter() - start)
+                seconds = sorted(timings)[len(timings) // 2]
+                if expected is None:
+                    serial_seconds, expected = seconds, output
+                result = {
+                    "mode": mode,
+                    "direction": direction,
+                    "workers": workers,
+                    "seconds": seconds,
+                    "throughput_mb_s": size / 1e6 / seconds,
+                    "speedup": serial_seconds / seconds,
+                    "identical": output == expected,
+                }
+                del output
+                results.append(result)
+                if progress:
+                    progress(result)
+    return results
+
+def format_scaling(result):
+    return (f"{result['mode']:<14} {result['direction']:<8} {result['workers']:>3} worker  "
+            f"{result['seconds'] * 1e3:10.1f} ms  {result['throughput_mb_s']:7.2f} MB/s  "
+            f"x{result['speedup']:.2f}{'' if result['identical'] else '  [BEDA DARI SERIAL]'}")
@@ -1,113 +1,312 @@
+import argparse
+import bisect
+import glob
 import json
 import random
 import os
+import string
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from operator import itemgetter
 
-def generate_final_codebook():
+VOCABS = {
+    'benda': {
+        'an': ['udan', 'wulan', 'dalan', 'pangan', 'kancan', 'taman', 'papan', 'kahanan', 'tekanan', 'lamunan', 'katresnan'],
+        'i': ['ati', 'bumi', 'wengi', 'geni', 'meri', 'janji', 'bukti', 'pati', 'sandhing', 'suci', 'sepi'],
+        'o': ['roso', 'tresno', 'loro', 'dongo', 'songo', 'werno', 'asmoro', 'karyo', 'bodho', 'rekoso'],
+        'u': ['banyu', 'watu', 'sliramu', 'nesu', 'turu', 'awakmu', 'wektumu', 'rasamu', 'pilu', 'rindu'],
+        'ung': ['gunung', 'suwung', 'gandrung', 'wurung', 'agung', 'bingung', 'jantung', 'sarung'],
+        'ing': ['wening', 'bening', 'sanding', 'kuning', 'pusing', 'miring', 'keping', 'garing']
+    },
+    'sifat': {
+        'an': ['terang', 'tenan', 'nyaman', 'edan', 'kasmaran', 'tentrem', 'nelongso'],
+        'i': ['wangi', 'pesti', 'gemati', 'lathi', 'prasetyaji', 'sepi', 'suci'],
+        'o': ['ijo', 'tuwo', 'gelo', 'rumongso', 'prasojo', 'loro', 'bodho'],
+        'u': ['ayu', 'kudu', 'bingung', 'pilu', 'kelu', 'saru', 'rindu'],
+        'ar': ['anyar', 'sabar', 'kasar', 'bubar', 'jembar', 'sumebar'],
+        'ur': ['luhur', 'akur', 'makmur', 'campur', 'mujur', 'hancur']
+    },
+    'kriya': {
+        'an': ['kelingan', 'bebarengan', 'pamitan', 'perangan', 'goyangan'],
+        'i': ['ngenteni', 'nggoleki', 'ngrasani', 'ngajeni', 'ngugemi', 'ngobati'],
+        'o': ['lungo', 'moco', 'ngomong', 'kerjo', 'nrimo', 'nyoto'],
+        'u': ['mlaku', 'ngguyu', 'sinau', 'nesu', 'nyawiji', 'ngganggu']
+    }
+}
+TEMPLATES = [
+    "Rembulane katon {sifat}", "Kembang {benda} ing pinggir dalan", "Angin wengi nggowo {benda}",
+    "Rasane {sifat} ing njero ati", "Urip iku kudu {sifat}", "Ojo seneng gawe {sifat}",
+    "Yen {kriya} ojo lali wektu", "Isuk-isuk wes {kriya}", "Ngenteni tekane {benda}",
+    "Sliramu katon luwih {sifat}", "Swara {benda} ing wayah wengi", "Ayo {kriya} kanthi temenan",
+    "Langite katon {sifat}", "Tansah eling marang {benda}", "Golek {benda} tekan {benda}",
+    "Ati {sifat} amergo {benda}", "Kudu {kriya} ben ora {sifat}"
+]
+# Template tiga dan empat slot, hanya dipakai jika TEMPLATES tidak cukup untuk
+# codebook yang diminta (trigram: 17.576 frasa, 4-gram: 456.976 frasa), agar
+# codebook bigram tetap berisi frasa pendek.
+LARGE_TEMPLATES = [
+    "Yen {kriya} karo {benda} mesthi {sifat}", "Ati {sifat} amergo {benda}, {kriya} tekan {benda}"
+]
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DEFAULT_OUTPUT = os.path.join("data", "parikan_jowo_final.json")
+
+# Mulai ukuran target ini, penguraian indeks -> frasa dibagi ke semua core.
+PARALLEL_THRESHOLD = 10_000
+
+def _unique_words(category):
+    return list(dict.fromkeys(word for words in category.values() for word in words))
+
+def build_space(templates=TEMPLATES, vocabs=VOCABS):
     """
-    Menghasilkan codebook lengkap 676 bi-gram dengan metode pra-generasi
-    untuk menjamin keunikan dan mencegah proses macet.
+    Ruang kombinatorial semua frasa: per template satu entri (indeks awal,
+    string format posisional, daftar kata per slot, jumlah kombinasi).
+    Tidak ada frasa yang dibuat di sini.
     """
-    print("--- Memulai Proses Pembuatan Codebook (Versi Definitif) ---")
-    
-    vocabs = {
-        'benda': {
-            'an': ['udan', 'wulan', 'dalan', 'pangan', 'kancan', 'taman', 'papan', 'kahanan', 'tekanan', 'lamunan', 'katresnan'],
-            'i': ['ati', 'bumi', 'wengi', 'geni', 'meri', 'janji', 'bukti', 'pati', 'sandhing', 'suci', 'sepi'],
-            'o': ['roso', 'tresno', 'loro', 'dongo', 'songo', 'werno', 'asmoro', 'karyo', 'bodho', 'rekoso'],
-            'u': ['banyu', 'watu', 'sliramu', 'nesu', 'turu', 'awakmu', 'wektumu', 'rasamu', 'pilu', 'rindu'],
-            'ung': ['gunung', 'suwung', 'gandrung', 'wurung', 'agung', 'bingung', 'jantung', 'sarung'],
-            'ing': ['wening', 'bening', 'sanding', 'kuning', 'pusing', 'miring', 'keping', 'garing']
-        },
-        'sifat': {
-            'an': ['terang', 'tenan', 'nyaman', 'edan', 'kasmaran', 'tentrem', 'nelongso'],
-            'i': ['wangi', 'pesti', 'gemati', 'lathi', 'prasetyaji', 'sepi', 'suci'],
-            'o': ['ijo', 'tuwo', 'gelo', 'rumongso', 'prasojo', 'loro', 'bodho'],
-            'u': ['ayu', 'kudu', 'bingung', 'pilu', 'kelu', 'saru', 'rindu'],
-            'ar': ['anyar', 'sabar', 'kasar', 'bubar', 'jembar', 'sumebar'],
-            'ur': ['luhur', 'akur', 'makmur', 'campur', 'mujur', 'hancur']
-        },
-        'kriya': {
-            'an': ['kelingan', 'bebarengan', 'pamitan', 'perangan', 'goyangan'],
-            'i': ['ngenteni', 'nggoleki', 'ngrasani', 'ngajeni', 'ngugemi', 'ngobati'],
-            'o': ['lungo', 'moco', 'ngomong', 'kerjo', 'nrimo', 'nyoto'],
-            'u': ['mlaku', 'ngguyu', 'sinau', 'nesu', 'nyawiji', 'ngganggu']
-        }
-    }
-    templates = [
-        "Rembulane katon {sifat}", "Kembang {benda} ing pinggir dalan", "Angin wengi nggowo {benda}",
-        "Rasane {sifat} ing njero ati", "Urip iku kudu {sifat}", "Ojo seneng gawe {sifat}",
-        "Yen {kriya} ojo lali wektu", "Isuk-isuk wes {kriya}", "Ngenteni tekane {benda}",
-        "Sliramu katon luwih {sifat}", "Swara {benda} ing wayah wengi", "Ayo {kriya} kanthi temenan",
-        "Langite katon {sifat}", "Tansah eling marang {benda}", "Golek {benda} tekan {benda}",
-        "Ati {sifat} amergo {benda}", "Kudu {kriya} ben ora {sifat}"
-    ]
-    
-    # 1. Pra-generasi semua kemungkinan frasa unik
-    print("[INFO] Membuat semua kemungkinan kombinasi frasa...")
-    unique_phrases = set()
+    formatter = string.Formatter()
+    space = []
+    start = 0
     for template in templates:
-        placeholders = [ph[1:-1] for ph in template.split() if ph.startswith('{') and ph.endswith('}')]
-        
-        # Ini adalah loop kombinatorial headerless untuk mengisi placeholder
-        # Untuk 1 placeholder
-        if len(placeholders) == 1:
-            cat = placeholders[0]
-            for rhyme_group in vocabs[cat].values():
-                for word in rhyme_group:
-                    unique_phrases.add(template.format(**{cat: word}))
-        # Untuk 2 placeholder
-        elif len(placeholders) == 2:
-            cat1, cat2 = placeholders[0], placeholders[1]
-            for rhyme_group1 in vocabs[cat1].values():
-                for word1 in rhyme_group1:
-                    for rhyme_group2 in vocabs[cat2].values():
-                        for word2 in rhyme_group2:
-                            if word1 != word2: # Pastikan kata tidak sama
-                                unique_phrases.add(template.format(**{cat1: word1, cat2: word2}))
-
-    print(f"[INFO] Ditemukan {len(unique_phrases)} total frasa unik yang bisa dibuat.")
-
-    # 2. Periksa Kecukupan
-    if len(unique_phrases) < 676:
-        print(f"\n[ERROR] Kosakata tidak cukup! Hanya bisa membuat {len(unique_phrases)} frasa unik, butuh 676.")
-        return
-
-    # 3. Acak dan Tugaskan
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    bigrams = [a + b for a in alphabet for b in alphabet]
-    
-    shuffled_phrases = list(unique_phrases)
-    random.shuffle(shuffled_phrases)
-    
+        parts, slots = [], []
+        for literal, field, _, _ in formatter.parse(template):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is not None:
+                parts.append("{}")
+                slots.append(_unique_words(vocabs[field]))
+        count = 1
+        for words in slots:
+            count *= len(words)
+        space.append((start, "".join(parts), slots, count))
+        start += count
+    return space
+
+def space_size(space):
+    start, _, _, count = space[-1]
+    return start + count
+
+def decode_phrase(space, index):
+    """
+    Frasa ke-`index` di ruang kombinatorial (indeks diurai sebagai bilangan
+    mixed-radix per template). None jika satu kata muncul dua kali.
+    """
+    start, fmt, slots, _ = space[bisect.bisect_right(space, index, key=itemgetter(0)) - 1]
+    index -= start
+    words = []
+    for slot in reversed(slots):
+        index, digit = divmod(index, len(slot))
+        words.append(slot[digit])
+    if len(set(words)) != len(words):
+        return None
+    return fmt.format(*reversed(words))
+
+class IndexPermutation:
+    """
+    Permutasi acak deterministik atas range(total) tanpa menyimpan isinya.
+    Posisi 0..size-1 dienkripsi dengan cipher Feistel kecil (bijektif pada
+    size = 2^bit); hasil yang >= total dilewati, sehingga setiap indeks
+    muncul tepat sekali. Memori O(1), dan rentang posisi mana pun bisa
+    dihitung secara independen (misalnya di proses worker).
+    """
+    ROUNDS = 4
+
+    def __init__(self, total, seed):
+        self.total = total
+        bits = max(2, (total - 1).bit_length())
+        bits += bits % 2
+        self.size = 1 << bits
+        self.half = bits // 2
+        self.mask = (1 << self.half) - 1
+        rng = random.Random(seed)
+        self.keys = [rng.getrandbits(32) for _ in range(self.ROUNDS)]
+
+    def _permute(self, position):
+        left, right = position >> self.half, position & self.mask
+        for key in self.keys:
+            mixed = (((right * 0x9E3779B1) ^ key) * 0x85EBCA6B) >> 7
+            left, right = right, left ^ (mixed & self.mask)
+        return (left << self.half) | right
+
+    def indices(self, start, stop):
+        """Indeks pada posisi start..stop-1 dari urutan permutasi."""
+        for position in range(start, min(stop, self.size)):
+            index = self._permute(position)
+            if index < self.total:
+                yield index
+
+_worker_state = None
+
+def _init_worker(space, permutation):
+    global _worker_state
+    _worker_state = (space, permutation)
+
+def _sample_range(positions):
+    """Mengambil sampel dan mengurai satu rentang posisi permutasi (dijalankan di worker)."""
+    space, permutation = _worker_state
+    return [decode_phrase(space, index) for index in permutation.indices(*positions)]
+
+def generate_phrases(count, seed, workers=1, space=None):
+    """
+    Mengambil `count` frasa unik secara acak namun deterministik untuk `seed`
+    yang sama (berapa pun jumlah worker-nya). Mengembalikan (frasa, jumlah
+    indeks yang dicoba); daftar frasa bisa lebih pendek jika ruangnya habis.
+    """
+    space = space or build_space()
+    permutation = IndexPermutation(space_size(space), seed)
+    phrases = []
+    seen = set()
+    tried = 0
+    position = 0
+    executor = None
+    if workers > 1:
+        # Sampling dan penguraian berjalan di worker; proses induk hanya
+        # menggabungkan hasil sesuai urutan posisi dan membuang duplikat.
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(space, permutation))
+    else:
+        _init_worker(space, permutation)
+    try:
+        while len(phrases) < count and position < permutation.size:
+            need = count - len(phrases)
+            span = (need + need // 8 + 64) * permutation.size // permutation.total + 1
+            step = -(-span // workers)
+            ranges = [(start, start + step) for start in range(position, position + span, step)]
+            position += span
+            batches = executor.map(_sample_range, ranges) if executor else map(_sample_range, ranges)
+            for batch in batches:
+                for phrase in batch:
+                    tried += 1
+                    if phrase is not None and phrase not in seen:
+                        seen.add(phrase)
+                        phrases.append(phrase)
+                        if len(phrases) == count:
+                            break
+                if len(phrases) == count:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return phrases, tried
+
+def generate_final_codebook(seed=None, chunk_size=2, output_filename=DEFAULT_OUTPUT, workers=None, variants=1):
+    """
+    Menghasilkan codebook lengkap (26^chunk_size chunk) dengan mengambil sampel
+    indeks dari ruang kombinasi template x kosakata, tanpa membuat semua frasa.
+    Seed yang sama selalu menghasilkan codebook yang sama. variants > 1 membuat
+    tema homofonik: setiap chunk mendapat `variants` frasa unik berbobot acak
+    (frasa utama sama dengan codebook variants=1 untuk seed yang sama).
+    """
+    if variants < 1:
+        raise ValueError(f"Jumlah varian harus minimal 1, bukan {variants}.")
+    print("--- Memulai Proses Pembuatan Codebook (Versi Definitif) ---")
+
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    chunks = ["".join(chars) for chars in product(ALPHABET, repeat=chunk_size)]
+    needed = len(chunks) * variants
+    if workers is None:
+        workers = (os.cpu_count() or 1) if needed >= PARALLEL_THRESHOLD else 1
+
+    templates = TEMPLATES
+    space = build_space(templates)
+    if space_size(space) < needed:
+        templates = TEMPLATES + LARGE_TEMPLATES
+        space = build_space(templates)
+    total = space_size(space)
+    print(f"[INFO] Ruang kombinasi: {total} indeks dari {len(templates)} template (seed {seed}).")
+
+    # 1. Periksa Kecukupan
+    if total < needed:
+        print(f"\n[ERROR] Kosakata tidak cukup! Ruang kombinasi hanya {total}, butuh {needed} frasa unik.")
+        return None
+
+    # 2. Ambil sampel indeks dan urai menjadi frasa
+    started = time.perf_counter()
+    phrases, tried = generate_phrases(needed, seed, workers, space)
+    elapsed = time.perf_counter() - started
+    if len(phrases) < needed:
+        print(f"\n[ERROR] Kosakata tidak cukup! Hanya bisa membuat {len(phrases)} frasa unik, butuh {needed}.")
+        return None
+    print(f"[INFO] {len(phrases)} frasa unik dari {tried} indeks yang dicoba "
+          f"({tried / total:.2%} ruang kombinasi) dalam {elapsed:.3f} detik, {workers} worker.")
+
+    # 3. Tugaskan
     word_to_rhyme = {}
-    for cat_data in vocabs.values():
+    for cat_data in VOCABS.values():
         for rhyme, words in cat_data.items():
             for word in words:
                 word_to_rhyme[word] = rhyme
 
+    def rhyme_of(phrase):
+        return word_to_rhyme.get(phrase.split()[-1], "unk") # default 'unk' jika kata tidak ditemukan
+
     dictionary = {}
-    for i, bigram in enumerate(bigrams):
-        phrase = shuffled_phrases[i]
-        last_word = phrase.split()[-1]
-        rhyme_key = word_to_rhyme.get(last_word, "unk") # default 'unk' jika kata tidak ditemukan
-        
-        dictionary[bigram] = {"phrase": phrase, "rhyme_key": rhyme_key}
+    for chunk, phrase in zip(chunks, phrases):
+        dictionary[chunk] = {"phrase": phrase, "rhyme_key": rhyme_of(phrase)}
+
+    metadata = {"name":"Parikan Jowo Final (Unik & Terjamin)","language":"Javanese","type":"parikan_4_baris","chunk_size":chunk_size,"seed":seed}
+    if variants > 1:
+        # Frasa ke-(k * jumlah chunk + i) menjadi varian ke-k chunk ke-i; bobot 1-4 dari seed yang sama.
+        rng = random.Random(seed)
+        for i, chunk in enumerate(chunks):
+            entry = dictionary[chunk]
+            entry["weight"] = rng.randint(1, 4)
+            entry["variants"] = [
+                {"phrase": phrase, "rhyme_key": rhyme_of(phrase), "weight": rng.randint(1, 4)}
+                for phrase in phrases[len(chunks) + i::len(chunks)]
+            ]
+        metadata.update(name="Parikan Jowo Homofonik", variants=variants)
 
-    print("[INFO] Berhasil menugaskan frasa unik ke 676 bigram.")
+    print(f"[INFO] Berhasil menugaskan {variants} frasa unik ke setiap {len(chunks)} chunk.")
 
     # Simpan ke file
-    codebook = {"metadata":{"name":"Parikan Jowo Final (Unik & Terjamin)","language":"Javanese","type":"parikan_4_baris","chunk_size":2},"dictionary":dictionary}
-    output_filename = os.path.join("data", "parikan_jowo_final.json")
+    codebook = {"metadata":metadata,"dictionary":dictionary}
 
     print(f"[INFO] Menyimpan hasil ke file '{output_filename}'...")
     with open(output_filename, "w", encoding='utf-8') as f:
         json.dump(codebook, f, indent=2, ensure_ascii=False)
-    
+
     print(f"\n--- ✅ SUKSES! File '{output_filename}' berhasil dibuat. ---")
+    return output_filename
+
+def compile_codebooks(theme_paths):
+    """
+    Mengompilasi setiap tema JSON menjadi file biner .wcb di sampingnya.
+    Engine me-mmap file ini saat startup alih-alih mem-parse JSON.
+    """
+    from src.core.engine import compile_theme
+
+    for theme_path in theme_paths:
+        wcb_path = compile_theme(theme_path)
+        print(f"[INFO] '{theme_path}' -> '{wcb_path}' ({os.path.getsize(wcb_path)} byte)")
+
+def positive_int(text):
+    """Tipe argparse untuk bilangan bulat >= 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"'{text}' bukan bilangan bulat positif.")
+    return value
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pembuat dan kompiler codebook Wayang Cipher.")
+    parser.add_argument('command', nargs='?', choices=['generate', 'compile'], default='generate',
+                        help="'generate' membuat codebook parikan baru, 'compile' membuat file .wcb")
+    parser.add_argument('themes', nargs='*', help="File tema untuk 'compile' (default: semua data/*.json)")
+    parser.add_argument('--seed', type=int, help="Seed acak agar codebook bisa dibuat ulang persis sama")
+    parser.add_argument('--chunk-size', type=int, default=2, choices=[1, 2, 3, 4],
+                        help="Panjang chunk huruf per frasa (default: 2)")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="File tema keluaran untuk 'generate'")
+    parser.add_argument('-j', '--workers', type=int, help="Jumlah proses (default: semua core untuk target besar)")
+    parser.add_argument('--variants', type=positive_int, default=1,
+                        help="Jumlah frasa per chunk untuk tema homofonik (default: 1)")
+    args = parser.parse_args()
     try:
-        generate_final_codebook()
+        if args.command == 'compile':
+            compile_codebooks(args.themes or sorted(glob.glob(os.path.join("data", "*.json"))))
+        else:
+            generate_final_codebook(args.seed, args.chunk_size, args.output, args.workers, args.variants)
     except Exception as e:
-        print(f"\n[FATAL ERROR] Terjadi kesalahan: {e}")
\ No newline at end of file
+        print(f"\n[FATAL ERROR] Terjadi kesalahan: {e}")
@@ -1,22 +1,220 @@
 # main.py
 
-import argparse
+import os
 import sys
-import subprocess
-from src.core.engine import encrypt, decrypt, encrypt_headerless, decrypt_headerless, encrypt_steganography, decrypt_steganography
+import time
+from src.core.profiling import PROFILER, format_report
+from src.core.matching import MatchReport
+from src.core.engine import encrypt, decrypt, encrypt_headerless, decrypt_headerless, encrypt_steganography, decrypt_steganography, load_codebook, encrypt_stream, decrypt_stream, run_cached
 
+# Modul yang hanya dipakai sebagian subcommand atau opsi (argparse lengkap,
+# sqlite, subprocess, deteksi tema, bentuk ringkas, mode hemat memori,
+# append, rentang, batch) diimpor di dalam handler-nya agar
+# perintah pendek dari cron/pipeline tidak membayar impornya (lihat
+# tests/test_startup.py).
 DEFAULT_THEME_PATH = "data/parikan_jowo_final.json"
+MODE_LABELS = {'standard': 'Standar', 'headerless': 'Headerless', 'steganography': 'Steganografi'}
 
+def handle_stream(args, source, stream_func):
+    """Menjalankan enkripsi/dekripsi stream; '-' berarti stdin, tanpa -o berarti stdout."""
+    if args.steganography:
+        print("[ERROR] Mode --stream belum mendukung --steganography.", file=sys.stderr)
+        return
+    reader = writer = None
+    # Hasil ditulis ke file sementara dan baru diganti namanya setelah stream
+    # selesai, karena kesalahan (misalnya jumlah huruf yang bukan kelipatan
+    # chunk pada mode headerless) baru diketahui di akhir input.
+    tmp_output = f"{args.output}.tmp{os.getpid()}" if args.output else None
+    completed = False
+    try:
+        codebook = load_codebook(args.theme)
+        reader = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8', newline='')
+        writer = open(tmp_output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        for piece in stream_func(reader, args.key, codebook, headerless=args.headerless):
+            writer.write(piece)
+        writer.flush()
+        completed = True
+    except Exception as e:
+        print(f"[ERROR] Terjadi kesalahan: {e}", file=sys.stderr)
+        if not args.output:
+            print("[ERROR] Output di stdout tidak lengkap dan tidak bisa dipakai.", file=sys.stderr)
+    finally:
+        if reader is not None and reader is not sys.stdin:
+            reader.close()
+        if writer is not None and writer is not sys.stdout:
+            writer.close()
+        if tmp_output and os.path.exists(tmp_output):
+            if completed:
+                os.replace(tmp_output, args.output)
+                print(f"[SUKSES] Hasil telah disimpan ke file: {args.output}", file=sys.stderr)
+            else:
+                os.remove(tmp_output)
+
+def profiled(handler):
+    """Menjalankan handler dengan profiler tahap aktif jika --profile diberikan."""
+    def run(args):
+        if not getattr(args, 'profile', False):
+            return handler(args)
+        PROFILER.enable()
+        started = time.perf_counter()
+        try:
+            return handler(args)
+        finally:
+            wall_seconds = time.perf_counter() - started
+            PROFILER.disable()
+            # Ke stderr agar output stream di stdout tetap utuh.
+            print("\n--- Profil Tahap ---", file=sys.stderr)
+            print(format_report(PROFILER.snapshot(), wall_seconds), file=sys.stderr)
+    return run
+
+def handle_low_memory(args, source, into_func):
+    """
+    Menjalankan encrypt_into/decrypt_into: hasil langsung ditulis ke file -o
+    (lewat file sementara) atau ke stdout, tanpa salinan hasil di memori.
+    """
+    mode = 'steganography' if args.steganography else 'headerless' if args.headerless else 'standard'
+    tmp_output = f"{args.output}.tmp{os.getpid()}" if args.output else None
+    writer = None
+    completed = False
+    try:
+        codebook = load_codebook(args.theme)
+        if source == '-':
+            text = sys.stdin.read()
+        else:
+            try:
+                with open(source, 'r', encoding='utf-8', newline='') as f:
+                    text = f.read()
+            except (FileNotFoundError, OSError):
+                text = source
+        writer = open(tmp_output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        into_func(text, args.key, codebook, writer, mode=mode)
+        writer.flush()
+        completed = True
+    except Exception as e:
+        print(f"[ERROR] Terjadi kesalahan: {e}", file=sys.stderr)
+    finally:
+        if writer is not None and writer is not sys.stdout:
+            writer.close()
+        if tmp_output and os.path.exists(tmp_output):
+            if completed:
+                os.replace(tmp_output, args.output)
+                print(f"[SUKSES] Hasil telah disimpan ke file: {args.output}", file=sys.stderr)
+            else:
+                os.remove(tmp_output)
+
+def handle_append(args):
+    """
+    Menambahkan plaintext ke ciphertext di file -o tanpa mengenkripsi ulang
+    isinya; jika file belum ada, file dibuat seperti enkripsi biasa.
+    """
+    from src.core.append import encrypt_append_file
+    if not args.output:
+        print("[ERROR] --append membutuhkan -o (file ciphertext yang ditambahi).")
+        return
+    if args.headerless:
+        print("[ERROR] Mode --append belum mendukung --headerless.")
+        return
+    mode = 'steganography' if args.steganography else 'standard'
+    try:
+        try:
+            with open(args.plaintext, 'r', encoding='utf-8', newline='') as f:
+                plaintext = f.read()
+        except (FileNotFoundError, OSError):
+            plaintext = args.plaintext
+        codebook = load_codebook(args.theme)
+        if os.path.exists(args.output):
+            encrypt_append_file(args.output, plaintext, args.key, codebook, mode=mode)
+            print(f"[SUKSES] Teks telah ditambahkan ke file: {args.output}")
+        else:
+            encrypt_func = encrypt_steganography if args.steganography else encrypt
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                f.write(encrypt_func(plaintext, args.key, codebook))
+            print(f"[SUKSES] File baru dibuat: {args.output}")
+    except Exception as e:
+        print(f"[ERROR] Terjadi kesalahan: {e}")
+
+def parse_range(text):
+    """'START:END' dengan semantik slice Python; bagian yang kosong berarti awal/akhir teks."""
+    start, sep, end = text.partition(':')
+    try:
+        if not sep:
+            raise ValueError
+        return (int(start) if start else None, int(end) if end else None)
+    except ValueError:
+        import argparse
+        raise argparse.ArgumentTypeError(f"Rentang '{text}' tidak valid; gunakan START:END, mis. 1000:2000.")
+
+def handle_range(args):
+    """Mendekripsi sebagian plaintext lewat decrypt_range (file dibaca dengan mmap)."""
+    from src.core.seek import decrypt_range
+    if args.headerless:
+        print("[ERROR] --range membutuhkan header; mode --headerless tidak didukung.")
+        return
+    mode = 'steganography' if args.steganography else 'standard'
+    start, end = args.range
+    try:
+        source = args.ciphertext if os.path.isfile(args.ciphertext) else args.ciphertext.encode('utf-8')
+        result = decrypt_range(source, args.key, load_codebook(args.theme), start, end, mode=mode)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                f.write(result)
+            print(f"[SUKSES] Hasil dekripsi sebagian telah disimpan ke file: {args.output}")
+        else:
+            print(result)
+    except Exception as e:
+        print(f"[ERROR] Terjadi kesalahan: {e}")
+
+def run_with_cache(cache_path, direction, mode, text, key, codebook, workers):
+    """run_cached dengan cache hasil sqlite di `cache_path`; hit/miss dicetak sebagai [INFO]."""
+    from src.core.result_cache import ResultCache
+
+    cache = ResultCache(path=cache_path)
+    try:
+        result = run_cached(cache, direction, mode, text, key, codebook, workers=workers)
+        print(f"[INFO] Cache hasil: {'hit' if cache.hits else 'miss'} ({cache_path}, {len(cache.store)} entri).")
+        return result
+    finally:
+        cache.close()
+
+@profiled
 def handle_encrypt(args):
+    if args.seek_index and (args.headerless or args.stream or args.low_memory or args.append):
+        print("[ERROR] --seek-index hanya didukung untuk enkripsi biasa mode standar atau steganografi.")
+        return
+    if args.workers != 1 and (args.stream or args.low_memory or args.append):
+        print("[ERROR] -j/--workers hanya didukung untuk enkripsi biasa (tanpa --stream, --low-memory, atau --append).")
+        return
+    if args.compact and (args.stream or args.low_memory or args.append or args.seek_index or args.steganography or args.workers != 1):
+        print("[ERROR] --compact hanya didukung untuk enkripsi biasa mode standar atau headerless.")
+        return
+    if args.homophonic and (args.stream or args.low_memory or args.append or args.compact):
+        print("[ERROR] --homophonic hanya didukung untuk enkripsi biasa (tanpa --stream, --low-memory, --append, atau --compact).")
+        return
+    if args.cache and (args.stream or args.low_memory or args.append or args.compact or args.seek_index or args.homophonic):
+        print("[ERROR] --cache hanya didukung untuk enkripsi biasa (tanpa --stream, --low-memory, --append, --compact, --seek-index, atau --homophonic).")
+        return
+    if args.append:
+        handle_append(args)
+        return
+    if args.compact:
+        handle_encrypt_compact(args)
+        return
+    if args.stream:
+        handle_stream(args, args.plaintext, encrypt_stream)
+        return
+    if args.low_memory:
+        from src.core.lowmem import encrypt_into
+        handle_low_memory(args, args.plaintext, encrypt_into)
+        return
     try:
         if args.steganography:
-            target_func = encrypt_steganography
+            target_func, mode = encrypt_steganography, 'steganography'
             mode_str = "(Mode Steganografi: Output Puisi Bersih & Akurat)"
         elif args.headerless:
-            target_func = encrypt_headerless
+            target_func, mode = encrypt_headerless, 'headerless'
             mode_str = "(Mode Headerless: Hanya Puisi)"
         else:
-            target_func = encrypt
+            target_func, mode = encrypt, 'standard'
             mode_str = "(Mode Standar: Dengan Header)"
         
         try:
@@ -27,7 +225,16 @@ def handle_encrypt(args):
             plaintext = args.plaintext
             print("Mengenkripsi teks dari argumen langsung.")
 
-        encrypted_result = target_func(plaintext, args.key, args.theme)
+        codebook = load_codebook(args.theme)
+        if args.homophonic and codebook.homophones is None:
+            print("[INFO] Tema ini tidak memiliki varian frasa; --homophonic memakai frasa utama.")
+        if args.cache:
+            encrypted_result = run_with_cache(args.cache, 'encrypt', mode, plaintext, args.key, codebook, args.workers)
+        elif args.seek_index:
+            encrypted_result = target_func(plaintext, args.key, codebook, seek_index=True, workers=args.workers,
+                                           homophonic=args.homophonic)
+        else:
+            encrypted_result = target_func(plaintext, args.key, codebook, workers=args.workers, homophonic=args.homophonic)
         
         print("\n--- Hasil Enkripsi ---")
         print(mode_str)
@@ -36,7 +243,8 @@ def handle_encrypt(args):
         # --- LOGIKA BARU UNTUK MENYIMPAN KE FILE ---
         if args.output:
             try:
-                with open(args.output, 'w', encoding='utf-8') as f:
+                # newline='': offset byte indeks seek mengacu pada baris "\n" apa adanya.
+                with open(args.output, 'w', encoding='utf-8', newline='') as f:
                     f.write(encrypted_result)
                 print(f"\n[SUKSES] Hasil enkripsi telah disimpan ke file: {args.output}")
             except Exception as e:
@@ -45,16 +253,46 @@ def handle_encrypt(args):
     except Exception as e:
         print(f"\n[ERROR] Terjadi kesalahan: {e}")
 
+@profiled
 def handle_decrypt(args):
+    if args.workers != 1 and (args.range is not None or args.stream or args.low_memory):
+        print("[ERROR] -j/--workers hanya didukung untuk dekripsi biasa (tanpa --range, --stream, atau --low-memory).")
+        return
+    if args.tolerant and (args.range is not None or args.stream or args.low_memory):
+        print("[ERROR] --tolerant hanya didukung untuk dekripsi biasa (tanpa --range, --stream, atau --low-memory).")
+        return
+    if args.auto and (args.range is not None or args.stream or args.low_memory):
+        print("[ERROR] --auto hanya didukung untuk dekripsi biasa (tanpa --range, --stream, atau --low-memory).")
+        return
+    if args.compact and (args.range is not None or args.stream or args.low_memory or args.tolerant or args.auto
+                         or args.headerless or args.steganography or args.workers != 1):
+        print("[ERROR] --compact tidak bisa digabung dengan opsi dekripsi lain (mode dibaca dari file ringkasnya).")
+        return
+    if args.cache and (args.range is not None or args.stream or args.low_memory or args.tolerant or args.auto or args.compact):
+        print("[ERROR] --cache hanya didukung untuk dekripsi biasa (tanpa --range, --stream, --low-memory, --tolerant, --auto, atau --compact).")
+        return
+    if args.compact:
+        handle_decrypt_compact(args)
+        return
+    if args.range is not None:
+        handle_range(args)
+        return
+    if args.stream:
+        handle_stream(args, args.ciphertext, decrypt_stream)
+        return
+    if args.low_memory:
+        from src.core.lowmem import decrypt_into
+        handle_low_memory(args, args.ciphertext, decrypt_into)
+        return
     try:
         if args.steganography:
-            target_func = decrypt_steganography
+            target_func, mode = decrypt_steganography, 'steganography'
             mode_str = "(Mode Steganografi)"
         elif args.headerless:
-            target_func = decrypt_headerless
+            target_func, mode = decrypt_headerless, 'headerless'
             mode_str = "(Mode Headerless)"
         else:
-            target_func = decrypt
+            target_func, mode = decrypt, 'standard'
             mode_str = "(Mode Standar)"
             
         try:
@@ -65,16 +303,326 @@ def handle_decrypt(args):
             ciphertext = args.ciphertext
             print("Mendekripsi teks dari argumen langsung.")
 
-        decrypted_result = target_func(ciphertext, args.key, args.theme)
+        report = MatchReport() if args.tolerant else None
+        if args.auto:
+            from src.core.detect import decrypt_auto
+            decrypted_result, detection = decrypt_auto(ciphertext, args.key, args.theme_dir, workers=args.workers,
+                                                       tolerant=args.tolerant, report=report)
+            print(f"[INFO] Deteksi otomatis: {detection.summary()}")
+            mode_str = f"(Mode {MODE_LABELS[detection.mode]}, terdeteksi otomatis)"
+        elif args.cache:
+            decrypted_result = run_with_cache(args.cache, 'decrypt', mode, ciphertext, args.key, load_codebook(args.theme),
+                                              args.workers)
+        else:
+            codebook = load_codebook(args.theme)
+            decrypted_result = target_func(ciphertext, args.key, codebook, workers=args.workers,
+                                           tolerant=args.tolerant, report=report)
+        if report is not None:
+            print(f"[INFO] Pencocokan toleran: {report.summary()}")
+            if report.unmatched:
+                print("[ERROR] Baris di atas dibuang; hasil dekripsi kemungkinan rusak.")
         
         print("\n--- Hasil Dekripsi ---")
         print(mode_str)
         print(decrypted_result)
+
+        if args.output:
+            try:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(decrypted_result)
+                print(f"\n[SUKSES] Hasil dekripsi telah disimpan ke file: {args.output}")
+            except Exception as e:
+                print(f"\n[ERROR] Gagal menyimpan file: {e}")
         
     except Exception as e:
         print(f"\n[ERROR] Terjadi kesalahan: {e}")
 
+# --- BENTUK RINGKAS (ID CHUNK TERKEMAS) ---
+def read_text_argument(value):
+    """Isi file jika `value` adalah path file yang ada, selain itu `value` sendiri."""
+    try:
+        with open(value, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except (FileNotFoundError, TypeError, OSError):
+        return value
+
+def handle_encrypt_compact(args):
+    from src.core.compact import encrypt_compact
+
+    if not args.output:
+        print("[ERROR] --compact membutuhkan -o karena hasilnya berupa data biner.")
+        return
+    try:
+        data = encrypt_compact(read_text_argument(args.plaintext), args.key, load_codebook(args.theme),
+                               headerless=args.headerless)
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        print(f"[SUKSES] Bentuk ringkas ({len(data)} byte) telah disimpan ke file: {args.output}")
+    except Exception as e:
+        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+
+def handle_decrypt_compact(args):
+    from src.core.compact import decrypt_compact
+
+    try:
+        with open(args.ciphertext, 'rb') as f:
+            data = f.read()
+        decrypted_result = decrypt_compact(data, args.key)
+        print("\n--- Hasil Dekripsi ---")
+        print("(Bentuk Ringkas)")
+        print(decrypted_result)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(decrypted_result)
+            print(f"\n[SUKSES] Hasil dekripsi telah disimpan ke file: {args.output}")
+    except Exception as e:
+        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+
+def handle_compact(args):
+    """compact pack: ciphertext puisi -> bentuk ringkas; compact render: sebaliknya."""
+    from src.core.compact import to_compact, from_compact
+
+    mode = 'steganography' if args.steganography else 'headerless' if args.headerless else None
+    try:
+        codebook = load_codebook(args.theme)
+        if args.action == 'pack':
+            if not args.output:
+                print("[ERROR] compact pack membutuhkan -o karena hasilnya berupa data biner.")
+                return
+            ciphertext = read_text_argument(args.input)
+            data = to_compact(ciphertext, codebook, mode or 'standard')
+            with open(args.output, 'wb') as f:
+                f.write(data)
+            original = len(ciphertext.encode('utf-8'))
+            print(f"[SUKSES] {original} -> {len(data)} byte ({original / max(len(data), 1):.1f}x lebih kecil), "
+                  f"disimpan ke file: {args.output}")
+        else:
+            with open(args.input, 'rb') as f:
+                ciphertext = from_compact(f.read(), codebook, mode)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                    f.write(ciphertext)
+                print(f"[SUKSES] Puisi telah disimpan ke file: {args.output}")
+            else:
+                print(ciphertext)
+    except Exception as e:
+        print(f"[ERROR] Terjadi kesalahan: {e}")
+
+def collect_batch_files(inputs):
+    """Mengumpulkan file dari daftar direktori, path file, atau pola glob (urutan tetap, tanpa duplikat)."""
+    import glob
+
+    paths = []
+    seen = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = sorted(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+        for path in matches:
+            real_path = os.path.abspath(path)
+            if os.path.isfile(path) and real_path not in seen:
+                seen.add(real_path)
+                paths.append(path)
+    return paths
+
+def batch_output_paths(paths, output_dir):
+    """
+    Path keluaran untuk setiap input, relatif terhadap direktori induk
+    bersama semua input, sehingga file bernama sama dari direktori berbeda
+    tidak saling menimpa.
+    """
+    if not paths:
+        return []
+    parents = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    root = os.path.commonpath(parents)
+    return [os.path.join(output_dir, os.path.relpath(os.path.abspath(path), root)) for path in paths]
+
+def handle_batch(args):
+    from src.core.batch import encrypt_many, decrypt_many
+    from src.core.result_cache import ResultCache
+
+    if args.steganography:
+        mode = 'steganography'
+    elif args.headerless:
+        mode = 'headerless'
+    else:
+        mode = 'standard'
+    paths = collect_batch_files(args.inputs)
+    if not paths:
+        print("[ERROR] Tidak ada file input yang ditemukan.")
+        return
+
+    failures = []
+    jobs = []
+    job_paths = []
+    total_bytes = 0
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            failures.append((path, e))
+            continue
+        jobs.append((text, args.key))
+        job_paths.append(path)
+        total_bytes += os.path.getsize(path)
+
+    print(f"Memproses {len(jobs)} file ({args.action}, mode {mode}) dengan {args.workers or os.cpu_count()} worker...")
+    start = time.perf_counter()
+    try:
+        batch_func = encrypt_many if args.action == 'encrypt' else decrypt_many
+        cache = ResultCache(path=args.cache) if args.cache else None
+        try:
+            results = batch_func(jobs, load_codebook(args.theme), mode=mode, workers=args.workers, return_exceptions=True,
+                                 cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+    except Exception as e:
+        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+        return
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        print(f"[INFO] Cache hasil: {cache.hits} hit, {cache.misses} miss ({args.cache}).")
+
+    succeeded = 0
+    for path, out_path, result in zip(job_paths, batch_output_paths(job_paths, args.output_dir), results):
+        if isinstance(result, Exception):
+            failures.append((path, result))
+            continue
+        try:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(result)
+            succeeded += 1
+        except OSError as e:
+            failures.append((path, e))
+
+    for path, error in failures:
+        print(f"[GAGAL] {path}: {error}")
+    rate = len(jobs) / elapsed if elapsed > 0 else float('inf')
+    print(f"\n[SELESAI] {succeeded} berhasil, {len(failures)} gagal dalam {elapsed:.2f} detik "
+          f"({rate:.1f} file/detik, {total_bytes / 1e6 / max(elapsed, 1e-9):.2f} MB/detik).")
+
+def parse_size(value):
+    """Mengubah '100', '10K', '1M', '100MB' menjadi jumlah byte."""
+    value = value.strip().upper().rstrip('B')
+    multiplier = 1
+    if value and value[-1] in 'KMG':
+        multiplier = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}[value[-1]]
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+def handle_bench(args):
+    from bench.suite import SIZES, SCALING_SIZE, run_suite, run_scaling, compare_to_baseline, load_baseline, save_report, format_result, format_scaling
+
+    if args.scaling is not None:
+        # Angka skala bergantung pada jumlah core mesin, jadi tidak dibandingkan dengan baseline.
+        size = parse_size(args.sizes.split(',')[0]) if args.sizes else SCALING_SIZE
+        max_workers = args.scaling or os.cpu_count() or 1
+        print(f"--- Skala Paralel Satu Pesan ({size} karakter, 1-{max_workers} worker) ---")
+        results = run_scaling(size, max_workers, theme_path=args.themes[0] if args.themes else DEFAULT_THEME_PATH,
+                              progress=lambda result: print(format_scaling(result)))
+        if not all(result["identical"] for result in results):
+            print("\n[GAGAL] Output paralel berbeda dari jalur serial.")
+            sys.exit(1)
+        return
+
+    if args.sizes:
+        sizes = [parse_size(s) for s in args.sizes.split(',')]
+    else:
+        max_size = parse_size(args.max_size)
+        sizes = [s for s in SIZES if s <= max_size]
+    print(f"--- Menjalankan Benchmark (ukuran: {', '.join(str(s) for s in sizes)} byte) ---")
+    report = run_suite(sizes=sizes, themes=args.themes, targets=args.targets, time_budget=args.time_budget,
+                       progress=lambda name, result: print(format_result(name, result)))
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"\n[INFO] Hasil benchmark disimpan ke: {args.output}")
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"\n[SUKSES] Baseline baru disimpan ke: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        # Tanpa baseline tidak ada yang dibandingkan; gagal agar gerbang regresi
+        # di CI tidak lolos diam-diam.
+        print(f"\n[GAGAL] Baseline '{args.baseline}' belum ada. Jalankan dengan --save-baseline untuk membuatnya.")
+        sys.exit(1)
+    if not set(report["results"]) & set(baseline.get("results", {})):
+        print(f"\n[GAGAL] Tidak ada hasil yang bisa dibandingkan dengan baseline '{args.baseline}' "
+              "(ukuran, tema, atau target berbeda).")
+        sys.exit(1)
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[GAGAL] {len(regressions)} regresi melewati toleransi {args.tolerance:.0%}:")
+        for name, metric, before, after in regressions:
+            print(f"  {name} {metric}: {before:.3f} -> {after:.3f}")
+        sys.exit(1)
+    print(f"\n[SUKSES] Tidak ada regresi dibanding baseline (toleransi {args.tolerance:.0%}).")
+
+def handle_audit(args):
+    from src.core.audit import audit, format_audit_report
+
+    mode = 'steganography' if args.steganography else 'headerless' if args.headerless else 'standard'
+    try:
+        try:
+            with open(args.ciphertext, 'r', encoding='utf-8') as f:
+                ciphertext = f.read()
+        except (FileNotFoundError, OSError):
+            ciphertext = args.ciphertext
+        reference_text = None
+        if args.reference:
+            with open(args.reference, 'r', encoding='utf-8') as f:
+                reference_text = f.read()
+        wordlist = open(args.wordlist, 'r', encoding='utf-8', errors='replace') if args.wordlist else None
+        try:
+            report = audit(ciphertext, load_codebook(args.theme), mode=mode, max_key_length=args.max_key_length,
+                           keys=wordlist, workers=args.workers, language=args.lang,
+                           reference_text=reference_text, top=args.top)
+        finally:
+            if wordlist is not None:
+                wordlist.close()
+        print(f"--- Audit Ciphertext (mode {mode}) ---")
+        print(format_audit_report(report))
+    except Exception as e:
+        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+
+def handle_serve(args):
+    import sqlite3
+    from src.core.result_cache import ResultCache
+    from src.core.service import run_service
+
+    def ready(service):
+        addresses = []
+        if service.port is not None:
+            addresses.append(f"http://{args.host}:{service.port}")
+        if args.unix:
+            addresses.append(f"unix:{args.unix}")
+        print(f"[INFO] Layanan siap di {', '.join(addresses)} "
+              f"({len(service.theme_paths)} tema, {service.workers} worker, maks. {service.max_concurrency} pekerjaan).")
+        print("[INFO] Endpoint: POST /encrypt, POST /decrypt, GET /stats, GET /metrics, GET /themes. "
+              "Tekan Ctrl+C untuk berhenti.")
+        if service.cache is not None:
+            print(f"[INFO] Cache hasil aktif: maks. {args.cache_entries} entri / {args.cache_mb} MB "
+                  f"({'sqlite ' + args.cache_file if args.cache_file else 'memori'}).")
+
+    try:
+        cache = None
+        if args.cache_entries > 0:
+            cache = ResultCache(args.cache_entries, args.cache_mb * 1024 * 1024, args.cache_file)
+        run_service(host=args.host, port=None if args.no_tcp else args.port, unix_path=args.unix,
+                    theme_dir=args.theme_dir, workers=args.workers, max_concurrency=args.max_concurrency,
+                    default_theme=args.default_theme, ready=ready, profile=args.profile, cache=cache)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"\n[ERROR] Terjadi kesalahan: {e}")
+
 def handle_test():
+    import subprocess
+
     print("--- Menjalankan Unit Tests ---")
     command = [sys.executable, '-m', 'unittest', 'discover', 'tests']
     try:
@@ -83,7 +631,124 @@ def handle_test():
     except (subprocess.CalledProcessError, FileNotFoundError):
         print("\n[GAGAL] Terjadi kesalahan saat menjalankan tes.")
 
-def main():
+# --- PARSER CLI ---
+# Argumen setiap subcommand didaftarkan oleh fungsinya sendiri; main() hanya
+# membangun argumen subcommand yang dijalankan (lihat build_parser).
+def add_encrypt_arguments(parser):
+    parser.add_argument('plaintext', type=str, help='Teks asli atau path ke file teks asli.')
+    parser.add_argument('-k', '--key', type=str, required=True, help='Kunci enkripsi.')
+    parser.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
+    parser.add_argument('-o', '--output', type=str, help='(Opsional) Simpan hasil enkripsi ke file.') # OPSI BARU
+    parser.add_argument('--stream', action='store_true', help="Proses per potongan dengan memori tetap ('-' = stdin, tanpa -o = stdout).")
+    parser.add_argument('--low-memory', action='store_true', help="Mode hemat memori: output sama, ditulis langsung ke -o atau stdout ('-' = stdin).")
+    parser.add_argument('--profile', action='store_true', help='Tampilkan rincian waktu dan byte per tahap (ke stderr).')
+    parser.add_argument('--append', action='store_true', help='Tambahkan ke ciphertext yang sudah ada di -o tanpa mengenkripsi ulang isinya (dibuat jika belum ada).')
+    parser.add_argument('--seek-index', action='store_true', help='Simpan indeks seek di header agar bisa didekripsi sebagian dengan decrypt --range.')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Jumlah proses untuk memecah satu pesan besar (default: 1, 0 = jumlah core).')
+    parser.add_argument('--homophonic', nargs='?', const='weighted', choices=['weighted', 'rhyme'], help="Pilih varian frasa tema homofonik per baris sesuai bobot ('rhyme': utamakan rima bait).")
+    parser.add_argument('--cache', type=str, metavar='FILE', help='(Opsional) File cache hasil sqlite: input, kunci, tema, dan mode yang sama langsung memakai hasil tersimpan.')
+    parser.add_argument('--compact', action='store_true', help='Simpan sebagai bentuk ringkas (id chunk terkemas, butuh -o); dirender jadi puisi dengan "compact render".')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--headerless', action='store_true', help='Gunakan mode headerless (tanpa header).')
+    mode_group.add_argument('--steganography', action='store_true', help='Gunakan mode steganografi (tanpa header, akurat).')
+
+def add_decrypt_arguments(parser):
+    parser.add_argument('ciphertext', type=str, help='Teks sandi atau path ke file teks sandi.')
+    parser.add_argument('-k', '--key', type=str, required=True, help='Kunci dekripsi.')
+    parser.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
+    parser.add_argument('-o', '--output', type=str, help='(Opsional) Simpan hasil dekripsi ke file.')
+    parser.add_argument('--stream', action='store_true', help="Proses per potongan dengan memori tetap ('-' = stdin, tanpa -o = stdout).")
+    parser.add_argument('--low-memory', action='store_true', help="Mode hemat memori: output sama, ditulis langsung ke -o atau stdout ('-' = stdin).")
+    parser.add_argument('--profile', action='store_true', help='Tampilkan rincian waktu dan byte per tahap (ke stderr).')
+    parser.add_argument('--range', type=parse_range, metavar='START:END', help='Dekripsi hanya plaintext[START:END] (cepat jika dienkripsi dengan --seek-index).')
+    parser.add_argument('--tolerant', action='store_true', help='Cocokkan baris yang berubah (huruf besar/kecil, spasi, salah ketik kecil) dengan frasa terdekat.')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Jumlah proses untuk memecah satu pesan besar (default: 1, 0 = jumlah core).')
+    parser.add_argument('--cache', type=str, metavar='FILE', help='(Opsional) File cache hasil sqlite (berisi plaintext; lindungi filenya).')
+    parser.add_argument('--compact', action='store_true', help='Input berupa file bentuk ringkas (tanpa tema, tanpa pencarian frasa).')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--headerless', action='store_true', help='Gunakan mode headerless (tanpa header).')
+    mode_group.add_argument('--steganography', action='store_true', help='Gunakan mode steganografi (tanpa header, akurat).')
+    mode_group.add_argument('--auto', action='store_true', help='Deteksi mode dan tema otomatis dari semua tema di --theme-dir (-t diabaikan).')
+    parser.add_argument('--theme-dir', type=str, default='data', help='Direktori tema untuk --auto (default: data).')
+
+def add_batch_arguments(parser):
+    parser.add_argument('action', choices=['encrypt', 'decrypt'], help='Operasi yang dijalankan.')
+    parser.add_argument('inputs', nargs='+', help='Direktori, path file, atau pola glob (mis. "pesan/*.txt").')
+    parser.add_argument('-o', '--output-dir', type=str, required=True, help='Direktori untuk hasil (nama file dipertahankan).')
+    parser.add_argument('-k', '--key', type=str, required=True, help='Kunci enkripsi/dekripsi.')
+    parser.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses worker (default: jumlah core).')
+    parser.add_argument('--cache', type=str, metavar='FILE', help='(Opsional) File cache hasil sqlite; file yang isinya sudah pernah diproses dilewati.')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--headerless', action='store_true', help='Gunakan mode headerless (tanpa header).')
+    mode_group.add_argument('--steganography', action='store_true', help='Gunakan mode steganografi (tanpa header, akurat).')
+
+def add_compact_arguments(parser):
+    parser.add_argument('action', choices=['pack', 'render'], help='pack: puisi -> ringkas, render: ringkas -> puisi.')
+    parser.add_argument('input', type=str, help='File input (atau teks sandi langsung untuk pack).')
+    parser.add_argument('-o', '--output', type=str, help='File hasil (wajib untuk pack; render tanpa -o menulis ke stdout).')
+    parser.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--headerless', action='store_true', help='Ciphertext mode headerless.')
+    mode_group.add_argument('--steganography', action='store_true', help='Ciphertext mode steganografi.')
+
+def add_bench_arguments(parser):
+    parser.add_argument('--sizes', type=str, help="Daftar ukuran input dipisah koma, mis. '100,10K,1M'.")
+    parser.add_argument('--max-size', type=str, default='1M', help="Ukuran terbesar dari daftar bawaan 100B-100MB (default: 1M).")
+    parser.add_argument('--themes', nargs='+', help='File tema yang diuji (default: semua di data/).')
+    parser.add_argument('--targets', nargs='+', help='Target yang diuji (default: semua).')
+    parser.add_argument('--baseline', type=str, default='bench/baseline.json', help='Path baseline JSON (default: bench/baseline.json).')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Kenaikan p50/puncak memori yang masih diterima (default: 0.25).')
+    parser.add_argument('--time-budget', type=float, default=0.5, help='Waktu ulangan per pengukuran dalam detik (default: 0.5).')
+    parser.add_argument('--save-baseline', action='store_true', help='Simpan hasil sebagai baseline baru.')
+    parser.add_argument('--scaling', type=int, nargs='?', const=0, metavar='N', help="Ukur skala enkripsi/dekripsi satu pesan dengan 1..N worker (tanpa N = jumlah core; ukuran dari --sizes, default 20M).")
+    parser.add_argument('-o', '--output', type=str, help='(Opsional) Simpan hasil benchmark ke file JSON.')
+
+def add_serve_arguments(parser):
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Alamat TCP (default: 127.0.0.1).')
+    parser.add_argument('--port', type=int, default=8765, help='Port TCP (default: 8765).')
+    parser.add_argument('--no-tcp', action='store_true', help='Hanya dengarkan Unix socket.')
+    parser.add_argument('--unix', type=str, help='(Opsional) Path Unix socket.')
+    parser.add_argument('--theme-dir', type=str, default='data', help='Direktori tema yang dimuat (default: data).')
+    parser.add_argument('--default-theme', type=str, help='Nama tema bawaan jika request tidak menyebut "theme".')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Jumlah proses worker (default: jumlah core, 0 = satu thread).')
+    parser.add_argument('--max-concurrency', type=int, default=64, help='Batas pekerjaan yang berjalan bersamaan (default: 64).')
+    parser.add_argument('--profile', action='store_true', help='Catat waktu per tahap engine dan tampilkan di GET /metrics.')
+    parser.add_argument('--cache-entries', type=int, default=0, help='Aktifkan cache hasil dengan batas jumlah entri ini (default: 0 = mati).')
+    parser.add_argument('--cache-mb', type=int, default=64, help='Batas total ukuran hasil di cache dalam MB (default: 64).')
+    parser.add_argument('--cache-file', type=str, help='(Opsional) Simpan cache hasil di file sqlite alih-alih di memori.')
+
+def add_audit_arguments(parser):
+    parser.add_argument('ciphertext', type=str, help='Teks sandi atau path ke file teks sandi.')
+    parser.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
+    parser.add_argument('--max-key-length', type=int, default=20, help='Panjang kunci terbesar yang diuji (default: 20).')
+    parser.add_argument('-w', '--wordlist', type=str, help='(Opsional) File daftar kunci, satu per baris.')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Jumlah proses untuk menilai daftar kunci (default: 1, 0 = jumlah core).')
+    parser.add_argument('--lang', choices=['id', 'en'], default='id', help='Bahasa plaintext untuk uji frekuensi (default: id).')
+    parser.add_argument('--reference', type=str, help='(Opsional) Teks rujukan untuk frekuensi huruf, menggantikan --lang.')
+    parser.add_argument('--top', type=int, default=5, help='Jumlah kandidat yang ditampilkan (default: 5).')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--headerless', action='store_true', help='Ciphertext mode headerless.')
+    mode_group.add_argument('--steganography', action='store_true', help='Ciphertext mode steganografi.')
+
+COMMANDS = {
+    'encrypt': ('Enkripsi plaintext.', add_encrypt_arguments),
+    'decrypt': ('Dekripsi ciphertext.', add_decrypt_arguments),
+    'batch': ('Enkripsi/dekripsi banyak file sekaligus (process pool).', add_batch_arguments),
+    'compact': ('Ubah ciphertext puisi ke bentuk ringkas (pack) atau sebaliknya (render).', add_compact_arguments),
+    'bench': ('Jalankan benchmark dan bandingkan dengan baseline.', add_bench_arguments),
+    'serve': ('Jalankan layanan HTTP/JSON dengan tema yang tetap termuat.', add_serve_arguments),
+    'audit': ('Audit kekuatan ciphertext: cari panjang kunci, pulihkan kunci, uji daftar kunci (butuh NumPy).', add_audit_arguments),
+    'test': ('Jalankan semua unit test.', None),
+}
+
+def build_parser(command=None):
+    """
+    Parser CLI. Dengan `command`, subcommand lain hanya didaftarkan namanya
+    (cukup untuk pesan bantuan dan error), tanpa membangun semua argumennya.
+    """
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Aplikasi Enkripsi Puitis.",
         formatter_class=argparse.RawTextHelpFormatter
@@ -91,35 +756,36 @@ def main():
     parser.epilog = (
         "Contoh Penggunaan:\n"
         "  Enkripsi ke file : python main.py encrypt \"Teks ini!\" -k KUNCI -t data/file.json --steganography -o chipertext.txt\n"
-        "  Dekripsi dari file : python main.py decrypt chipertext.txt -k KUNCI -t data/file.json --steganography"
+        "  Dekripsi dari file : python main.py decrypt chipertext.txt -k KUNCI -t data/file.json --steganography\n"
+        "  Enkripsi stream  : cat arsip.txt | python main.py encrypt - -k KUNCI --stream > arsip.puisi"
     )
 
     subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (help_text, add_arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if add_arguments is not None and command in (None, name):
+            add_arguments(subparser)
+    return parser
 
-    parser_encrypt = subparsers.add_parser('encrypt', help='Enkripsi plaintext.')
-    parser_encrypt.add_argument('plaintext', type=str, help='Teks asli atau path ke file teks asli.')
-    parser_encrypt.add_argument('-k', '--key', type=str, required=True, help='Kunci enkripsi.')
-    parser_encrypt.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
-    parser_encrypt.add_argument('-o', '--output', type=str, help='(Opsional) Simpan hasil enkripsi ke file.') # OPSI BARU
-    mode_group_enc = parser_encrypt.add_mutually_exclusive_group()
-    mode_group_enc.add_argument('--headerless', action='store_true', help='Gunakan mode headerless (tanpa header).')
-    mode_group_enc.add_argument('--steganography', action='store_true', help='Gunakan mode steganografi (tanpa header, akurat).')
-
-    parser_decrypt = subparsers.add_parser('decrypt', help='Dekripsi ciphertext.')
-    parser_decrypt.add_argument('ciphertext', type=str, help='Teks sandi atau path ke file teks sandi.')
-    parser_decrypt.add_argument('-k', '--key', type=str, required=True, help='Kunci dekripsi.')
-    parser_decrypt.add_argument('-t', '--theme', type=str, default=DEFAULT_THEME_PATH, help=f'Path ke file tema (default: {DEFAULT_THEME_PATH}')
-    mode_group_dec = parser_decrypt.add_mutually_exclusive_group()
-    mode_group_dec.add_argument('--headerless', action='store_true', help='Gunakan mode headerless (tanpa header).')
-    mode_group_dec.add_argument('--steganography', action='store_true', help='Gunakan mode steganografi (tanpa header, akurat).')
-
-    subparsers.add_parser('test', help='Jalankan semua unit test.')
-    args = parser.parse_args()
+def main():
+    argv = sys.argv[1:]
+    command = argv[0] if argv and argv[0] in COMMANDS else None
+    args = build_parser(command).parse_args(argv)
 
     if args.command == 'encrypt':
         handle_encrypt(args)
     elif args.command == 'decrypt':
         handle_decrypt(args)
+    elif args.command == 'batch':
+        handle_batch(args)
+    elif args.command == 'compact':
+        handle_compact(args)
+    elif args.command == 'bench':
+        handle_bench(args)
+    elif args.command == 'audit':
+        handle_audit(args)
+    elif args.command == 'serve':
+        handle_serve(args)
     elif args.command == 'test':
         handle_test()
 
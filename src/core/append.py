@@ -0,0 +1,220 @@
+# src/core/append.py
+
+import io
+import os
+from array import array
+
+from src.core.backends import get_backend
+from src.core.profiling import PROFILER
+from src.core.header import pack_header, unpack_header
+from src.core.engine import (
+    BOUNDARY,
+    DEFAULT_CHUNK_SIZE,
+    load_codebook,
+    _bytes_to_zero_width,
+    _locate_zero_width_payload,
+    _mode_functions,
+    _parse_header,
+    _rotate_key,
+    _serialize_header
+)
+from src.core.lowmem import _UINT32, _LayoutBuilder, _PoemWriter, _encrypt_blocks
+from src.core.seek import _append_seek_index, _seek_resume_point
+
+# --- FUNGSI APPEND ---
+# encrypt_append melanjutkan ciphertext yang sudah ada alih-alih mengenkripsi
+# ulang seluruh teks: fase kunci Vigenère dilanjutkan dari jumlah huruf di
+# header (alpha), nomor baris/bait dari jumlah baris puisi, dan run header
+# lama disambung dengan run teks baru. Hasilnya sama persis dengan
+# mengenkripsi gabungan teks lama dan teks baru sekaligus.
+APPEND_MODES = ('standard', 'steganography')
+# Ukuran awal ekor file yang dibaca encrypt_append_file (mode steganografi).
+APPEND_TAIL_BYTES = 64 * 1024
+
+def _adopt(values):
+    """Array uint32 header dipakai langsung (diperpanjang di tempat); bentuk lain disalin."""
+    return values if isinstance(values, array) and values.typecode == _UINT32 else array(_UINT32, values)
+
+def _layout_from_header(header_obj):
+    """
+    _LayoutBuilder yang melanjutkan data header v2 yang sudah ada. Array
+    header tidak disalin dan tidak dijumlah: keadaan ekornya diambil dari
+    `tail`, jadi biayanya tidak bergantung pada panjang teks lama.
+    """
+    layout = _LayoutBuilder()
+    layout.alpha = header_obj["alpha"]
+    layout.gaps = _adopt(header_obj["gaps"])
+    layout.runs = _adopt(header_obj["runs"])
+    layout.upper = _adopt(header_obj["upper"])
+    layout.run_text = [header_obj["run_text"]]
+    layout._letters_since_run, layout._lower_since_upper = header_obj["tail"]
+    return layout
+
+def _append_plan(text, body_start, body_end, header_obj, new_text, key, codebook, backend, base_bytes=0):
+    """
+    Inti encrypt_append. text[body_start:body_end] adalah puisi lama (boleh
+    hanya bagian akhirnya, asalkan baris terakhirnya utuh; `base_bytes` adalah
+    offset byte text[body_start] dari awal puisi). Mengembalikan
+    (cut, header_baru, baris_baru): puisi lama dipakai sampai posisi `cut`,
+    lalu disambung `baris_baru`. Jika puisi lama berakhir dengan huruf
+    padding, baris terakhirnya dibuang dan huruf aslinya ditulis ulang.
+    Indeks seek di header lama ikut diperpanjang untuk baris baru.
+    """
+    chunk_size = codebook.chunk_size
+    if header_obj.get("chunk_size", DEFAULT_CHUNK_SIZE) != chunk_size:
+        raise ValueError(f"Ciphertext dibuat dengan chunk_size {header_obj.get('chunk_size', DEFAULT_CHUNK_SIZE)}, "
+                         f"tetapi tema ini memakai chunk_size {chunk_size}.")
+    alpha, padded = header_obj["alpha"], int(header_obj["padded"])
+    cut = body_end
+    while cut > body_start and text[cut - 1].isspace():
+        cut -= 1
+    output = io.StringIO()
+    poem = _PoemWriter(output, codebook, backend)
+    poem.line_no = (alpha + padded) // chunk_size
+    if padded:
+        last_start = max(body_start, text.rfind('\n', body_start, cut) + 1)
+        with PROFILER.stage("inverse"):
+            last_letters = codebook.inverse.get(text[last_start:cut], "")
+        if len(last_letters) != chunk_size:
+            raise ValueError("Baris terakhir puisi tidak dikenali oleh tema ini.")
+        poem.carry = last_letters[:chunk_size - padded]
+        poem.line_no -= 1
+        cut = last_start
+        while cut > body_start and text[cut - 1] == '\n':
+            cut -= 1
+    index = header_obj.get("index")
+    if index is not None:
+        # Diambil sebelum layout memperpanjang array header di tempat.
+        seek_start = _seek_resume_point(header_obj)
+    layout = _layout_from_header(header_obj)
+    first_line = poem.line_no
+    # Huruf baru dienkripsi mulai fase `alpha`, tepat setelah huruf terakhir teks lama.
+    _encrypt_blocks(new_text, _rotate_key(key.upper(), alpha), backend, poem, layout)
+    new_header_obj = layout.header(header_obj["length"] + len(new_text), poem.finish(), chunk_size)
+    new_lines = output.getvalue()
+    if index is not None:
+        with PROFILER.stage("header"):
+            body_bytes = base_bytes + len(text[body_start:cut].encode('utf-8'))
+            new_header_obj["index"] = _append_seek_index(index, body_bytes, new_lines, first_line,
+                                                         chunk_size, new_header_obj, seek_start)
+    return cut, new_header_obj, new_lines
+
+def _stego_payload(header_obj):
+    with PROFILER.stage("header") as stage:
+        stego_payload = _bytes_to_zero_width(pack_header(header_obj))
+        stage.add_text(stego_payload)
+    return stego_payload
+
+def encrypt_append(existing_ciphertext, new_text, key, theme_path, mode='standard', backend=None):
+    """
+    Menambahkan `new_text` ke ciphertext yang sudah ada. Hasilnya sama dengan
+    mengenkripsi teks lama + `new_text`, tetapi hanya `new_text` yang
+    dienkripsi; puisi lama disalin apa adanya. Indeks seek (seek_index=True)
+    ikut diperpanjang. Ciphertext dengan header v1 (JSON) atau steganografi
+    codec v1 didekripsi lalu dienkripsi ulang.
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    if mode not in APPEND_MODES:
+        raise ValueError(f"Append hanya didukung untuk mode: {', '.join(APPEND_MODES)}")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    header_obj = None
+    body_start, body_end = 0, len(existing_ciphertext)
+
+    if mode == 'standard':
+        boundary = existing_ciphertext.find(BOUNDARY)
+        try:
+            if boundary == -1:
+                raise ValueError
+            header_obj = _parse_header(existing_ciphertext[:boundary])
+        except Exception:
+            raise ValueError("Invalid ciphertext format or corrupt header.")
+        body_start = boundary + len(BOUNDARY)
+    else:
+        with PROFILER.stage("parse_header") as stage:
+            located = _locate_zero_width_payload(existing_ciphertext)
+            if located is not None:
+                body_end, payload = located
+                header_obj = unpack_header(payload)[0]
+                stage.add(len(payload))
+    if header_obj is None or header_obj.get("version", 1) < 2:
+        encrypt_func, decrypt_func = _mode_functions(mode)
+        return encrypt_func(decrypt_func(existing_ciphertext, key, codebook, backend) + new_text,
+                            key, codebook, backend)
+
+    cut, new_header_obj, new_lines = _append_plan(existing_ciphertext, body_start, body_end, header_obj,
+                                                  new_text, key, codebook, backend)
+    if mode == 'standard':
+        return "".join((_serialize_header(new_header_obj), BOUNDARY, existing_ciphertext[body_start:cut], new_lines))
+    return "".join((existing_ciphertext[:cut], new_lines, _stego_payload(new_header_obj)))
+
+def _read_tail(f, size, nbytes):
+    """(teks, offset_byte) dari `nbytes` terakhir file; byte UTF-8 yang terpotong di awal dibuang."""
+    start = max(0, size - nbytes)
+    f.seek(start)
+    data = f.read()
+    skip = 0
+    while start and skip < len(data) and data[skip] & 0xC0 == 0x80:
+        skip += 1
+    return data[skip:].decode('utf-8'), start + skip
+
+def encrypt_append_file(path, new_text, key, theme_path, mode='standard', backend=None):
+    """
+    encrypt_append langsung pada file ciphertext. Mode steganografi hanya
+    membaca ekor file (payload dan baris terakhir puisi) lalu menimpa bagian
+    itu di tempat, sehingga biayanya sebanding dengan teks baru ditambah
+    ukuran header. Penimpaan di tempat tidak atomik. Mode standar menyimpan
+    header di awal file, jadi file ditulis ulang lewat file sementara
+    (puisi lama hanya disalin, tidak dienkripsi ulang).
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    if mode not in APPEND_MODES:
+        raise ValueError(f"Append hanya didukung untuk mode: {', '.join(APPEND_MODES)}")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+
+    if mode == 'steganography':
+        with open(path, 'r+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            nbytes = APPEND_TAIL_BYTES
+            while True:
+                tail, tail_offset = _read_tail(f, size, nbytes)
+                try:
+                    located = _locate_zero_width_payload(tail)
+                except ValueError:
+                    # Payload lebih panjang dari ekor yang dibaca.
+                    if not tail_offset:
+                        raise
+                    nbytes *= 4
+                    continue
+                if located is None:
+                    break
+                body_end, payload = located
+                # Baris terakhir puisi harus utuh di dalam ekor.
+                if tail_offset and tail.rfind('\n', 0, body_end) == -1:
+                    nbytes *= 4
+                    continue
+                with PROFILER.stage("parse_header") as stage:
+                    header_obj = unpack_header(payload)[0]
+                    stage.add(len(payload))
+                cut, new_header_obj, new_lines = _append_plan(tail, 0, body_end, header_obj,
+                                                              new_text, key, codebook, backend, tail_offset)
+                f.seek(tail_offset + len(tail[:cut].encode('utf-8')))
+                f.write((new_lines + _stego_payload(new_header_obj)).encode('utf-8'))
+                f.truncate()
+                return
+        # Tanpa payload v2 (codec v1): lewat jalur string di bawah.
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        existing_ciphertext = f.read()
+    result = encrypt_append(existing_ciphertext, new_text, key, codebook, mode, backend)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(result)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
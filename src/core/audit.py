@@ -0,0 +1,315 @@
+# src/core/audit.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from src.core.backends import ALPHABET
+from src.core.engine import (
+    BOUNDARY,
+    MODES,
+    load_codebook,
+    vigenere_process,
+    _poem_to_ciphertext,
+    _split_zero_width_payload,
+    _LEGACY_ZERO_WIDTH
+)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy bersifat opsional, tetapi wajib untuk audit
+    np = None
+
+# --- AUDIT KEKUATAN CIPHERTEXT ---
+# Puisi dipetakan kembali ke ciphertext Vigenère lewat inverse map tema, lalu
+# diserang seperti Vigenère biasa: panjang kunci dicari dengan indeks
+# koinsidensi (IoC) dan metode Kasiski, huruf kunci per kolom dipulihkan
+# dengan uji chi-kuadrat, dan daftar kunci (kamus) dinilai sekaligus.
+# Semua perhitungan berbasis array NumPy: tabel frekuensi per kolom dihitung
+# sekali, sehingga menilai satu kunci hanya berupa indexing dan penjumlahan
+# tanpa mendekripsi teks.
+
+# Perkiraan frekuensi huruf (persen). Nilai dinormalisasi saat dipakai.
+LANGUAGE_FREQUENCIES = {
+    'id': (19.5, 2.6, 0.7, 4.2, 8.0, 0.2, 3.5, 2.5, 8.2, 0.9, 5.2, 3.5, 3.7,
+           9.2, 2.8, 2.7, 0.01, 4.0, 4.0, 5.0, 5.0, 0.1, 0.6, 0.02, 1.8, 0.05),
+    'en': (8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.15, 0.77, 4.0, 2.4,
+           6.7, 7.5, 1.9, 0.095, 6.0, 6.3, 9.1, 2.8, 0.98, 2.4, 0.15, 2.0, 0.074),
+}
+DEFAULT_MAX_KEY_LENGTH = 20
+# Jumlah kunci kamus per potongan (per worker) saat dinilai.
+KEY_BATCH_SIZE = 65536
+# Jumlah jarak Kasiski yang diuji per langkah (membatasi memori matriks).
+_KASISKI_BLOCK = 65536
+# A-Z -> 0..25; karakter kunci lain dianggap seperti ALPHABET.find() == -1, yaitu geser 25.
+_KEY_TABLE = bytes(b - 65 if 65 <= b <= 90 else 25 for b in range(256))
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Audit membutuhkan NumPy (pip install numpy).")
+
+def letter_frequencies(language='id', reference_text=None):
+    """Distribusi huruf A-Z (jumlah 1): dari tabel bahasa atau dari teks rujukan."""
+    _require_numpy()
+    if reference_text is not None:
+        data = np.frombuffer(reference_text.upper().encode('ascii', 'ignore'), dtype=np.uint8)
+        data = data[(data >= 65) & (data <= 90)] - 65
+        # +1 agar huruf yang tidak muncul di teks rujukan tidak berpeluang nol.
+        counts = np.bincount(data, minlength=26) + 1.0
+    else:
+        if language not in LANGUAGE_FREQUENCIES:
+            raise ValueError(f"Bahasa '{language}' tidak dikenal. Pilihan: {', '.join(LANGUAGE_FREQUENCIES)}")
+        counts = np.array(LANGUAGE_FREQUENCIES[language], dtype=np.float64)
+    return counts / counts.sum()
+
+def poem_letters(ciphertext, theme_path, mode='headerless'):
+    """Memetakan puisi kembali menjadi huruf ciphertext Vigenère (A-Z) lewat inverse map tema."""
+    if mode not in MODES:
+        raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+    codebook = load_codebook(theme_path)
+    body = ciphertext
+    if mode == 'standard':
+        if BOUNDARY not in ciphertext:
+            raise ValueError("Invalid ciphertext format or corrupt header.")
+        body = ciphertext.split(BOUNDARY, 1)[1]
+    elif mode == 'steganography':
+        split = _split_zero_width_payload(ciphertext)
+        body = split[0] if split is not None else _LEGACY_ZERO_WIDTH.sub("", ciphertext)
+    return _poem_to_ciphertext(body, codebook)
+
+def _to_indices(cipher_letters):
+    return np.frombuffer(cipher_letters.encode('ascii'), dtype=np.uint8) - np.uint8(65)
+
+def _column_counts(indices, key_length):
+    """Matriks (key_length, 26): frekuensi huruf setiap kolom kunci."""
+    columns = np.arange(len(indices)) % key_length
+    return np.bincount(columns * 26 + indices, minlength=26 * key_length).reshape(key_length, 26)
+
+# --- PANJANG KUNCI ---
+def index_of_coincidence(indices, max_key_length=DEFAULT_MAX_KEY_LENGTH):
+    """IoC rata-rata per kolom untuk panjang kunci 1..max (indeks 0 tidak dipakai)."""
+    ioc = np.zeros(max_key_length + 1)
+    for key_length in range(1, max_key_length + 1):
+        counts = _column_counts(indices, key_length).astype(np.float64)
+        sizes = counts.sum(axis=1)
+        valid = sizes > 1
+        if valid.any():
+            pairs = (counts * (counts - 1)).sum(axis=1)[valid]
+            ioc[key_length] = (pairs / (sizes[valid] * (sizes[valid] - 1))).mean()
+    return ioc
+
+def kasiski_scores(indices, max_key_length=DEFAULT_MAX_KEY_LENGTH):
+    """
+    Metode Kasiski: jarak antar-trigram yang berulang. Skor panjang L adalah
+    bagian jarak yang habis dibagi L, dikali L (1.0 = sama dengan kebetulan).
+    """
+    scores = np.zeros(max_key_length + 1)
+    if len(indices) < 4 or max_key_length < 2:
+        return scores
+    codes = indices[:-2].astype(np.int32) * 676 + indices[1:-1].astype(np.int32) * 26 + indices[2:]
+    order = np.argsort(codes, kind='stable')
+    same = codes[order[1:]] == codes[order[:-1]]
+    distances = (order[1:] - order[:-1])[same]
+    if not len(distances):
+        return scores
+    lengths = np.arange(2, max_key_length + 1)
+    divisible = np.zeros(len(lengths))
+    for start in range(0, len(distances), _KASISKI_BLOCK):
+        block = distances[start:start + _KASISKI_BLOCK, None]
+        divisible += (block % lengths == 0).sum(axis=0)
+    scores[2:] = divisible / len(distances) * lengths
+    return scores
+
+def guess_key_lengths(ioc, kasiski=None, top=3):
+    """
+    Urutan kandidat panjang kunci. Kelipatan panjang kunci yang benar punya
+    IoC yang sama tingginya, jadi panjang terkecil yang IoC-nya mendekati
+    yang terbaik didahulukan; Kasiski dipakai sebagai penentu seri.
+    """
+    lengths = np.arange(1, len(ioc))
+    if not len(lengths):
+        return []
+    values = ioc[1:]
+    baseline = values.min()
+    threshold = baseline + 0.8 * (values.max() - baseline)
+    support = kasiski[1:] if kasiski is not None else np.zeros(len(values))
+    strong = []
+    for n in sorted(lengths[values >= threshold].tolist(), key=lambda n: (n, -support[n - 1])):
+        # Kelipatan panjang yang sudah terpilih tidak memberi kunci baru.
+        if not any(n % m == 0 for m in strong):
+            strong.append(n)
+    rest = sorted((n for n in lengths.tolist() if not any(n % m == 0 for m in strong)),
+                  key=lambda n: (-values[n - 1], n))
+    return (strong + rest)[:top]
+
+# --- PEMULIHAN KUNCI (CHI-KUADRAT) ---
+# _SHIFT_INDEX[s, k] = (k + s) % 26: huruf ciphertext untuk huruf plaintext k dengan geser s.
+_SHIFT_INDEX = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26 if np is not None else None
+
+def _shifted_counts(indices, key_length):
+    """Tensor (key_length, 26 geser, 26 huruf plaintext): frekuensi kolom setelah didekripsi dengan tiap geser."""
+    return _column_counts(indices, key_length)[:, _SHIFT_INDEX].astype(np.float64)
+
+def _chi_squared(observed, expected_frequencies):
+    totals = observed.sum(axis=-1, keepdims=True)
+    expected = totals * expected_frequencies
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi = ((observed - expected) ** 2 / expected).sum(axis=-1)
+    return np.where(totals[..., 0] > 0, chi, 0.0)
+
+def recover_key(indices, key_length, frequencies):
+    """Huruf kunci per kolom dengan chi-kuadrat terkecil; mengembalikan (kunci, chi-kuadrat teks penuh)."""
+    shifted = _shifted_counts(indices, key_length)
+    shifts = _chi_squared(shifted, frequencies).argmin(axis=1)
+    key = "".join(ALPHABET[s] for s in shifts)
+    return key, float(_score_shift_rows(shifted, shifts[None, :], frequencies)[0])
+
+def _score_shift_rows(shifted, shift_rows, frequencies):
+    """Chi-kuadrat seluruh teks untuk setiap baris geser kunci (m, key_length), tanpa mendekripsi."""
+    key_length = shifted.shape[0]
+    decrypted_counts = shifted[np.arange(key_length), shift_rows].sum(axis=1)
+    return _chi_squared(decrypted_counts, frequencies)
+
+# --- PENILAIAN KUNCI KAMUS ---
+def _key_bytes(key_upper):
+    """Satu byte per karakter kunci; karakter di luar A-Z menjadi byte yang dipetakan _KEY_TABLE ke geser 25."""
+    return bytes(ord(char) if char in ALPHABET else 0 for char in key_upper)
+
+# Data milik proses worker; diisi sekali oleh initializer pool.
+_worker_state = None
+
+def _init_audit_worker(indices, frequencies):
+    global _worker_state
+    _worker_state = (indices, frequencies, {})
+
+def _score_key_batch(keys, top):
+    """Menilai satu potongan kunci; mengembalikan (jumlah kunci unik, [(chi2, kunci), ...] terbaik)."""
+    indices, frequencies, shifted_cache = _worker_state
+    # Kunci dipakai dalam huruf kapital oleh engine, jadi "rahasia" dan "RAHASIA" sama.
+    uppers = list(dict.fromkeys(key for key in map(str.upper, map(str.strip, keys)) if key))
+    joined = "".join(uppers)
+    data = joined.encode('ascii') if joined.isascii() else b"".join(map(_key_bytes, uppers))
+    all_shifts = np.frombuffer(data.translate(_KEY_TABLE), dtype=np.uint8)
+    lengths = np.fromiter(map(len, uppers), dtype=np.int64, count=len(uppers))
+    starts = np.cumsum(lengths) - lengths
+    best = []
+    for key_length in np.unique(lengths).tolist():
+        if key_length not in shifted_cache:
+            shifted_cache[key_length] = _shifted_counts(indices, key_length)
+        members = np.flatnonzero(lengths == key_length)
+        rows = all_shifts[starts[members, None] + np.arange(key_length)]
+        scores = _score_shift_rows(shifted_cache[key_length], rows, frequencies)
+        keep = np.argsort(scores, kind='stable')[:top]
+        best.extend((float(scores[i]), uppers[members[i]]) for i in keep)
+    best.sort()
+    return len(uppers), best[:top]
+
+def _batches(keys, size):
+    keys = iter(keys)
+    while True:
+        batch = list(islice(keys, size))
+        if not batch:
+            return
+        yield batch
+
+def score_keys(cipher_letters, keys, frequencies, workers=1, top=10):
+    """
+    Menilai daftar kunci (iterable string) terhadap huruf ciphertext. Skor
+    adalah chi-kuadrat frekuensi huruf hasil dekripsi (kecil = mirip bahasa).
+    Mengembalikan dict berisi kandidat terbaik, jumlah percobaan, dan
+    percobaan per detik. workers > 1 membagi potongan kunci ke beberapa proses
+    (0 atau None = jumlah core).
+    """
+    _require_numpy()
+    indices = _to_indices(cipher_letters)
+    if not workers:
+        workers = os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers <= 1:
+        _init_audit_worker(indices, frequencies)
+        results = [_score_key_batch(batch, top) for batch in _batches(keys, KEY_BATCH_SIZE)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_audit_worker,
+                                 initargs=(indices, frequencies)) as executor:
+            results = list(executor.map(partial(_score_key_batch, top=top), _batches(keys, KEY_BATCH_SIZE)))
+    elapsed = time.perf_counter() - started
+    attempts = sum(count for count, _ in results)
+    best = []
+    seen = set()
+    for chi, key in sorted(candidate for _, candidates in results for candidate in candidates):
+        if key not in seen and len(best) < top:
+            seen.add(key)
+            best.append((chi, key))
+    return {
+        "candidates": best,
+        "attempts": attempts,
+        "seconds": elapsed,
+        "attempts_per_second": attempts / elapsed if elapsed > 0 else 0.0,
+    }
+
+# --- LAPORAN AUDIT ---
+def audit(ciphertext, theme_path, mode='headerless', max_key_length=DEFAULT_MAX_KEY_LENGTH, keys=None,
+          workers=1, language='id', reference_text=None, top=5, preview_chars=80):
+    """
+    Menjalankan seluruh audit: pencarian panjang kunci (IoC dan Kasiski),
+    pemulihan kunci per kolom untuk kandidat panjang terbaik, dan (opsional)
+    penilaian daftar kunci `keys`. Mengembalikan dict untuk format_audit_report.
+    """
+    _require_numpy()
+    cipher_letters = poem_letters(ciphertext, theme_path, mode)
+    if not cipher_letters:
+        raise ValueError("Puisi tidak berisi baris yang dikenali oleh tema ini.")
+    indices = _to_indices(cipher_letters)
+    frequencies = letter_frequencies(language, reference_text)
+    max_key_length = max(1, min(max_key_length, len(indices)))
+
+    started = time.perf_counter()
+    ioc = index_of_coincidence(indices, max_key_length)
+    kasiski = kasiski_scores(indices, max_key_length)
+    recovered = []
+    for key_length in guess_key_lengths(ioc, kasiski, top):
+        key, chi = recover_key(indices, key_length, frequencies)
+        recovered.append({"key_length": key_length, "key": key, "chi_squared": chi,
+                          "preview": vigenere_process(cipher_letters[:preview_chars], key, 'decrypt')})
+    recovered.sort(key=lambda entry: entry["chi_squared"])
+    analysis_seconds = time.perf_counter() - started
+
+    report = {
+        "letters": len(indices),
+        "language_ioc": float((frequencies ** 2).sum()),
+        "ioc": ioc[1:].tolist(),
+        "kasiski": kasiski[1:].tolist(),
+        "recovered": recovered,
+        "analysis_seconds": analysis_seconds,
+        "dictionary": None,
+    }
+    if keys is not None:
+        dictionary = score_keys(cipher_letters, keys, frequencies, workers, top)
+        dictionary["candidates"] = [
+            {"key": key, "chi_squared": chi,
+             "preview": vigenere_process(cipher_letters[:preview_chars], key, 'decrypt')}
+            for chi, key in dictionary["candidates"]
+        ]
+        report["dictionary"] = dictionary
+    return report
+
+def format_audit_report(report):
+    """Laporan audit untuk terminal."""
+    lines = [f"Huruf ciphertext: {report['letters']} (IoC bahasa acuan: {report['language_ioc']:.4f}, acak: {1 / 26:.4f})",
+             "", f"{'panjang':>7}{'IoC':>9}{'Kasiski':>9}"]
+    for key_length, (ioc, kasiski) in enumerate(zip(report["ioc"], report["kasiski"]), start=1):
+        lines.append(f"{key_length:>7}{ioc:>9.4f}{kasiski:>9.2f}")
+    lines.append("")
+    lines.append(f"Kunci yang dipulihkan (chi-kuadrat per kolom, {report['analysis_seconds'] * 1e3:.1f} ms):")
+    for entry in report["recovered"]:
+        lines.append(f"  {entry['key']:<20} panjang {entry['key_length']:>2}  chi2 {entry['chi_squared']:>10.1f}  "
+                     f"{entry['preview']}")
+    dictionary = report["dictionary"]
+    if dictionary is not None:
+        lines.append("")
+        lines.append(f"Kamus: {dictionary['attempts']} kunci dalam {dictionary['seconds']:.2f} detik "
+                     f"({dictionary['attempts_per_second']:,.0f} percobaan/detik)")
+        for entry in dictionary["candidates"]:
+            lines.append(f"  {entry['key']:<20} chi2 {entry['chi_squared']:>10.1f}  {entry['preview']}")
+    return "\n".join(lines)
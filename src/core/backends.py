@@ -0,0 +1,401 @@
+# src/core/backends.py
+
+import re
+from array import array
+from importlib.util import find_spec
+from itertools import compress, groupby, repeat
+from operator import add, mul
+
+# NumPy bersifat opsional dan baru diimpor saat dibutuhkan: impornya (~50 ms)
+# jauh lebih lama dari mengenkripsi pesan pendek. `np` tetap None sampai
+# load_numpy() dipanggil (oleh NumpyBackend atau AutoBackend untuk input besar).
+HAS_NUMPY = find_spec('numpy') is not None
+np = None
+
+def load_numpy():
+    """Mengimpor NumPy sekali dan mengembalikan modulnya, atau None jika tidak terpasang."""
+    global np
+    if np is None and HAS_NUMPY:
+        import numpy
+        np = numpy
+    return np
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# --- TABEL TERJEMAHAN (bytes.translate) ---
+_LETTERS = (ALPHABET + ALPHABET.lower()).encode('ascii')
+_NON_LETTERS = bytes(b for b in range(256) if b not in _LETTERS)
+# 1 untuk bukan-huruf, 0 untuk huruf
+_NON_LETTER_FLAGS = bytes(0 if b in _LETTERS else 1 for b in range(256))
+# 1 untuk huruf kapital A-Z, 0 untuk lainnya
+_UPPER_FLAGS = bytes(1 if 65 <= b <= 90 else 0 for b in range(256))
+# 'A'..'Z' -> 0..25
+_INDEX_TABLE = bytes.maketrans(ALPHABET.encode('ascii'), bytes(range(26)))
+_NON_LETTER_RUN = re.compile(rb'[^A-Za-z]+')
+_UPPER_RUN = re.compile(rb'[A-Z]+')
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+def _shift_table(shift):
+    # Byte di luar A-Z diperlakukan seperti ALPHABET.find() == -1 pada versi asli.
+    table = bytearray(ALPHABET[(shift - 1) % 26].encode('ascii') * 256)
+    for t in range(26):
+        table[65 + t] = 65 + (t + shift) % 26
+    return bytes(table)
+
+_SHIFT_TABLES = [_shift_table(shift) for shift in range(26)]
+
+def _key_shifts(key_upper, mode):
+    sign = 1 if mode == 'encrypt' else -1
+    return [(sign * ALPHABET.find(char)) % 26 for char in key_upper]
+
+# --- BACKEND REFERENSI (PYTHON MURNI) ---
+class PythonBackend:
+    """Backend referensi: satu iterasi Python per karakter, persis seperti versi awal."""
+    name = 'python'
+
+    def vigenere(self, text_upper, key_upper, mode):
+        result = []
+        key_len = len(key_upper)
+        for i, char in enumerate(text_upper):
+            text_num = ALPHABET.find(char)
+            key_num = ALPHABET.find(key_upper[i % key_len])
+            if mode == 'encrypt':
+                result_num = (text_num + key_num) % 26
+            else: # decrypt
+                result_num = (text_num - key_num + 26) % 26
+            result.append(ALPHABET[result_num])
+        return "".join(result)
+
+    def split(self, plaintext):
+        """Memisahkan plaintext menjadi (huruf kapital, peta non-huruf, indeks kapital)."""
+        alpha_chars = [char for char in plaintext if char.isalpha()]
+        alpha_text_upper = "".join(alpha_chars).upper()
+        non_alpha_map = {i: char for i, char in enumerate(plaintext) if not char.isalpha()}
+        uppercase_indices = {i for i, char in enumerate(alpha_chars) if char.isupper()}
+        return alpha_text_upper, non_alpha_map, uppercase_indices
+
+    def split_runs(self, plaintext):
+        """
+        Seperti split(), tetapi dalam bentuk run untuk header v2:
+        (huruf kapital, gaps, runs, run_text, upper). Lihat src/core/header.py.
+        """
+        gaps, runs = array(_UINT32), array(_UINT32)
+        letters, non_letters = [], []
+        pending = 0
+        for is_alpha, group in groupby(plaintext, str.isalpha):
+            chunk = "".join(group)
+            if is_alpha:
+                letters.append(chunk)
+                pending += len(chunk)
+            else:
+                gaps.append(pending)
+                runs.append(len(chunk))
+                non_letters.append(chunk)
+                pending = 0
+        alpha_chars = "".join(letters)
+        upper = array(_UINT32)
+        pending = 0
+        for is_upper, group in groupby(alpha_chars, str.isupper):
+            run_len = sum(1 for _ in group)
+            if is_upper:
+                upper.append(pending)
+                upper.append(run_len)
+                pending = 0
+            else:
+                pending = run_len
+        return alpha_chars.upper(), gaps, runs, "".join(non_letters), upper
+
+    def chunk_ids(self, ciphertext, size=2):
+        """
+        Mengubah ciphertext A-Z (panjang kelipatan `size`) menjadi id chunk
+        berbasis 26, misalnya 26*a+b untuk bigram.
+        """
+        ids = []
+        for i in range(0, len(ciphertext), size):
+            chunk_id = 0
+            for char in ciphertext[i:i + size]:
+                chunk_id = 26 * chunk_id + ALPHABET.find(char)
+            ids.append(chunk_id)
+        return ids
+
+    def gather(self, phrases, ids):
+        return [phrases[i] for i in ids]
+
+    def merge(self, decrypted_upper, uppercase_indices, non_alpha_map):
+        """Mengembalikan huruf kapital dan karakter non-huruf ke posisi aslinya."""
+        uppercase_indices = set(uppercase_indices)
+        decrypted_cased_chars = [
+            char.upper() if i in uppercase_indices else char.lower()
+            for i, char in enumerate(decrypted_upper)
+        ]
+        result_chars = []
+        alpha_idx = 0
+        total_len = len(decrypted_cased_chars) + len(non_alpha_map)
+        for i in range(total_len):
+            if i in non_alpha_map:
+                result_chars.append(non_alpha_map[i])
+            else:
+                if alpha_idx < len(decrypted_cased_chars):
+                    result_chars.append(decrypted_cased_chars[alpha_idx])
+                    alpha_idx += 1
+        return "".join(result_chars)
+
+_python_backend = PythonBackend()
+
+# --- BACKEND bytes.translate ---
+class TranslateBackend(PythonBackend):
+    """
+    Backend tanpa dependensi: semua operasi per karakter dijalankan sebagai
+    operasi bytes utuh (translate, slicing bertingkat, itertools.compress).
+    Teks non-ASCII dialihkan ke backend referensi agar hasilnya tetap identik.
+    """
+    name = 'translate'
+
+    def vigenere(self, text_upper, key_upper, mode):
+        try:
+            data = text_upper.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.vigenere(text_upper, key_upper, mode)
+        if not data or not key_upper:
+            return _python_backend.vigenere(text_upper, key_upper, mode)
+        key_len = len(key_upper)
+        result = bytearray(len(data))
+        for j, shift in enumerate(_key_shifts(key_upper[:len(data)], mode)):
+            result[j::key_len] = data[j::key_len].translate(_SHIFT_TABLES[shift])
+        return result.decode('ascii')
+
+    def split(self, plaintext):
+        try:
+            raw = plaintext.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.split(plaintext)
+        letters = raw.translate(None, _NON_LETTERS)
+        non_letters = raw.translate(None, _LETTERS).decode('ascii')
+        non_alpha_map = dict(zip(compress(range(len(raw)), raw.translate(_NON_LETTER_FLAGS)), non_letters))
+        uppercase_indices = set(compress(range(len(letters)), letters.translate(_UPPER_FLAGS)))
+        return letters.upper().decode('ascii'), non_alpha_map, uppercase_indices
+
+    def split_runs(self, plaintext):
+        try:
+            raw = plaintext.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.split_runs(plaintext)
+        gaps, runs = array(_UINT32), array(_UINT32)
+        prev = 0
+        for match in _NON_LETTER_RUN.finditer(raw):
+            start, end = match.span()
+            gaps.append(start - prev)
+            runs.append(end - start)
+            prev = end
+        letters = raw.translate(None, _NON_LETTERS)
+        upper = array(_UINT32)
+        prev = 0
+        for match in _UPPER_RUN.finditer(letters):
+            start, end = match.span()
+            upper.append(start - prev)
+            upper.append(end - start)
+            prev = end
+        return letters.upper().decode('ascii'), gaps, runs, raw.translate(None, _LETTERS).decode('ascii'), upper
+
+    def chunk_ids(self, ciphertext, size=2):
+        idx = ciphertext.encode('ascii').translate(_INDEX_TABLE)
+        ids = idx[0::size]
+        for offset in range(1, size):
+            ids = map(add, map(mul, ids, repeat(26)), idx[offset::size])
+        return list(ids)
+
+    def gather(self, phrases, ids):
+        return list(map(phrases.__getitem__, ids))
+
+    def merge(self, decrypted_upper, uppercase_indices, non_alpha_map):
+        try:
+            cased = bytearray(decrypted_upper.encode('ascii').lower())
+        except UnicodeEncodeError:
+            return _python_backend.merge(decrypted_upper, uppercase_indices, non_alpha_map)
+        n = len(cased)
+        for i in set(uppercase_indices):
+            if 0 <= i < n and 97 <= cased[i] <= 122:
+                cased[i] -= 32
+        return _interleave(cased.decode('ascii'), non_alpha_map)
+
+def _interleave(letters, non_alpha_map):
+    # Setara dengan loop per indeks pada backend referensi, tetapi huruf di
+    # antara dua karakter non-huruf disalin sebagai satu slice.
+    total_len = len(letters) + len(non_alpha_map)
+    parts = []
+    alpha_idx = 0
+    prev = 0
+    for pos in sorted(non_alpha_map):
+        if pos < 0:
+            continue
+        if pos >= total_len:
+            break
+        gap = pos - prev
+        parts.append(letters[alpha_idx:alpha_idx + gap])
+        parts.append(non_alpha_map[pos])
+        alpha_idx += gap
+        prev = pos + 1
+    parts.append(letters[alpha_idx:alpha_idx + total_len - prev])
+    return "".join(parts)
+
+# --- BACKEND NUMPY ---
+class NumpyBackend(TranslateBackend):
+    """Backend berbasis array NumPy; NumPy diimpor saat backend ini pertama kali dibuat."""
+    name = 'numpy'
+
+    def __init__(self):
+        load_numpy()
+
+    def vigenere(self, text_upper, key_upper, mode):
+        try:
+            data = text_upper.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.vigenere(text_upper, key_upper, mode)
+        if not data or not key_upper:
+            return _python_backend.vigenere(text_upper, key_upper, mode)
+        text_nums = np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 65
+        text_nums[(text_nums < 0) | (text_nums > 25)] = -1
+        key_nums = np.resize(np.array([ALPHABET.find(c) for c in key_upper], dtype=np.int16), len(data))
+        if mode == 'encrypt':
+            result_nums = (text_nums + key_nums) % 26
+        else:
+            result_nums = (text_nums - key_nums + 26) % 26
+        return (result_nums + 65).astype(np.uint8).tobytes().decode('ascii')
+
+    def split(self, plaintext):
+        try:
+            raw = plaintext.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.split(plaintext)
+        codes = np.frombuffer(raw, dtype=np.uint8)
+        is_letter = ((codes | 0x20) - np.uint8(97)) < 26
+        letters = codes[is_letter]
+        non_letters = raw.translate(None, _LETTERS).decode('ascii')
+        non_alpha_map = dict(zip(np.flatnonzero(~is_letter).tolist(), non_letters))
+        uppercase_indices = set(np.flatnonzero(letters < 97).tolist())
+        return (letters & 0xDF).tobytes().decode('ascii'), non_alpha_map, uppercase_indices
+
+    def split_runs(self, plaintext):
+        try:
+            raw = plaintext.encode('ascii')
+        except UnicodeEncodeError:
+            return _python_backend.split_runs(plaintext)
+        codes = np.frombuffer(raw, dtype=np.uint8)
+        is_letter = ((codes | 0x20) - np.uint8(97)) < 26
+        letters = codes[is_letter]
+        gaps, runs = _np_runs(~is_letter)
+        lower, upper_lens = _np_runs(letters < 97)
+        upper = np.empty(2 * len(lower), dtype=np.uint32)
+        upper[0::2] = lower
+        upper[1::2] = upper_lens
+        non_letters = raw.translate(None, _LETTERS).decode('ascii')
+        return ((letters & 0xDF).tobytes().decode('ascii'), _np_to_array(gaps), _np_to_array(runs),
+                non_letters, _np_to_array(upper))
+
+    def chunk_ids(self, ciphertext, size=2):
+        nums = np.frombuffer(ciphertext.encode('ascii'), dtype=np.uint8).astype(np.int32) - 65
+        ids = nums[0::size]
+        for offset in range(1, size):
+            ids = ids * 26 + nums[offset::size]
+        return ids
+
+    def gather(self, phrases, ids):
+        if len(ids) < len(phrases) or not isinstance(phrases, list):
+            # Tabel objek seukuran codebook (hingga 26^4 frasa) lebih mahal
+            # dibuat daripada langsung mengindeks list untuk input pendek;
+            # tabel frasa .wcb (MappedPhrases) sengaja tidak disalin utuh.
+            return list(map(phrases.__getitem__, ids.tolist()))
+        table = np.empty(len(phrases), dtype=object)
+        table[:] = phrases
+        return table[ids].tolist()
+
+    def merge(self, decrypted_upper, uppercase_indices, non_alpha_map):
+        try:
+            cased = np.frombuffer(decrypted_upper.encode('ascii').lower(), dtype=np.uint8).copy()
+        except UnicodeEncodeError:
+            return _python_backend.merge(decrypted_upper, uppercase_indices, non_alpha_map)
+        upper = np.fromiter(set(uppercase_indices), dtype=np.int64)
+        upper = upper[(upper >= 0) & (upper < len(cased))]
+        upper = upper[(cased[upper] >= 97) & (cased[upper] <= 122)]
+        cased[upper] -= 32
+        return _interleave(cased.tobytes().decode('ascii'), non_alpha_map)
+
+def _np_runs(mask):
+    # Run bernilai True pada mask: (jarak dari akhir run sebelumnya, panjang run)
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    prev_ends = np.concatenate(([0], ends[:-1]))
+    return starts - prev_ends, ends - starts
+
+def _np_to_array(values):
+    result = array(_UINT32)
+    result.frombytes(np.ascontiguousarray(values, dtype=np.uint32).tobytes())
+    return result
+
+# --- BACKEND OTOMATIS (DEFAULT) ---
+# Mulai ukuran input ini (karakter), AutoBackend mengimpor NumPy jika belum
+# dimuat: di sekitar 512 KiB, waktu yang dihemat split_runs/chunk_ids/gather
+# NumPy kira-kira sama dengan ongkos impornya.
+NUMPY_IMPORT_MIN_CHARS = 512 * 1024
+
+def numpy_for(size):
+    """NumPy untuk input sebesar `size` (karakter atau item): None jika belum dimuat dan input masih kecil."""
+    if np is None and size >= NUMPY_IMPORT_MIN_CHARS:
+        return load_numpy()
+    return np
+
+class AutoBackend(TranslateBackend):
+    """
+    Backend default jika NumPy terpasang: operasi berbasis array memakai NumPy
+    hanya jika NumPy sudah dimuat di proses ini atau inputnya cukup besar
+    (NUMPY_IMPORT_MIN_CHARS), sehingga perintah CLI untuk pesan pendek tidak
+    membayar impor NumPy. Vigenère selalu lewat bytes.translate, yang lebih
+    cepat dari versi NumPy untuk semua ukuran.
+    """
+    name = 'auto'
+
+    def _pick(self, size):
+        return _instance('numpy' if numpy_for(size) is not None else 'translate')
+
+    def split(self, plaintext):
+        return self._pick(len(plaintext)).split(plaintext)
+
+    def split_runs(self, plaintext):
+        return self._pick(len(plaintext)).split_runs(plaintext)
+
+    def chunk_ids(self, ciphertext, size=2):
+        return self._pick(len(ciphertext)).chunk_ids(ciphertext, size)
+
+    def gather(self, phrases, ids):
+        if np is not None and isinstance(ids, np.ndarray):
+            return _instance('numpy').gather(phrases, ids)
+        return TranslateBackend.gather(self, phrases, ids)
+
+    def merge(self, decrypted_upper, uppercase_indices, non_alpha_map):
+        return self._pick(len(decrypted_upper)).merge(decrypted_upper, uppercase_indices, non_alpha_map)
+
+# --- PEMILIHAN BACKEND ---
+BACKENDS = {'python': PythonBackend, 'translate': TranslateBackend}
+if HAS_NUMPY:
+    BACKENDS['numpy'] = NumpyBackend
+    BACKENDS['auto'] = AutoBackend
+
+DEFAULT_BACKEND = 'auto' if HAS_NUMPY else 'translate'
+
+_instances = {}
+
+def get_backend(backend=None):
+    """Mengembalikan instance backend berdasarkan nama (None = backend default)."""
+    if backend is None:
+        backend = DEFAULT_BACKEND
+    elif not isinstance(backend, str):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' tidak tersedia. Pilihan: {', '.join(sorted(BACKENDS))}")
+    return _instance(backend)
+
+def _instance(backend):
+    if backend not in _instances:
+        _instances[backend] = BACKENDS[backend]()
+    return _instances[backend]
@@ -0,0 +1,80 @@
+# src/core/batch.py
+
+import os
+from functools import partial
+
+from src.core.engine import load_codebook, _mode_functions
+
+# --- FUNGSI BATCH (PROCESS POOL) ---
+# Codebook milik proses worker; diisi sekali oleh initializer pool.
+_worker_codebook = None
+
+def _init_batch_worker(codebook):
+    global _worker_codebook
+    _worker_codebook = codebook
+
+def _run_batch_job(direction, mode, backend, return_exceptions, job):
+    text, key = job
+    func = _mode_functions(mode)[0 if direction == 'encrypt' else 1]
+    try:
+        return func(text, key, _worker_codebook, backend=backend)
+    except Exception as e:
+        if return_exceptions:
+            return e
+        raise
+
+def _run_many(direction, jobs, theme_path, mode, workers, chunksize, return_exceptions, backend, cache=None):
+    _mode_functions(mode)
+    jobs = list(jobs)
+    codebook = load_codebook(theme_path)
+    if cache is not None:
+        return _run_many_cached(direction, jobs, codebook, mode, workers, chunksize, return_exceptions, backend, cache)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    task = partial(_run_batch_job, direction, mode, backend, return_exceptions)
+    if workers == 1:
+        _init_batch_worker(codebook)
+        return [task(job) for job in jobs]
+    if chunksize is None:
+        # Beberapa potongan per worker agar beban tetap seimbang tanpa
+        # membayar ongkos IPC untuk setiap pesan.
+        chunksize = max(1, len(jobs) // (workers * 4))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(codebook,)) as executor:
+        return list(executor.map(task, jobs, chunksize=chunksize))
+
+def _run_many_cached(direction, jobs, codebook, mode, workers, chunksize, return_exceptions, backend, cache):
+    """Seperti _run_many, tetapi hanya pesan yang belum ada di cache yang dikirim ke pool."""
+    from src.core.result_cache import result_key
+    cache.watch_theme(codebook.path, codebook.fingerprint)
+    keys = [result_key(direction, mode, codebook.fingerprint, key, text) for text, key in jobs]
+    results = list(map(cache.get, keys))
+    # Pesan yang sama dalam satu batch cukup dikerjakan sekali.
+    pending = {}
+    for i, (cache_key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            pending.setdefault(cache_key, []).append(i)
+    computed = _run_many(direction, [jobs[indices[0]] for indices in pending.values()], codebook, mode,
+                         workers, chunksize, return_exceptions, backend)
+    for (cache_key, indices), result in zip(pending.items(), computed):
+        if not isinstance(result, Exception):
+            cache.put(cache_key, codebook.fingerprint, result)
+        for i in indices:
+            results[i] = result
+    return results
+
+def encrypt_many(jobs, theme_path, mode='standard', workers=None, chunksize=None, return_exceptions=False, backend=None,
+                 cache=None):
+    """
+    Mengenkripsi banyak pesan sekaligus. `jobs` adalah iterable (teks, kunci);
+    hasil dikembalikan sesuai urutan input. Dengan return_exceptions=True,
+    pesan yang gagal menghasilkan objek Exception alih-alih menghentikan batch.
+    cache (ResultCache) melewati pesan yang hasilnya sudah tersimpan.
+    """
+    return _run_many('encrypt', jobs, theme_path, mode, workers, chunksize, return_exceptions, backend, cache)
+
+def decrypt_many(jobs, theme_path, mode='standard', workers=None, chunksize=None, return_exceptions=False, backend=None,
+                 cache=None):
+    """Pasangan dekripsi untuk encrypt_many; `jobs` adalah iterable (ciphertext, kunci)."""
+    return _run_many('decrypt', jobs, theme_path, mode, workers, chunksize, return_exceptions, backend, cache)
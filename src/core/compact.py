@@ -0,0 +1,278 @@
+# src/core/compact.py
+
+import base64
+import struct
+from math import gcd
+
+from src.core.backends import get_backend, numpy_for
+from src.core.header import pack_header, new_header
+from src.core.engine import (
+    BOUNDARY,
+    MODES,
+    PADDING_CHAR,
+    load_codebook,
+    vigenere_process,
+    _assemble_stanzas,
+    _bytes_to_zero_width,
+    _check_headerless_length,
+    _chunk_keys,
+    _pad_count,
+    _header_from_bytes,
+    _restore_plaintext,
+    _split_zero_width_payload
+)
+
+# --- BENTUK RINGKAS (ID CHUNK TERKEMAS) ---
+# Setiap baris puisi hanya mewakili satu id chunk (0..26^chunk_size-1), tetapi
+# disimpan sebagai frasa ~25 byte. Bentuk ringkas menyimpan id-nya saja:
+#   prefix  : struct _PREFIX di bawah
+#   header  : byte header apa adanya (header biner v2 atau JSON v1), jika ada
+#   ids     : id chunk dengan lebar tetap (10 bit untuk bigram), bit terendah
+#             lebih dulu, dikemas rapat tanpa padding antar-id
+#   varian  : hanya jika ada baris varian tema homofonik: 1 byte lebar, lalu
+#             nomor varian setiap baris (0 = frasa utama) dikemas seperti ids
+# Sidik tema (Codebook.fingerprint) memastikan puisi hanya dirender ulang
+# dengan tabel frasa yang sama. Puisi yang dirender identik dengan keluaran
+# core_encrypt (juga puisi homofonik), sehingga konversi dua arah tidak
+# kehilangan apa pun; dekripsi bentuk ringkas hanya membaca ids dan tidak
+# membutuhkan tema sama sekali.
+COMPACT_MAGIC = b'WCI'
+COMPACT_VERSION = 1
+COMPACT_SUFFIX = '.wci'
+
+_FLAG_HEADER = 0x01
+_FLAG_VARIANTS = 0x02
+
+# magic, versi, flag, chunk_size, sidik tema, jumlah id, panjang header
+_PREFIX = struct.Struct('<3sBBB8sQI')
+
+def id_bits(chunk_size):
+    """Lebar satu id chunk dalam bit: 5, 10, 15, atau 19 untuk chunk_size 1-4."""
+    return (26 ** chunk_size - 1).bit_length()
+
+def pack_ids(ids, bits):
+    """Mengemas id (masing-masing < 2**bits) menjadi aliran bit, bit terendah lebih dulu."""
+    np = numpy_for(len(ids))
+    if np is not None:
+        values = np.asarray(ids, dtype=np.uint32)
+        bit_matrix = (values[:, None] >> np.arange(bits, dtype=np.uint32)) & 1
+        return np.packbits(bit_matrix.astype(np.uint8).ravel(), bitorder='little').tobytes()
+    # Tanpa NumPy: sekelompok id yang pas menjadi byte utuh digabung sebagai satu int.
+    ids = ids.tolist() if hasattr(ids, 'tolist') else list(ids)
+    group = 8 // gcd(bits, 8)
+    group_bytes = group * bits // 8
+    shifts = [bits * i for i in range(group)]
+    out = bytearray()
+    for i in range(0, len(ids), group):
+        value = 0
+        for shift, chunk_id in zip(shifts, ids[i:i + group]):
+            value |= chunk_id << shift
+        out += value.to_bytes(group_bytes, 'little')
+    return bytes(out[:(len(ids) * bits + 7) // 8])
+
+def unpack_ids(data, count, bits):
+    """Kebalikan pack_ids: mengembalikan list `count` id."""
+    if len(data) < (count * bits + 7) // 8:
+        raise ValueError("Data id bentuk ringkas terpotong.")
+    np = numpy_for(count)
+    if np is not None:
+        bit_array = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder='little')[:count * bits]
+        weights = np.left_shift(np.uint32(1), np.arange(bits, dtype=np.uint32))
+        return (bit_array.reshape(count, bits).astype(np.uint32) @ weights).tolist()
+    group = 8 // gcd(bits, 8)
+    group_bytes = group * bits // 8
+    mask = (1 << bits) - 1
+    ids = []
+    for start in range(0, (count + group - 1) // group * group_bytes, group_bytes):
+        value = int.from_bytes(data[start:start + group_bytes], 'little')
+        for _ in range(group):
+            ids.append(value & mask)
+            value >>= bits
+    del ids[count:]
+    return ids
+
+class CompactCiphertext:
+    """
+    Isi bentuk ringkas: chunk_size, sidik tema, list id chunk, byte header
+    (None = headerless), dan nomor varian per baris (None = semua frasa utama).
+    """
+
+    def __init__(self, chunk_size, fingerprint, ids, header, variants=None):
+        self.chunk_size = chunk_size
+        self.fingerprint = fingerprint
+        self.ids = ids
+        self.header = header
+        self.variants = variants
+
+    def __repr__(self):
+        return f"CompactCiphertext(chunk_size={self.chunk_size}, {len(self.ids)} id, header={self.header is not None})"
+
+def pack_compact(ids, chunk_size, fingerprint, header=None, variants=None):
+    """Membuat bytes bentuk ringkas dari id chunk, byte header, dan nomor varian (keduanya opsional)."""
+    flags = _FLAG_HEADER if header is not None else 0
+    header = header or b""
+    body = pack_ids(ids, id_bits(chunk_size))
+    if variants is not None:
+        flags |= _FLAG_VARIANTS
+        width = max(max(variants, default=0).bit_length(), 1)
+        body += bytes([width]) + pack_ids(variants, width)
+    prefix = _PREFIX.pack(COMPACT_MAGIC, COMPACT_VERSION, flags, chunk_size, fingerprint, len(ids), len(header))
+    return prefix + header + body
+
+def unpack_compact(data):
+    """Membaca bytes bentuk ringkas menjadi CompactCiphertext."""
+    try:
+        magic, version, flags, chunk_size, fingerprint, count, header_len = _PREFIX.unpack_from(data)
+    except struct.error:
+        raise ValueError("Bentuk ringkas terpotong.")
+    if magic != COMPACT_MAGIC:
+        raise ValueError("Data bukan bentuk ringkas Wayang-Cipher.")
+    if version != COMPACT_VERSION:
+        raise ValueError(f"Versi bentuk ringkas {version} tidak didukung.")
+    if not 1 <= chunk_size <= 4:
+        raise ValueError(f"chunk_size bentuk ringkas tidak valid: {chunk_size}.")
+    start = _PREFIX.size
+    header = bytes(data[start:start + header_len]) if flags & _FLAG_HEADER else None
+    if header is not None and len(header) != header_len:
+        raise ValueError("Header bentuk ringkas terpotong.")
+    body = bytes(data[start + header_len:])
+    ids_len = (count * id_bits(chunk_size) + 7) // 8
+    ids = unpack_ids(body[:ids_len], count, id_bits(chunk_size))
+    variants = None
+    if flags & _FLAG_VARIANTS:
+        if len(body) <= ids_len or not 1 <= body[ids_len] <= 32:
+            raise ValueError("Data varian bentuk ringkas terpotong atau rusak.")
+        variants = unpack_ids(body[ids_len + 1:], count, body[ids_len])
+    return CompactCiphertext(chunk_size, fingerprint, ids, header, variants)
+
+# --- KONVERSI PUISI <-> BENTUK RINGKAS ---
+def _variant_numbers(codebook):
+    """Frasa varian -> nomor variannya dalam chunk (1, 2, ...), urutan sama dengan HomophoneTable."""
+    numbers, seen = {}, {}
+    for chunk, phrase in codebook.variants:
+        seen[chunk] = seen.get(chunk, 0) + 1
+        numbers[phrase] = seen[chunk]
+    return numbers
+
+def poem_ids(poetic_body, codebook, backend=None):
+    """
+    Id chunk dan nomor varian setiap baris puisi, lewat inverse map tema; baris
+    yang tidak dikenali menjadi ValueError. Nomor varian None jika semua baris
+    memakai frasa utama.
+    """
+    inverse_get = codebook.inverse.get
+    variant_get = _variant_numbers(codebook).get if codebook.variants else None
+    chunks = []
+    variants = []
+    for line in poetic_body.strip().split('\n'):
+        if not line:
+            continue
+        chunk = inverse_get(line)
+        if chunk is None:
+            raise ValueError(f"Baris puisi tidak dikenali oleh tema ini: {line!r}")
+        chunks.append(chunk)
+        if variant_get is not None:
+            variants.append(variant_get(line, 0))
+    ids = get_backend(backend).chunk_ids("".join(chunks), codebook.chunk_size)
+    return ids, (variants if any(variants) else None)
+
+def render_poem(compact, codebook):
+    """Merender puisi dari CompactCiphertext; hasilnya sama persis dengan keluaran core_encrypt."""
+    if compact.fingerprint != codebook.fingerprint:
+        raise ValueError("Sidik tema tidak cocok: bentuk ringkas ini dibuat dengan tema lain.")
+    if compact.chunk_size != codebook.chunk_size:
+        raise ValueError(f"Bentuk ringkas memakai chunk_size {compact.chunk_size}, "
+                         f"tetapi tema ini memakai chunk_size {codebook.chunk_size}.")
+    if compact.variants is None:
+        return _assemble_stanzas(list(map(codebook.phrases.__getitem__, compact.ids))).strip()
+    table = codebook.homophones
+    if table is None:
+        raise ValueError("Bentuk ringkas ini memakai varian, tetapi tema ini tidak homofonik.")
+    lines = []
+    for chunk_id, variant in zip(compact.ids, compact.variants):
+        if variant >= table.count[chunk_id]:
+            raise ValueError(f"Nomor varian {variant} tidak ada untuk id chunk {chunk_id}.")
+        lines.append(table.phrases[table.base[chunk_id] + variant])
+    return _assemble_stanzas(lines).strip()
+
+def to_compact(ciphertext, theme_path, mode='standard', backend=None):
+    """Mengubah ciphertext puisi (mode standar, headerless, atau steganografi) menjadi bentuk ringkas."""
+    codebook = load_codebook(theme_path)
+    header = None
+    body = ciphertext
+    if mode == 'standard':
+        try:
+            encoded_header, body = ciphertext.split(BOUNDARY, 1)
+            header = base64.b64decode(encoded_header, validate=True)
+        except Exception:
+            raise ValueError("Invalid ciphertext format or corrupt header.")
+    elif mode == 'steganography':
+        split = _split_zero_width_payload(ciphertext)
+        if split is None:
+            raise ValueError("Bentuk ringkas hanya mendukung payload steganografi v2.")
+        body, header = split
+    elif mode != 'headerless':
+        raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+    ids, variants = poem_ids(body, codebook, backend)
+    return pack_compact(ids, codebook.chunk_size, codebook.fingerprint, header, variants)
+
+def from_compact(data, theme_path, mode=None):
+    """
+    Merender bentuk ringkas kembali menjadi ciphertext puisi. mode=None memilih
+    'standard' jika ada header dan 'headerless' jika tidak.
+    """
+    compact = unpack_compact(data)
+    if mode is None:
+        mode = 'standard' if compact.header is not None else 'headerless'
+    if mode in ('standard', 'steganography') and compact.header is None:
+        raise ValueError(f"Bentuk ringkas ini tidak memiliki header untuk mode {mode}.")
+    poem = render_poem(compact, load_codebook(theme_path))
+    if mode == 'standard':
+        return f"{base64.b64encode(compact.header).decode('ascii')}{BOUNDARY}{poem}"
+    if mode == 'steganography':
+        return poem + _bytes_to_zero_width(compact.header)
+    if mode == 'headerless':
+        return poem
+    raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+
+# --- ENKRIPSI/DEKRIPSI LANGSUNG ---
+def encrypt_compact(plaintext, key, theme_path, headerless=False, backend=None):
+    """
+    Mengenkripsi langsung ke bentuk ringkas tanpa membuat puisi. Hasilnya sama
+    dengan to_compact(encrypt(...)) (atau encrypt_headerless untuk headerless=True).
+    """
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    chunk_size = codebook.chunk_size
+    if headerless:
+        alpha_text_upper = backend.split(plaintext)[0]
+        _check_headerless_length(len(alpha_text_upper), chunk_size)
+        vigenere_ciphertext = vigenere_process(alpha_text_upper, key.upper(), 'encrypt', backend)
+        header = None
+    else:
+        alpha_text_upper, gaps, runs, run_text, upper = backend.split_runs(plaintext)
+        vigenere_ciphertext = vigenere_process(alpha_text_upper, key.upper(), 'encrypt', backend)
+        padded = _pad_count(len(vigenere_ciphertext), chunk_size)
+        vigenere_ciphertext += PADDING_CHAR * padded
+        header = pack_header(new_header(len(alpha_text_upper), len(plaintext), gaps, runs, run_text, upper,
+                                        padded, chunk_size))
+    ids = backend.chunk_ids(vigenere_ciphertext, chunk_size)
+    return pack_compact(ids, chunk_size, codebook.fingerprint, header)
+
+def decrypt_compact(data, key, backend=None):
+    """
+    Mendekripsi bentuk ringkas. Id chunk langsung menjadi huruf Vigenère, jadi
+    tema tidak dibutuhkan dan tidak ada pencarian frasa. Tanpa header, hasilnya
+    huruf kapital saja seperti decrypt_headerless.
+    """
+    compact = unpack_compact(data)
+    keys = _chunk_keys(compact.chunk_size)
+    vigenere_ciphertext = "".join(map(keys.__getitem__, compact.ids))
+    if compact.header is None:
+        return vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt', backend)
+    header_obj = _header_from_bytes(compact.header)
+    padded = int(header_obj["padded"])
+    if padded:
+        vigenere_ciphertext = vigenere_ciphertext[:-padded]
+    decrypted_upper = vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt', backend)
+    return _restore_plaintext(decrypted_upper, header_obj, get_backend(backend))
@@ -0,0 +1,153 @@
+# src/core/detect.py
+
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+
+from src.core.engine import BOUNDARY, STEGO_DIGITS, STEGO_MARKER, STREAM_MAGIC, ZERO_WIDTH_SPACE, ZERO_WIDTH_NON_JOINER, load_codebook, _mode_functions
+from src.core.matching import normalize_line
+
+# --- DETEKSI OTOMATIS TEMA DAN MODE ---
+# `decrypt --auto` tidak perlu tahu tema maupun mode ciphertext:
+#   1. mode ditebak dari bentuk teks saja (header base64 + BOUNDARY di awal,
+#      payload tak kasat mata di akhir, selain itu headerless);
+#   2. tema ditebak dari satu lintasan atas sampel baris puisi lewat indeks
+#      gabungan frasa -> (tema, chunk) dari semua tema di direktori.
+# Setelah itu dekripsi sebenarnya hanya dijalankan sekali.
+DEFAULT_THEME_DIR = "data"
+# Jumlah baris (tidak kosong) minimal yang diperiksa untuk menebak tema.
+# Jika tema teratas masih seri dengan tema lain, sampel diperpanjang.
+SAMPLE_LINES = 32
+
+_HEADER_PREFIX = re.compile(r'[A-Za-z0-9+/=]+\r?\n' + re.escape(BOUNDARY.strip('\n')) + r'\r?\n')
+_LEGACY_STEGO_CHARS = (ZERO_WIDTH_SPACE, ZERO_WIDTH_NON_JOINER)
+_STRIP_STEGO = dict.fromkeys(map(ord, STEGO_DIGITS + STEGO_MARKER))
+
+def list_theme_paths(theme_dir=DEFAULT_THEME_DIR):
+    """Semua tema JSON di `theme_dir`, dengan nama file tanpa ekstensi sebagai kunci."""
+    return {
+        os.path.splitext(name)[0]: os.path.join(theme_dir, name)
+        for name in sorted(os.listdir(theme_dir)) if name.endswith('.json')
+    }
+
+def sniff_mode(text):
+    """
+    Menebak mode ciphertext hanya dari awal dan akhir teks: 'standard',
+    'steganography', 'headerless', atau 'stream' (format encrypt --stream).
+    """
+    if text.startswith(STREAM_MAGIC):
+        return 'stream'
+    if _HEADER_PREFIX.match(text):
+        return 'standard'
+    tail = text.rstrip()
+    if tail.endswith(STEGO_MARKER) or tail.endswith(_LEGACY_STEGO_CHARS):
+        return 'steganography'
+    return 'headerless'
+
+def _iter_lines(text, start=0):
+    """Baris-baris teks mulai dari `start` tanpa memecah seluruh teks sekaligus."""
+    end = len(text)
+    while start < end:
+        stop = text.find('\n', start)
+        if stop < 0:
+            stop = end
+        yield text[start:stop]
+        start = stop + 1
+
+class ThemeIndex:
+    """
+    Indeks gabungan semua tema: kunci frasa ternormalisasi -> tuple (id tema,
+    chunk). Frasa yang dipakai beberapa tema memiliki beberapa entri.
+    """
+
+    def __init__(self, theme_paths):
+        self.paths = list(theme_paths)
+        postings = defaultdict(list)
+        for theme_id, path in enumerate(self.paths):
+            for phrase, chunk in load_codebook(path).inverse.items():
+                postings[normalize_line(phrase)].append((theme_id, chunk))
+        self.postings = {key: tuple(entries) for key, entries in postings.items()}
+
+    def lookup(self, line):
+        """Semua (path tema, chunk) untuk satu baris puisi."""
+        return [(self.paths[theme_id], chunk) for theme_id, chunk in self.postings.get(normalize_line(line), ())]
+
+    def vote(self, lines, sample_lines=SAMPLE_LINES):
+        """
+        Menghitung suara tema untuk baris-baris sampel. Mengembalikan (Counter
+        id tema -> jumlah baris cocok, jumlah baris yang diperiksa).
+        """
+        votes = Counter()
+        sampled = 0
+        for line in lines:
+            key = normalize_line(line.translate(_STRIP_STEGO))
+            if not key:
+                continue
+            sampled += 1
+            votes.update({theme_id for theme_id, _ in self.postings.get(key, ())})
+            if sampled >= sample_lines:
+                ranked = votes.most_common(2)
+                if ranked and (len(ranked) == 1 or ranked[0][1] > ranked[1][1]):
+                    break
+        return votes, sampled
+
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+def theme_index(theme_dir=DEFAULT_THEME_DIR):
+    """ThemeIndex untuk `theme_dir`; dibangun ulang hanya jika daftar tema atau mtime-nya berubah."""
+    paths = list(list_theme_paths(theme_dir).values())
+    if not paths:
+        raise ValueError(f"Tidak ada file tema di '{theme_dir}'.")
+    version = tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+    cache_key = os.path.abspath(theme_dir)
+    with _index_cache_lock:
+        cached = _index_cache.get(cache_key)
+        if cached is None or cached[0] != version:
+            cached = _index_cache[cache_key] = (version, ThemeIndex(paths))
+        return cached[1]
+
+class Detection:
+    """Hasil detect(): mode, path tema, dan jumlah baris sampel yang cocok dengan tema itu."""
+
+    def __init__(self, mode, theme_path, hits, sampled):
+        self.mode = mode
+        self.theme_path = theme_path
+        self.hits = hits
+        self.sampled = sampled
+
+    def summary(self):
+        return f"mode {self.mode}, tema {self.theme_path} ({self.hits}/{self.sampled} baris sampel cocok)"
+
+    def __repr__(self):
+        return f"Detection({self.mode!r}, {self.theme_path!r}, {self.hits}/{self.sampled})"
+
+def detect(ciphertext, theme_dir=DEFAULT_THEME_DIR, sample_lines=SAMPLE_LINES):
+    """
+    Menebak mode dan tema ciphertext tanpa mendekripsinya. Tema harus cocok
+    dengan lebih dari separuh baris sampel dan unggul dari tema lain;
+    selain itu ValueError dilempar.
+    """
+    mode = sniff_mode(ciphertext)
+    if mode == 'stream':
+        raise ValueError("Ciphertext berformat stream; gunakan decrypt --stream dengan tema yang sesuai.")
+    start = _HEADER_PREFIX.match(ciphertext).end() if mode == 'standard' else 0
+    index = theme_index(theme_dir)
+    votes, sampled = index.vote(_iter_lines(ciphertext, start), sample_lines)
+    ranked = votes.most_common(2)
+    if not ranked or ranked[0][1] * 2 <= sampled:
+        hits = ranked[0][1] if ranked else 0
+        raise ValueError(f"Tema tidak dikenali: hanya {hits}/{sampled} baris sampel cocok dengan tema di '{theme_dir}'.")
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        names = ", ".join(index.paths[theme_id] for theme_id, _ in ranked)
+        raise ValueError(f"Tema tidak bisa dibedakan ({names}); pilih tema dengan -t.")
+    theme_id, hits = ranked[0]
+    return Detection(mode, index.paths[theme_id], hits, sampled)
+
+def decrypt_auto(ciphertext, key, theme_dir=DEFAULT_THEME_DIR, backend=None, workers=1, tolerant=False, report=None):
+    """Mendeteksi mode dan tema, lalu mendekripsi sekali. Mengembalikan (plaintext, Detection)."""
+    detection = detect(ciphertext, theme_dir)
+    decrypt_func = _mode_functions(detection.mode)[1]
+    plaintext = decrypt_func(ciphertext, key, detection.theme_path, backend, workers, tolerant, report)
+    return plaintext, detection
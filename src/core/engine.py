@@ -3,184 +3,792 @@
 import json
 import base64
 import os
+import re
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from itertools import product, repeat
+
+from src.core.backends import ALPHABET, get_backend
+from src.core.profiling import PROFILER
+from src.core.matching import MatchReport, PhraseMatcher
+from src.core.homophonic import HOMOPHONIC_MODES, HomophoneTable, check_weights
+from src.core.header import HEADER_VERSION, new_header, pack_header, unpack_header, is_packed_header, restore_plaintext
+from src.core.wcb import WCB_SUFFIX, CompiledCodebook, MappedIndex, MappedPhrases, compiled_path_for, id_to_chunk, write_compiled
+
+# Modul yang hanya dibutuhkan jalur tertentu (process pool, shared memory,
+# sidik tema, cache hasil) diimpor di dalam fungsinya agar `import engine`
+# dan perintah CLI untuk pesan pendek tetap cepat (lihat tests/test_startup.py).
+# Fitur di atas fungsi inti ada di modulnya sendiri dan mengimpor engine:
+#   lowmem.py   : encrypt_into/decrypt_into (mode hemat memori)
+#   append.py   : encrypt_append/encrypt_append_file
+#   seek.py     : indeks seek dan decrypt_range
+#   parallel.py : core_encrypt/core_decrypt dengan workers > 1
+#   batch.py    : encrypt_many/decrypt_many
+# parallel.py dan seek.py dipakai core_encrypt/core_decrypt, jadi keduanya
+# diimpor di dalam fungsi tersebut.
 
 BOUNDARY = "\n---POE-BOUNDARY---\n"
-ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 PADDING_CHAR = 'X'
 
+# Jumlah huruf per baris puisi (metadata.chunk_size tema).
+DEFAULT_CHUNK_SIZE = 2
+MIN_CHUNK_SIZE = 1
+MAX_CHUNK_SIZE = 4
+
 # --- KARAKTER STEGANOGRAFI (TAK KASAT MATA) ---
 ZERO_WIDTH_SPACE = '\u200b'  # Mewakili bit '0'
 ZERO_WIDTH_NON_JOINER = '\u200c' # Mewakili bit '1'
 
+# Codec steganografi v2: delapan karakter tak kasat mata sebagai digit oktal
+# (3 bit per karakter), diakhiri panjang payload dan penanda ZWNBSP.
+STEGO_DIGITS = '\u200b\u200c\u200d\u2060\u2061\u2062\u2063\u2064'  # ZWSP, ZWNJ, ZWJ, WORD JOINER, 4 operator tak kasat mata
+STEGO_MARKER = '\ufeff'  # ZERO WIDTH NO-BREAK SPACE
+STEGO_LENGTH_DIGITS = 11  # panjang payload dalam byte, oktal (maks. 8 GiB)
+
+# --- CACHE CODEBOOK ---
+# Jumlah tema berbeda yang disimpan di memori sebelum yang paling lama
+# tidak dipakai dibuang (LRU).
+CODEBOOK_CACHE_SIZE = 8
+
+class Codebook:
+    """
+    Codebook tema yang sudah di-parse: tabel maju, tabel balik, dan metadata.
+    Tabel frasa (enkripsi) dan tabel balik (dekripsi) baru dibuat saat pertama
+    kali dibutuhkan, jadi satu perintah hanya membangun tabel yang dipakainya.
+    """
+
+    def __init__(self, dictionary, metadata=None, path=None, mtime_ns=None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.metadata = metadata or {}
+        self.chunk_size = _validate_chunk_size(self.metadata.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        self.dictionary = dictionary
+        # Frasa varian tema homofonik: (chunk, frasa), ikut dikenali saat dekripsi.
+        self.variants = [(bg, variant['phrase']) for bg, entry in dictionary.items()
+                         for variant in entry.get('variants', ())]
+        self._inverse = None
+        self._phrases = None
+        self._matcher = None
+        self._fingerprint = None
+        self._homophones = None
+        if self.variants:
+            # Varian yang bentrok dan bobot yang tidak sah harus ditolak saat tema dimuat.
+            self.inverse
+            check_weights(dictionary)
+
+    @property
+    def inverse(self):
+        if self._inverse is None:
+            inverse = {entry['phrase']: bg for bg, entry in self.dictionary.items()}
+            for bg, phrase in self.variants:
+                if inverse.setdefault(phrase, bg) != bg:
+                    raise ValueError(f"Frasa varian '{phrase}' dipakai oleh lebih dari satu chunk.")
+            self._inverse = inverse
+        return self._inverse
+
+    @property
+    def phrases(self):
+        if self._phrases is None:
+            self._phrases = _build_phrase_table(self.dictionary, self.chunk_size)
+        return self._phrases
+
+    @property
+    def forward(self):
+        return {bg: entry.get('phrase') for bg, entry in self.dictionary.items()}
+
+    @property
+    def matcher(self):
+        """Indeks pencocokan toleran (lihat src/core/matching.py); dibuat saat pertama kali dibutuhkan."""
+        if self._matcher is None:
+            self._matcher = PhraseMatcher(self.inverse.items())
+        return self._matcher
+
+    @property
+    def homophones(self):
+        """HomophoneTable untuk enkripsi homofonik (lihat src/core/homophonic.py); None jika tema tanpa varian."""
+        if self._homophones is None and self.variants:
+            self._homophones = HomophoneTable.from_dictionary(self.dictionary, _chunk_keys(self.chunk_size))
+        return self._homophones
+
+    @property
+    def fingerprint(self):
+        """
+        Sidik tema (8 byte): SHA-256 tabel frasa menurut id (ditambah frasa
+        varian, jika ada), dipakai bentuk ringkas dan cache hasil.
+        """
+        if self._fingerprint is None:
+            import hashlib
+            digest = hashlib.sha256("\n".join(self.phrases).encode('utf-8'))
+            for chunk, phrase in self.variants:
+                digest.update(f"\n{chunk}\t{phrase}".encode('utf-8'))
+            self._fingerprint = digest.digest()[:8]
+        return self._fingerprint
+
+    @classmethod
+    def from_file(cls, theme_path):
+        try:
+            mtime_ns = os.stat(theme_path).st_mtime_ns
+            with open(theme_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+        return cls(data.get('dictionary', {}), data.get('metadata', {}), theme_path, mtime_ns)
+
+    def __repr__(self):
+        return f"Codebook({self.metadata.get('name', self.path)!r}, {len(self.dictionary)} entri)"
+
+class MappedCodebook(Codebook):
+    """
+    Codebook yang dibaca dari file .wcb lewat mmap. Tabel balik dicari dengan
+    pencarian biner di atas indeks terurut di file, tabel frasa didekode per
+    akses (MappedPhrases), dan dictionary mentah baru dibuat saat dibutuhkan.
+    """
+
+    def __init__(self, compiled, path=None, mtime_ns=None):
+        self.path = path or compiled.path
+        self.mtime_ns = mtime_ns
+        self.metadata = compiled.metadata
+        self.chunk_size = _validate_chunk_size(compiled.chunk_size)
+        self.compiled = compiled
+        self._inverse = MappedIndex(compiled)
+        self._phrases = MappedPhrases(compiled)
+        self.variants = [(id_to_chunk(chunk_id, self.chunk_size), phrase) for chunk_id, phrase in compiled.variant_list()]
+        self._dictionary = None
+        self._matcher = None
+        self._fingerprint = None
+        self._homophones = None
+
+    @property
+    def dictionary(self):
+        if self._dictionary is None:
+            if not self.path.endswith(WCB_SUFFIX):
+                # Entri lengkap (termasuk rhyme_key) hanya ada di file JSON sumber.
+                self._dictionary = Codebook.from_file(self.path).dictionary
+            else:
+                self._dictionary = {
+                    chunk: {'phrase': phrase}
+                    for chunk, phrase in zip(_chunk_keys(self.chunk_size), self.phrases)
+                    if phrase != f"({chunk})"
+                }
+                # Bobot dan rima varian hanya ada di JSON sumber; di sini semua varian berbobot 1.
+                for chunk, phrase in self.variants:
+                    self._dictionary[chunk].setdefault('variants', []).append({'phrase': phrase})
+        return self._dictionary
+
+    def __reduce__(self):
+        # mmap tidak bisa di-pickle; proses worker membuka ulang file .wcb-nya.
+        return (_open_mapped_codebook, (self.compiled.path, self.path, self.mtime_ns))
+
+    def __repr__(self):
+        return f"MappedCodebook({self.metadata.get('name', self.path)!r}, {len(self.inverse)} frasa)"
+
+def _open_mapped_codebook(wcb_path, path=None, mtime_ns=None):
+    return MappedCodebook(CompiledCodebook(wcb_path), path, mtime_ns)
+
+def _validate_chunk_size(chunk_size):
+    if not isinstance(chunk_size, int) or not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size tema harus {MIN_CHUNK_SIZE} sampai {MAX_CHUNK_SIZE}, bukan {chunk_size!r}.")
+    return chunk_size
+
+@lru_cache(maxsize=None)
+def _chunk_keys(chunk_size):
+    """Semua chunk A-Z sepanjang `chunk_size`, diurutkan menurut id-nya."""
+    return ["".join(chars) for chars in product(ALPHABET, repeat=chunk_size)]
+
+BIGRAMS = _chunk_keys(2)
+
+def _build_phrase_table(dictionary, chunk_size=DEFAULT_CHUNK_SIZE):
+    return [dictionary.get(key, {}).get('phrase', f"({key})") for key in _chunk_keys(chunk_size)]
+
+_codebook_cache = OrderedDict()
+_codebook_cache_lock = threading.Lock()
+
+def load_codebook(theme_path):
+    """Mengambil Codebook dari cache proses; file di-parse ulang hanya jika mtime berubah."""
+    if isinstance(theme_path, Codebook):
+        return theme_path
+    with PROFILER.stage("theme_load") as stage:
+        cache_key = os.path.abspath(theme_path)
+        try:
+            stat_result = os.stat(cache_key)
+        except FileNotFoundError:
+            raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+        mtime_ns = stat_result.st_mtime_ns
+        with _codebook_cache_lock:
+            codebook = _codebook_cache.get(cache_key)
+            if codebook is not None and codebook.mtime_ns == mtime_ns:
+                _codebook_cache.move_to_end(cache_key)
+                return codebook
+            # Parsing dilakukan di dalam lock agar thread lain yang meminta tema
+            # yang sama menunggu hasil ini, bukan ikut mem-parse file yang sama.
+            codebook = _load_theme(cache_key, stat_result)
+            stage.add(stat_result.st_size)
+            _codebook_cache[cache_key] = codebook
+            _codebook_cache.move_to_end(cache_key)
+            while len(_codebook_cache) > CODEBOOK_CACHE_SIZE:
+                _codebook_cache.popitem(last=False)
+            return codebook
+
+def _load_theme(theme_path, stat_result):
+    """
+    Memuat satu tema dari disk. File .wcb yang masih sesuai dengan JSON
+    sumbernya di-mmap; jika tidak ada, basi (JSON sudah berubah), atau rusak,
+    JSON di-parse seperti biasa. Memuat tema tidak pernah menulis file: .wcb
+    hanya dibuat oleh compile_theme (`generate_codebook.py compile`).
+    """
+    if theme_path.endswith(WCB_SUFFIX):
+        return MappedCodebook(CompiledCodebook(theme_path), theme_path, stat_result.st_mtime_ns)
+    wcb_path = compiled_path_for(theme_path)
+    try:
+        compiled = CompiledCodebook(wcb_path)
+    except (OSError, ValueError):
+        return Codebook.from_file(theme_path)
+    if compiled.matches_source(stat_result):
+        return MappedCodebook(compiled, theme_path, stat_result.st_mtime_ns)
+    compiled.close()
+    return Codebook.from_file(theme_path)
+
+def _write_compiled(codebook, wcb_path):
+    write_compiled(wcb_path, codebook.phrases, codebook.inverse, codebook.metadata,
+                   chunk_size=codebook.chunk_size, source_size=os.stat(codebook.path).st_size,
+                   source_mtime_ns=codebook.mtime_ns, variants=codebook.variants)
+    return wcb_path
+
+def compile_theme(theme_path, wcb_path=None):
+    """Mengompilasi tema JSON menjadi file .wcb (default: di samping file JSON-nya)."""
+    codebook = Codebook.from_file(theme_path)
+    return _write_compiled(codebook, wcb_path or compiled_path_for(theme_path))
+
+def clear_codebook_cache():
+    """Mengosongkan cache codebook (misalnya untuk tes)."""
+    with _codebook_cache_lock:
+        _codebook_cache.clear()
+
 # --- FUNGSI INTI ---
-def vigenere_process(text_upper, key_upper, mode):
-    result = []
-    key_len = len(key_upper)
-    for i, char in enumerate(text_upper):
-        text_num = ALPHABET.find(char)
-        key_num = ALPHABET.find(key_upper[i % key_len])
-        if mode == 'encrypt':
-            result_num = (text_num + key_num) % 26
-        else: # decrypt
-            result_num = (text_num - key_num + 26) % 26
-        result.append(ALPHABET[result_num])
-    return "".join(result)
-
-def core_encrypt(plaintext, key, dictionary):
-    alpha_chars = [char for char in plaintext if char.isalpha()]
-    alpha_text_upper = "".join(alpha_chars).upper()
-    
-    non_alpha_map = {i: char for i, char in enumerate(plaintext) if not char.isalpha()}
-    uppercase_indices = {i for i, char in enumerate(alpha_chars) if char.isupper()}
+def _phrase_table(dictionary):
+    """Tabel frasa yang diindeks dengan id chunk (26*a+b untuk bigram)."""
+    if isinstance(dictionary, Codebook):
+        return dictionary.phrases
+    return _build_phrase_table(dictionary)
 
-    vigenere_ciphertext = vigenere_process(alpha_text_upper, key.upper(), 'encrypt')
-    
-    padded = False
-    if len(vigenere_ciphertext) % 2 != 0:
-        vigenere_ciphertext += PADDING_CHAR
-        padded = True
+def _chunk_size(codebook):
+    """chunk_size sebuah Codebook; dictionary mentah selalu bigram."""
+    if isinstance(codebook, Codebook):
+        return codebook.chunk_size
+    return DEFAULT_CHUNK_SIZE
+
+def _pad_count(letter_count, chunk_size):
+    return -letter_count % chunk_size
+
+def _inverse_table(inverse_map):
+    if isinstance(inverse_map, Codebook):
+        return inverse_map.inverse
+    return inverse_map
+
+def _assemble_stanzas(poetic_lines):
+    """Menyusun baris puisi menjadi bait 4 baris yang dipisah satu baris kosong."""
+    return "\n\n".join("\n".join(poetic_lines[i:i+4]) for i in range(0, len(poetic_lines), 4))
 
-    bigrams = [vigenere_ciphertext[i:i+2] for i in range(0, len(vigenere_ciphertext), 2)]
+def vigenere_process(text_upper, key_upper, mode, backend=None):
+    with PROFILER.stage("vigenere") as stage:
+        stage.add(len(text_upper))
+        return get_backend(backend).vigenere(text_upper, key_upper, mode)
+
+def core_encrypt(plaintext, key, dictionary, backend=None, header_version=HEADER_VERSION, seek_index=False, workers=1,
+                 homophonic=None):
+    """
+    homophonic='weighted' memilih satu frasa per kemunculan chunk sesuai bobot
+    varian tema; 'rhyme' juga memilih varian yang berima dalam bait (lihat
+    src/core/homophonic.py). Tema tanpa varian selalu memakai frasa utama.
+    """
+    if homophonic is not None and homophonic not in HOMOPHONIC_MODES:
+        raise ValueError(f"Mode homofonik '{homophonic}' tidak dikenal. Pilihan: {', '.join(HOMOPHONIC_MODES)}")
+    from src.core.parallel import _parallel_encrypt, _parallel_workers
+    homophones = dictionary.homophones if homophonic and isinstance(dictionary, Codebook) else None
+    backend = get_backend(backend)
+    # workers > 1: pesan besar dibagi ke process pool (lihat parallel._parallel_encrypt); indeks seek
+    # dan pilihan varian homofonik (rima antar-baris bait) butuh jalur serial.
+    workers = _parallel_workers(workers, len(plaintext))
+    if workers > 1 and header_version != 1 and not seek_index and homophones is None:
+        result = _parallel_encrypt(plaintext, key.upper(), dictionary, backend, workers)
+        if result is not None:
+            return result
+    with PROFILER.stage("split") as stage:
+        stage.add_text(plaintext)
+        if header_version == 1:
+            alpha_text_upper, non_alpha_map, uppercase_indices = backend.split(plaintext)
+        else:
+            alpha_text_upper, gaps, runs, run_text, upper = backend.split_runs(plaintext)
+
+    vigenere_ciphertext = vigenere_process(alpha_text_upper, key.upper(), 'encrypt', backend)
     
-    poetic_lines = [dictionary.get(bg, {}).get('phrase', f"({bg})") for bg in bigrams]
+    chunk_size = _chunk_size(dictionary)
+    padded = _pad_count(len(vigenere_ciphertext), chunk_size)
+    vigenere_ciphertext += PADDING_CHAR * padded
+
+    with PROFILER.stage("lookup") as stage:
+        stage.add(len(vigenere_ciphertext))
+        chunk_ids = backend.chunk_ids(vigenere_ciphertext, chunk_size)
+        if homophones is not None:
+            poetic_lines = homophones.pick(chunk_ids, rhyme=homophonic == 'rhyme')
+        else:
+            poetic_lines = backend.gather(_phrase_table(dictionary), chunk_ids)
     
-    poetic_output = ""
-    for i in range(0, len(poetic_lines), 4):
-        chunk = poetic_lines[i:i+4]
-        bait = "\n".join(chunk)
-        poetic_output += bait + "\n\n"
-    poetic_output = poetic_output.strip()
+    with PROFILER.stage("assemble") as stage:
+        poetic_output = _assemble_stanzas(poetic_lines).strip()
+        stage.add_text(poetic_output)
         
-    header_obj = {"non_alpha": non_alpha_map, "uppercase": list(uppercase_indices), "padded": padded}
+    if header_version == 1:
+        header_obj = {"non_alpha": non_alpha_map, "uppercase": list(uppercase_indices), "padded": bool(padded)}
+        if chunk_size != DEFAULT_CHUNK_SIZE:
+            # Header JSON lama hanya mengenal bigram dengan padding bool.
+            header_obj.update(padded=padded, chunk_size=chunk_size)
+    else:
+        header_obj = new_header(len(alpha_text_upper), len(plaintext), gaps, runs, run_text, upper,
+                                padded, chunk_size)
+        if seek_index:
+            from src.core.seek import _build_seek_index
+            with PROFILER.stage("header"):
+                header_obj["index"] = _build_seek_index(poetic_lines, chunk_size, gaps, runs, upper)
     
     # --- PERUBAHAN KRUSIAL 1 ---
     # Sekarang mengembalikan 2 nilai: puisi dan objek header mentah
     return poetic_output, header_obj
 
-def core_decrypt(poetic_body, key, inverse_map, header_obj):
-    lines = [line for line in poetic_body.strip().split('\n') if line]
-    vigenere_ciphertext = "".join([inverse_map.get(line, "") for line in lines])
-    padded = header_obj["padded"]
+def _poem_to_ciphertext(poetic_body, inverse_map, tolerant=False, report=None):
+    if tolerant:
+        return _poem_to_ciphertext_tolerant(poetic_body, inverse_map, report)
+    with PROFILER.stage("inverse") as stage:
+        stage.add_text(poetic_body)
+        lines = [line for line in poetic_body.strip().split('\n') if line]
+        return "".join(map(_inverse_table(inverse_map).get, lines, repeat("")))
+
+def _poem_to_ciphertext_tolerant(poetic_body, inverse_map, report):
+    """
+    Seperti _poem_to_ciphertext, tetapi baris yang tidak cocok persis dicari
+    lewat PhraseMatcher. Baris yang tetap tidak dikenali dicatat di `report`;
+    tanpa report, ValueError dilempar alih-alih membuang baris diam-diam.
+    """
+    matcher = inverse_map.matcher if isinstance(inverse_map, Codebook) else PhraseMatcher(inverse_map.items())
+    inverse_get = _inverse_table(inverse_map).get
+    result = MatchReport() if report is None else report
+    with PROFILER.stage("inverse") as stage:
+        stage.add_text(poetic_body)
+        chunks = []
+        for line_no, line in enumerate(poetic_body.strip().split('\n'), 1):
+            chunk = inverse_get(line)
+            if chunk is None:
+                if not line.strip():
+                    continue
+                found = matcher.match(line)
+                if found is None:
+                    result.unmatched.append((line_no, line))
+                    continue
+                chunk, phrase, distance = found
+                result.corrected.append((line_no, line, phrase, distance))
+            chunks.append(chunk)
+    if report is None and result.unmatched:
+        raise ValueError("Baris puisi tidak dikenali: " + result.summary())
+    return "".join(chunks)
+
+def core_decrypt(poetic_body, key, inverse_map, header_obj, backend=None, workers=1, tolerant=False, report=None):
+    """
+    tolerant=True mencocokkan baris yang berubah (huruf besar/kecil, spasi,
+    salah ketik kecil) dengan frasa terdekat; lihat _poem_to_ciphertext_tolerant.
+    """
+    from src.core.parallel import _parallel_decrypt, _parallel_workers
+    backend = get_backend(backend)
+    chunk_size = header_obj.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    if isinstance(inverse_map, Codebook) and chunk_size != inverse_map.chunk_size:
+        raise ValueError(f"Ciphertext dibuat dengan chunk_size {chunk_size}, "
+                         f"tetapi tema ini memakai chunk_size {inverse_map.chunk_size}.")
+    workers = _parallel_workers(workers, len(poetic_body))
+    if workers > 1 and header_obj.get("version", 1) >= 2 and not tolerant:
+        plaintext = _parallel_decrypt(poetic_body, key.upper(), inverse_map, header_obj, backend, workers)
+        if plaintext is not None:
+            return plaintext
+    vigenere_ciphertext = _poem_to_ciphertext(poetic_body, inverse_map, tolerant, report)
+    padded = int(header_obj["padded"])
     if padded:
-        vigenere_ciphertext = vigenere_ciphertext[:-1]
-    decrypted_upper = vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt')
-    uppercase_indices = set(header_obj["uppercase"])
+        vigenere_ciphertext = vigenere_ciphertext[:-padded]
+    decrypted_upper = vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt', backend)
+    with PROFILER.stage("restore") as stage:
+        plaintext = _restore_plaintext(decrypted_upper, header_obj, backend)
+        stage.add_text(plaintext)
+    return plaintext
+
+def _restore_plaintext(decrypted_upper, header_obj, backend):
+    if header_obj.get("version", 1) >= 2:
+        return restore_plaintext(decrypted_upper, header_obj)
+    # Header v1 (JSON): kunci indeks tersimpan sebagai string
     non_alpha_map = {int(k): v for k, v in header_obj["non_alpha"].items()}
-    decrypted_cased_chars = [
-        char.upper() if i in uppercase_indices else char.lower()
-        for i, char in enumerate(decrypted_upper)
-    ]
-    result_chars = []
-    alpha_idx = 0
-    total_len = len(decrypted_cased_chars) + len(non_alpha_map)
-    for i in range(total_len):
-        if i in non_alpha_map:
-            result_chars.append(non_alpha_map[i])
+    return backend.merge(decrypted_upper, header_obj["uppercase"], non_alpha_map)
+
+# --- SERIALISASI HEADER ---
+def _serialize_header(header_obj):
+    with PROFILER.stage("header") as stage:
+        if header_obj.get("version", 1) >= 2:
+            header_data = pack_header(header_obj)
         else:
-            if alpha_idx < len(decrypted_cased_chars):
-                result_chars.append(decrypted_cased_chars[alpha_idx])
-                alpha_idx += 1
-    return "".join(result_chars)
+            header_data = json.dumps(header_obj, sort_keys=True).encode('utf-8')
+        encoded_header = base64.b64encode(header_data).decode('utf-8')
+        stage.add(len(encoded_header))
+        return encoded_header
+
+def _parse_header(encoded_header):
+    """Membaca header v2 (biner) maupun header v1 (JSON) dari string base64."""
+    with PROFILER.stage("parse_header") as stage:
+        stage.add(len(encoded_header))
+        return _header_from_bytes(base64.b64decode(encoded_header))
+
+def _header_from_bytes(header_data):
+    if is_packed_header(header_data):
+        return unpack_header(header_data)[0]
+    return json.loads(header_data)
 
 # --- FUNGSI WRAPPER ---
-def encrypt(plaintext, key, theme_path):
-    """Fungsi wrapper untuk mode standar (dengan header)."""
-    try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            dictionary = json.load(f).get('dictionary', {})
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+def encrypt(plaintext, key, theme_path, backend=None, seek_index=False, workers=1, homophonic=None):
+    """
+    Fungsi wrapper untuk mode standar (dengan header). seek_index=True menambahkan
+    indeks untuk decrypt_range; workers > 1 membagi pesan besar ke beberapa proses;
+    homophonic memilih varian frasa (lihat core_encrypt).
+    """
+    codebook = load_codebook(theme_path)
     
     # --- PERUBAHAN KRUSIAL 2 ---
     # Menangkap 2 nilai dari core_encrypt
-    poetic_output, header_obj = core_encrypt(plaintext, key, dictionary)
+    poetic_output, header_obj = core_encrypt(plaintext, key, codebook, backend, seek_index=seek_index, workers=workers,
+                                             homophonic=homophonic)
     
     # Memformat header menjadi string di sini
-    header_data = json.dumps(header_obj, sort_keys=True).encode('utf-8')
-    encoded_header = base64.b64encode(header_data).decode('utf-8')
+    encoded_header = _serialize_header(header_obj)
     return f"{encoded_header}{BOUNDARY}{poetic_output}"
 
-def decrypt(ciphertext, key, theme_path):
+def decrypt(ciphertext, key, theme_path, backend=None, workers=1, tolerant=False, report=None):
     """Fungsi wrapper untuk mode standar."""
-    try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            inverse_map = {v['phrase']: k for k, v in json.load(f).get('dictionary', {}).items()}
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+    codebook = load_codebook(theme_path)
+    if tolerant:
+        # Email sering mengubah akhir baris menjadi CRLF, termasuk di sekitar BOUNDARY.
+        ciphertext = ciphertext.replace('\r\n', '\n')
     try:
         encoded_header, poetic_body = ciphertext.split(BOUNDARY, 1)
-        header_data = base64.b64decode(encoded_header)
-        header_obj = json.loads(header_data)
+        header_obj = _parse_header(encoded_header)
     except Exception:
         raise ValueError("Invalid ciphertext format or corrupt header.")
-    return core_decrypt(poetic_body, key, inverse_map, header_obj)
+    return core_decrypt(poetic_body, key, codebook, header_obj, backend, workers, tolerant, report)
     
-def encrypt_headerless(plaintext, key, theme_path):
+def encrypt_headerless(plaintext, key, theme_path, backend=None, workers=1, homophonic=None):
     """Fungsi wrapper untuk mode headerless."""
-    alpha_text = "".join([c for c in plaintext if c.isalpha()]).upper()
-    if len(alpha_text) % 2 != 0:
-        raise ValueError("Untuk mode headerless, jumlah huruf dalam plaintext harus genap.")
-    try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            dictionary = json.load(f).get('dictionary', {})
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+    alpha_text = get_backend(backend).split(plaintext)[0]
+    codebook = load_codebook(theme_path)
+    _check_headerless_length(len(alpha_text), codebook.chunk_size)
     
     # Fungsi ini sudah benar karena hanya mengambil nilai pertama (puisi)
-    poetic_output, _ = core_encrypt(alpha_text, key, dictionary)
+    poetic_output, _ = core_encrypt(alpha_text, key, codebook, backend, workers=workers, homophonic=homophonic)
     return poetic_output
 
-def decrypt_headerless(poetic_ciphertext, key, theme_path):
-    # ... (Fungsi ini tidak berubah)
+def _check_headerless_length(letter_count, chunk_size):
+    if letter_count % chunk_size == 0:
+        return
+    if chunk_size == DEFAULT_CHUNK_SIZE:
+        raise ValueError("Untuk mode headerless, jumlah huruf dalam plaintext harus genap.")
+    raise ValueError(f"Untuk mode headerless, jumlah huruf dalam plaintext harus kelipatan {chunk_size}.")
+
+def decrypt_headerless(poetic_ciphertext, key, theme_path, backend=None, workers=1, tolerant=False, report=None):
+    """Fungsi wrapper untuk mode headerless."""
+    from src.core.parallel import _parallel_decrypt, _parallel_workers
+    codebook = load_codebook(theme_path)
+    workers = _parallel_workers(workers, len(poetic_ciphertext))
+    if workers > 1 and not tolerant:
+        plaintext = _parallel_decrypt(poetic_ciphertext, key.upper(), codebook, None, get_backend(backend), workers)
+        if plaintext is not None:
+            return plaintext
+    vigenere_ciphertext = _poem_to_ciphertext(poetic_ciphertext, codebook, tolerant, report)
+    return vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt', backend)
+
+# --- FUNGSI STEGANOGRAFI ---
+_TO_STEGO_DIGITS = str.maketrans('01234567', STEGO_DIGITS)
+_FROM_STEGO_DIGITS = str.maketrans(STEGO_DIGITS, '01234567')
+_LEGACY_ZERO_WIDTH = re.compile(f'[{ZERO_WIDTH_SPACE}{ZERO_WIDTH_NON_JOINER}]+')
+_LEGACY_BITS = str.maketrans({ZERO_WIDTH_SPACE: '0', ZERO_WIDTH_NON_JOINER: '1'})
+
+def _stego_digit_count(payload_len):
+    return (8 * payload_len + 2) // 3
+
+def _bytes_to_zero_width(data):
+    """Payload v2: digit oktal payload + panjang payload (tetap) + penanda."""
+    digits = _stego_digit_count(len(data))
+    body = format(int.from_bytes(data, 'big'), 'o').zfill(digits) if data else ""
+    length = format(len(data), 'o').zfill(STEGO_LENGTH_DIGITS)
+    return (body + length).translate(_TO_STEGO_DIGITS) + STEGO_MARKER
+
+def _split_zero_width_payload(text):
+    """
+    Memisahkan puisi dan payload v2 dari akhir teks tanpa memindai seluruh
+    teks. Mengembalikan None jika teks tidak berisi payload v2.
+    """
+    located = _locate_zero_width_payload(text)
+    if located is None:
+        return None
+    payload_start, payload = located
+    return text[:payload_start], payload
+
+def _locate_zero_width_payload(text):
+    """Seperti _split_zero_width_payload, tetapi mengembalikan posisi awal payload alih-alih salinan puisi."""
+    end = len(text)
+    while end and text[end - 1].isspace():
+        end -= 1
+    if not end or text[end - 1] != STEGO_MARKER:
+        return None
+    length_end = end - 1
+    length_start = length_end - STEGO_LENGTH_DIGITS
     try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            inverse_map = {v['phrase']: k for k, v in json.load(f).get('dictionary', {}).items()}
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
-    lines = [line for line in poetic_ciphertext.strip().split('\n') if line]
-    vigenere_ciphertext = "".join([inverse_map.get(line, "") for line in lines])
-    return vigenere_process(vigenere_ciphertext, key.upper(), 'decrypt')
-
-# --- FUNGSI STEGANOGRAFI (Tidak berubah, sekarang akan bekerja) ---
+        payload_len = int(text[length_start:length_end].translate(_FROM_STEGO_DIGITS), 8)
+        payload_start = length_start - _stego_digit_count(payload_len)
+        if length_start < 0 or payload_start < 0:
+            raise ValueError
+        digits = text[payload_start:length_start].translate(_FROM_STEGO_DIGITS)
+        payload = int(digits, 8).to_bytes(payload_len, 'big') if payload_len else b""
+    except (ValueError, OverflowError):
+        raise ValueError("Data steganografi rusak atau terpotong.")
+    return payload_start, payload
+
 def _header_to_zero_width(header_obj):
     json_str = json.dumps(header_obj, sort_keys=True)
     binary_str = ''.join(format(byte, '08b') for byte in json_str.encode('utf-8'))
     return binary_str.replace('0', ZERO_WIDTH_SPACE).replace('1', ZERO_WIDTH_NON_JOINER)
 
 def _zero_width_to_header(text):
-    binary_str = ""
-    for char in text:
-        if char == ZERO_WIDTH_SPACE:
-            binary_str += '0'
-        elif char == ZERO_WIDTH_NON_JOINER:
-            binary_str += '1'
+    """Dekoder codec v1 (1 bit per karakter, header JSON)."""
+    binary_str = "".join(_LEGACY_ZERO_WIDTH.findall(text)).translate(_LEGACY_BITS)
     if not binary_str:
         raise ValueError("Tidak ada data steganografi yang ditemukan dalam ciphertext.")
-    byte_array = bytearray(int(binary_str[i:i+8], 2) for i in range(0, len(binary_str), 8))
+    full_len = len(binary_str) - len(binary_str) % 8
+    byte_array = bytearray(int(binary_str[:full_len], 2).to_bytes(full_len // 8, 'big') if full_len else b"")
+    if full_len < len(binary_str):
+        byte_array.append(int(binary_str[full_len:], 2))
     json_str = byte_array.decode('utf-8')
     return json.loads(json_str)
 
-def encrypt_steganography(plaintext, key, theme_path):
-    try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            dictionary = json.load(f).get('dictionary', {})
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
+def encrypt_steganography(plaintext, key, theme_path, backend=None, compress=True, seek_index=False, workers=1,
+                          homophonic=None):
+    codebook = load_codebook(theme_path)
     
     # Fungsi ini sekarang akan menerima 2 nilai dengan benar
-    poetic_output, header_obj = core_encrypt(plaintext, key, dictionary)
-    stego_payload = _header_to_zero_width(header_obj)
+    poetic_output, header_obj = core_encrypt(plaintext, key, codebook, backend, seek_index=seek_index, workers=workers,
+                                             homophonic=homophonic)
+    with PROFILER.stage("header") as stage:
+        stego_payload = _bytes_to_zero_width(pack_header(header_obj, compress))
+        stage.add_text(stego_payload)
     
     return poetic_output + stego_payload
 
-def decrypt_steganography(poetic_ciphertext, key, theme_path):
-    try:
-        with open(theme_path, 'r', encoding='utf-8') as f:
-            inverse_map = {v['phrase']: k for k, v in json.load(f).get('dictionary', {}).items()}
-    except FileNotFoundError:
-        raise ValueError(f"Error: File tema tidak ditemukan di '{theme_path}'")
-        
-    header_obj = _zero_width_to_header(poetic_ciphertext)
-    visible_poetic_body = poetic_ciphertext.replace(ZERO_WIDTH_SPACE, "").replace(ZERO_WIDTH_NON_JOINER, "")
+def decrypt_steganography(poetic_ciphertext, key, theme_path, backend=None, workers=1, tolerant=False, report=None):
+    codebook = load_codebook(theme_path)
+
+    with PROFILER.stage("parse_header") as stage:
+        split = _split_zero_width_payload(poetic_ciphertext)
+        if split is not None:
+            visible_poetic_body, payload = split
+            header_obj = unpack_header(payload)[0]
+            stage.add(len(payload))
+        else:
+            # Ciphertext codec v1: bit tersebar sebagai ZWSP/ZWNJ di akhir puisi
+            header_obj = _zero_width_to_header(poetic_ciphertext)
+            visible_poetic_body = _LEGACY_ZERO_WIDTH.sub("", poetic_ciphertext)
     
-    return core_decrypt(visible_poetic_body, key, inverse_map, header_obj)
\ No newline at end of file
+    return core_decrypt(visible_poetic_body, key, codebook, header_obj, backend, workers, tolerant, report)
+
+# --- FUNGSI PER MODE ---
+MODES = ('standard', 'headerless', 'steganography')
+
+def _mode_functions(mode):
+    if mode == 'standard':
+        return encrypt, decrypt
+    if mode == 'headerless':
+        return encrypt_headerless, decrypt_headerless
+    if mode == 'steganography':
+        return encrypt_steganography, decrypt_steganography
+    raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+
+# --- FUNGSI STREAMING (MEMORI TERBATAS) ---
+# Format stream: baris STREAM_MAGIC, lalu bingkai-bingkai berurutan. Setiap
+# bingkai diawali satu baris FRAME_PREFIX + header base64 untuk potongan
+# plaintext yang bersangkutan, diikuti baris-baris puisinya. Penomoran bait
+# berlanjut melintasi bingkai, sehingga baris puisinya sama dengan puisi
+# yang dihasilkan core_encrypt untuk seluruh teks sekaligus.
+STREAM_MAGIC = "---POE-STREAM---"
+FRAME_PREFIX = "---POE-FRAME---"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _rotate_key(key_upper, phase):
+    """Menggeser kunci agar huruf ke-`phase` dienkripsi dengan fase kunci yang benar."""
+    offset = phase % len(key_upper)
+    return key_upper[offset:] + key_upper[:offset]
+
+def _format_stanza_lines(lines, line_no):
+    parts = []
+    for line in lines:
+        parts.append(line)
+        parts.append("\n")
+        line_no += 1
+        if line_no % 4 == 0:
+            parts.append("\n")
+    return "".join(parts)
+
+def _encode_frame(frame):
+    return FRAME_PREFIX + _serialize_header(frame) + "\n"
+
+def _decode_frame(line):
+    try:
+        return _parse_header(line[len(FRAME_PREFIX):])
+    except Exception:
+        raise ValueError("Invalid stream format or corrupt frame header.")
+
+def encrypt_stream(reader, key, theme_path, chunk_size=STREAM_CHUNK_SIZE, headerless=False, backend=None):
+    """
+    Generator enkripsi untuk objek file teks. Membaca `chunk_size` karakter
+    per iterasi dan menghasilkan potongan ciphertext secara bertahap.
+    Pada mode headerless, jumlah huruf yang bukan kelipatan chunk tema baru
+    terdeteksi di akhir input (ValueError setelah semua baris dihasilkan),
+    sehingga pemanggil harus membuang output yang sudah ditulis.
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    gram_size = codebook.chunk_size
+    key_upper = key.upper()
+    phase = 0
+    line_no = 0
+    carry = ""
+
+    if not headerless:
+        yield STREAM_MAGIC + "\n"
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        with PROFILER.stage("split") as stage:
+            stage.add_text(chunk)
+            alpha_text_upper, gaps, runs, run_text, upper = backend.split_runs(chunk)
+        vigenere_ciphertext = carry + vigenere_process(alpha_text_upper, _rotate_key(key_upper, phase), 'encrypt', backend)
+        phase += len(alpha_text_upper)
+        # Sisa huruf di akhir ditahan agar chunk tidak terpotong di batas potongan.
+        keep = len(vigenere_ciphertext) - len(vigenere_ciphertext) % gram_size
+        carry = vigenere_ciphertext[keep:]
+        vigenere_ciphertext = vigenere_ciphertext[:keep]
+
+        with PROFILER.stage("lookup") as stage:
+            stage.add(len(vigenere_ciphertext))
+            lines = backend.gather(codebook.phrases, backend.chunk_ids(vigenere_ciphertext, gram_size))
+        frame = "" if headerless else _encode_frame(
+            new_header(len(alpha_text_upper), len(chunk), gaps, runs, run_text, upper, chunk_size=gram_size))
+        with PROFILER.stage("assemble") as stage:
+            stanzas = _format_stanza_lines(lines, line_no)
+            stage.add_text(stanzas)
+        yield frame + stanzas
+        line_no += len(lines)
+
+    if carry:
+        if headerless:
+            _check_headerless_length(len(carry), gram_size)
+        # Bingkai penutup tanpa huruf baru, hanya menandai padding.
+        padded = _pad_count(len(carry), gram_size)
+        lines = backend.gather(codebook.phrases, backend.chunk_ids(carry + PADDING_CHAR * padded, gram_size))
+        closing = new_header(0, 0, (), (), "", (), padded=padded, chunk_size=gram_size)
+        yield _encode_frame(closing) + _format_stanza_lines(lines, line_no)
+
+def decrypt_stream(reader, key, theme_path, headerless=False, backend=None):
+    """
+    Generator dekripsi untuk objek file teks berformat stream. Hanya huruf
+    dari bingkai yang belum lengkap yang ditahan di memori.
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    codebook = load_codebook(theme_path)
+    inverse_map = codebook.inverse
+    backend = get_backend(backend)
+    key_upper = key.upper()
+    phase = 0
+    pending = deque()
+    buffered = []
+    buffered_len = 0
+
+    def drain(final=False):
+        nonlocal phase, buffered, buffered_len
+        ciphertext = "".join(buffered)
+        offset = 0
+        out = []
+        if headerless:
+            out.append(vigenere_process(ciphertext, _rotate_key(key_upper, phase), 'decrypt', backend))
+            phase += len(ciphertext)
+            offset = len(ciphertext)
+        while pending:
+            frame = pending[0]
+            needed = frame["alpha"] + int(frame["padded"])
+            if not final and len(ciphertext) - offset < needed:
+                break
+            pending.popleft()
+            segment = ciphertext[offset:offset + frame["alpha"]]
+            offset += needed
+            decrypted_upper = vigenere_process(segment, _rotate_key(key_upper, phase), 'decrypt', backend)
+            phase += frame["alpha"]
+            with PROFILER.stage("restore"):
+                out.append(_restore_plaintext(decrypted_upper, frame, backend))
+        buffered = [ciphertext[offset:]]
+        buffered_len = len(buffered[0])
+        return "".join(out)
+
+    first = True
+    for raw_line in reader:
+        line = raw_line.rstrip('\r\n')
+        if first and not headerless:
+            if line != STREAM_MAGIC:
+                raise ValueError("Invalid stream format: penanda awal stream tidak ditemukan.")
+            first = False
+            continue
+        if not line:
+            continue
+        if line.startswith(FRAME_PREFIX):
+            frame = _decode_frame(line)
+            if frame.get("chunk_size", DEFAULT_CHUNK_SIZE) != codebook.chunk_size:
+                raise ValueError("Invalid stream: chunk_size bingkai tidak cocok dengan tema.")
+            pending.append(frame)
+            piece = drain()
+        else:
+            letters = inverse_map.get(line, "")
+            buffered.append(letters)
+            buffered_len += len(letters)
+            if not headerless or buffered_len < STREAM_CHUNK_SIZE:
+                continue
+            piece = drain()
+        if piece:
+            yield piece
+    piece = drain(final=True)
+    if piece:
+        yield piece
+
+# --- CACHE HASIL ---
+# Lihat src/core/result_cache.py. Kunci cache memakai sidik tema hasil
+# load_codebook, jadi tema yang berubah di disk otomatis tidak cocok lagi
+# dengan entri lamanya. Mode homofonik tidak di-cache karena hasilnya acak.
+def run_cached(cache, direction, mode, text, key, theme_path, backend=None, workers=1):
+    """
+    Menjalankan encrypt/decrypt mode `mode` lewat cache hasil: input yang sama
+    dengan tema yang sama langsung mengembalikan hasil tersimpan. cache=None
+    menjalankan fungsinya seperti biasa.
+    """
+    func = _mode_functions(mode)[0 if direction == 'encrypt' else 1]
+    codebook = load_codebook(theme_path)
+    if cache is None:
+        return func(text, key, codebook, backend, workers=workers)
+    from src.core.result_cache import result_key
+    cache.watch_theme(codebook.path, codebook.fingerprint)
+    cache_key = result_key(direction, mode, codebook.fingerprint, key, text)
+    result = cache.get(cache_key)
+    if result is None:
+        result = func(text, key, codebook, backend, workers=workers)
+        cache.put(cache_key, codebook.fingerprint, result)
+    return result
@@ -0,0 +1,229 @@
+# src/core/header.py
+
+import struct
+import sys
+import zlib
+from array import array
+
+# --- FORMAT HEADER BINER (VERSI 2) ---
+# Header v1 (lama) adalah JSON {"non_alpha": {indeks: karakter}, "uppercase": [...],
+# "padded": bool}. Header v2 menyimpan informasi yang sama sebagai run:
+#   gaps[i]  : jumlah huruf sebelum run non-huruf ke-i (dihitung dari akhir run sebelumnya)
+#   runs[i]  : panjang run non-huruf ke-i (dalam karakter)
+#   run_text : semua karakter non-huruf yang disambung berurutan
+#   upper    : panjang run huruf bergantian [kecil, kapital, kecil, kapital, ...]
+#   padded   : jumlah huruf padding di akhir ciphertext (header lama: bool)
+#   chunk_size : jumlah huruf per baris puisi (1-4, default 2)
+#   tail     : (huruf setelah run non-huruf terakhir, huruf setelah batas run
+#              `upper` terakhir), agar append tidak perlu menjumlah gaps/upper
+# Tata letak biner: prefix struct di bawah, lalu body (opsional zlib) berisi
+# gaps, runs, upper sebagai uint32 little-endian dan run_text dalam UTF-8.
+# Jika _FLAG_INDEX diset, body diikuti indeks seek (lihat SEEK_INDEX_FIELDS).
+# Jika _FLAG_TAIL diset, bagian paling akhir adalah `tail` (_TAIL). Flag ini
+# hanya dipakai mulai TAIL_MIN_RUNS run; header yang lebih kecil (dan header
+# lama) menghitung `tail` dari gaps/upper saat dibaca.
+HEADER_MAGIC = b'WCH'
+HEADER_VERSION = 2
+
+_FLAG_PADDED = 0x01
+_FLAG_ZLIB = 0x02
+_FLAG_INDEX = 0x40
+_FLAG_TAIL = 0x80
+# Bit 2-3: jumlah padding jika lebih dari 1 (padding 1 cukup dengan _FLAG_PADDED).
+# Bit 4-5: indeks chunk_size di _CHUNK_SIZES; bigram bernilai 0 sehingga header
+# bigram tetap sama seperti sebelum chunk_size bisa diatur.
+_PAD_SHIFT = 2
+_CHUNK_SHIFT = 4
+_CHUNK_SIZES = (2, 3, 4, 1)
+
+# magic, versi, flag, jumlah karakter, jumlah huruf, jumlah run non-huruf,
+# jumlah elemen run kapital, panjang body (setelah kompresi)
+_PREFIX = struct.Struct('<3sBBQQIII')
+
+# Indeks seek (opsional): jarak antar-entri dalam baris puisi dan jumlah entri,
+# lalu entri-entri uint64 little-endian. Setiap entri menandai awal satu baris
+# puisi dan menyimpan keadaan yang dibutuhkan untuk mulai mendekripsi dari sana.
+_INDEX_PREFIX = struct.Struct('<II')
+_TAIL = struct.Struct('<QQ')
+SEEK_INDEX_FIELDS = (
+    "byte",        # offset byte baris dari awal body puisi
+    "alpha",       # jumlah huruf sebelum baris ini (fase kunci)
+    "plain",       # offset karakter plaintext dari huruf pertama baris ini
+    "run",         # indeks run non-huruf berikutnya
+    "gap_left",    # huruf tersisa sebelum run tersebut (0 = tidak ada run lagi)
+    "case",        # indeks run di `upper` yang sedang berjalan
+    "case_left",   # huruf tersisa di run `upper` tersebut (0 = sisa huruf kecil)
+)
+
+# Jumlah elemen gaps + upper minimum agar `tail` disimpan di header.
+TAIL_MIN_RUNS = 256
+
+# Body yang lebih kecil dari ini tidak dikompresi; overhead zlib tidak sepadan.
+_MIN_COMPRESS_SIZE = 64
+
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+def _to_le_buffer(values, typecode=_UINT32):
+    """Buffer uint32 (atau `typecode`) little-endian; array yang sudah sesuai dipakai langsung tanpa salinan."""
+    if not (isinstance(values, array) and values.typecode == typecode):
+        values = array(typecode, values)
+    elif sys.byteorder == 'big':
+        values = array(typecode, values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _from_le_bytes(data, typecode=_UINT32):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def new_header(alpha, length, gaps, runs, run_text, upper, padded=0, chunk_size=2, tail=None):
+    """
+    Membuat objek header v2 (dict) dari hasil split_runs sebuah backend.
+    `tail` dihitung dari gaps/upper jika tidak diberikan.
+    """
+    if tail is None:
+        tail = (alpha - sum(gaps), alpha - sum(upper))
+    return {
+        "version": HEADER_VERSION,
+        "alpha": alpha,
+        "length": length,
+        "gaps": gaps,
+        "runs": runs,
+        "run_text": run_text,
+        "upper": upper,
+        "padded": padded,
+        "chunk_size": chunk_size,
+        "tail": tuple(tail),
+    }
+
+def is_packed_header(data):
+    return data[:len(HEADER_MAGIC)] == HEADER_MAGIC
+
+def pack_header(header_obj, compress=True):
+    """Mengemas header v2 menjadi bytes."""
+    gaps, runs, upper = header_obj["gaps"], header_obj["runs"], header_obj["upper"]
+    body = b"".join((
+        _to_le_buffer(gaps),
+        _to_le_buffer(runs),
+        _to_le_buffer(upper),
+        header_obj["run_text"].encode('utf-8', 'surrogatepass'),
+    ))
+    padded = int(header_obj["padded"])
+    if not 0 <= padded <= 3:
+        raise ValueError("Jumlah padding header harus 0 sampai 3.")
+    flags = (_FLAG_PADDED if padded else 0) | (padded << _PAD_SHIFT if padded > 1 else 0)
+    flags |= _CHUNK_SIZES.index(header_obj.get("chunk_size", 2)) << _CHUNK_SHIFT
+    if compress and len(body) >= _MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(body, 6)
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= _FLAG_ZLIB
+    index = header_obj.get("index")
+    suffix = b""
+    if index is not None:
+        flags |= _FLAG_INDEX
+        entries = index["entries"]
+        suffix = _INDEX_PREFIX.pack(index["stride"], len(entries) // len(SEEK_INDEX_FIELDS))
+        suffix += _to_le_buffer(entries, 'Q').tobytes()
+    if len(gaps) + len(upper) >= TAIL_MIN_RUNS:
+        flags |= _FLAG_TAIL
+        suffix += _TAIL.pack(*header_obj["tail"])
+    prefix = _PREFIX.pack(HEADER_MAGIC, HEADER_VERSION, flags, header_obj["length"],
+                          header_obj["alpha"], len(gaps), len(upper), len(body))
+    return prefix + body + suffix
+
+def unpack_header(data, offset=0):
+    """Membaca satu header v2 dari `data` mulai `offset`; mengembalikan (header, offset_akhir)."""
+    try:
+        magic, version, flags, length, alpha, n_runs, n_upper, body_len = _PREFIX.unpack_from(data, offset)
+    except struct.error:
+        raise ValueError("Header biner terpotong.")
+    if magic != HEADER_MAGIC:
+        raise ValueError("Header biner tidak dikenali.")
+    if version != HEADER_VERSION:
+        raise ValueError(f"Versi header {version} tidak didukung.")
+    start = offset + _PREFIX.size
+    end = start + body_len
+    body = bytes(data[start:end])
+    if len(body) != body_len:
+        raise ValueError("Header biner terpotong.")
+    if flags & _FLAG_ZLIB:
+        # Ukuran body asli sudah bisa dihitung dari prefix (tepat untuk run_text
+        # ASCII); buffer seukuran itu menghindari realokasi berulang oleh zlib.
+        # Dibatasi rasio kompresi maksimum deflate agar header rusak tidak
+        # meminta buffer raksasa.
+        expected = 4 * (2 * n_runs + n_upper) + max(0, length - alpha)
+        try:
+            body = zlib.decompress(body, bufsize=max(1, min(expected, 1032 * body_len)))
+        except zlib.error:
+            raise ValueError("Body header biner rusak.")
+    runs_end = 4 * n_runs
+    upper_end = 2 * runs_end + 4 * n_upper
+    # memoryview: potongan body dibaca langsung tanpa salinan bytes perantara.
+    view = memoryview(body)
+    header_obj = new_header(
+        alpha, length,
+        _from_le_bytes(view[:runs_end]),
+        _from_le_bytes(view[runs_end:2 * runs_end]),
+        str(view[upper_end:], 'utf-8', 'surrogatepass'),
+        _from_le_bytes(view[2 * runs_end:upper_end]),
+        (flags >> _PAD_SHIFT) & 3 or int(bool(flags & _FLAG_PADDED)),
+        _CHUNK_SIZES[(flags >> _CHUNK_SHIFT) & 3],
+        _unpack_tail(data, end, flags),
+    )
+    if flags & _FLAG_INDEX:
+        try:
+            stride, n_entries = _INDEX_PREFIX.unpack_from(data, end)
+        except struct.error:
+            raise ValueError("Indeks seek header terpotong.")
+        start = end + _INDEX_PREFIX.size
+        end = start + 8 * len(SEEK_INDEX_FIELDS) * n_entries
+        entries = bytes(data[start:end])
+        if len(entries) != end - start:
+            raise ValueError("Indeks seek header terpotong.")
+        header_obj["index"] = {"stride": stride, "entries": _from_le_bytes(entries, 'Q')}
+    if flags & _FLAG_TAIL:
+        end += _TAIL.size
+    return header_obj, end
+
+def _unpack_tail(data, end, flags):
+    """`tail` yang tersimpan di akhir header (setelah indeks seek, jika ada); None untuk header lama."""
+    if not flags & _FLAG_TAIL:
+        return None
+    if flags & _FLAG_INDEX:
+        try:
+            n_entries = _INDEX_PREFIX.unpack_from(data, end)[1]
+        except struct.error:
+            raise ValueError("Indeks seek header terpotong.")
+        end += _INDEX_PREFIX.size + 8 * len(SEEK_INDEX_FIELDS) * n_entries
+    try:
+        return _TAIL.unpack_from(data, end)
+    except struct.error:
+        raise ValueError("Header biner terpotong.")
+
+def restore_plaintext(decrypted_upper, header_obj):
+    """Mengembalikan huruf kapital dan run non-huruf ke huruf hasil dekripsi."""
+    lower = decrypted_upper.lower()
+    cased = []
+    pos = 0
+    for i, run_len in enumerate(header_obj["upper"]):
+        cased.append((decrypted_upper if i % 2 else lower)[pos:pos + run_len])
+        pos += run_len
+    cased.append(lower[pos:])
+    letters = "".join(cased)
+
+    run_text = header_obj["run_text"]
+    parts = []
+    alpha_idx = 0
+    text_idx = 0
+    for gap, run_len in zip(header_obj["gaps"], header_obj["runs"]):
+        parts.append(letters[alpha_idx:alpha_idx + gap])
+        parts.append(run_text[text_idx:text_idx + run_len])
+        alpha_idx += gap
+        text_idx += run_len
+    parts.append(letters[alpha_idx:])
+    return "".join(parts)
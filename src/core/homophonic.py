@@ -0,0 +1,164 @@
+# src/core/homophonic.py
+
+import random
+
+from src.core.backends import numpy_for
+
+# --- CODEBOOK HOMOFONIK (TABEL ALIAS) ---
+# Entri tema boleh berisi beberapa frasa untuk chunk yang sama:
+#   "AB": {"phrase": ..., "rhyme_key": ..., "weight": 3,
+#          "variants": [{"phrase": ..., "rhyme_key": ..., "weight": 1}, ...]}
+# Frasa utama ("phrase") tetap dipakai oleh enkripsi biasa. Enkripsi homofonik
+# memilih satu frasa per kemunculan chunk sesuai bobotnya lewat tabel alias
+# Vose: setiap pilihan hanya butuh satu bilangan acak, satu perbandingan, dan
+# dua akses list, berapa pun jumlah variannya. Mode 'rhyme' mengikuti pola
+# parikan a-b-a-b: baris ke-3 dan ke-4 bait lebih memilih varian yang
+# berima sama dengan baris ke-1 dan ke-2 (tabel alias per chunk dan rima).
+HOMOPHONIC_MODES = ('weighted', 'rhyme')
+# Mulai jumlah baris ini, pilihan berbobot (tanpa rima) dihitung dengan NumPy
+# (jika sudah dimuat, lihat backends.numpy_for).
+NUMPY_MIN_LINES = 4096
+
+def check_weights(dictionary):
+    """
+    Memeriksa bobot semua frasa tema saat dimuat: harus int/float (bukan bool)
+    dan tidak negatif, dan setiap chunk punya paling sedikit satu bobot > 0.
+    """
+    for key, entry in dictionary.items():
+        total = 0
+        for item in (entry, *entry.get('variants', ())):
+            weight = item.get('weight', 1)
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight >= 0:
+                raise ValueError(f"Bobot frasa '{item.get('phrase')}' harus bilangan tidak negatif, bukan {weight!r}.")
+            total += weight
+        if total <= 0:
+            raise ValueError(f"Semua frasa chunk '{key}' berbobot 0.")
+
+def alias_table(weights):
+    """
+    Tabel alias Vose untuk bobot tidak negatif: (prob, alias) dengan indeks
+    lokal 0..n-1. Bobot 0 diberi prob 0 dan tidak pernah menjadi alias, jadi
+    frasanya tidak pernah terpilih.
+    """
+    n = len(weights)
+    total = float(sum(weights))
+    if n == 0 or total <= 0 or min(weights) < 0:
+        raise ValueError("Bobot frasa harus positif.")
+    scaled = [weight * n / total for weight in weights]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, value in enumerate(scaled) if value < 1.0]
+    large = [i for i, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less], alias[less] = scaled[less], more
+        scaled[more] += scaled[less] - 1.0
+        (small if scaled[more] < 1.0 else large).append(more)
+    # Sisa pembulatan float bisa meninggalkan slot berbobot 0 dengan prob 1.0.
+    heaviest = max(range(n), key=weights.__getitem__)
+    for i, weight in enumerate(weights):
+        if weight == 0:
+            prob[i], alias[i] = 0.0, heaviest
+    return prob, alias
+
+class HomophoneTable:
+    """
+    Semua frasa tema dalam satu list slot (per id chunk: frasa utama lalu
+    variannya) beserta tabel alias global dan tabel alias per (chunk, rima).
+    `groups[id chunk]` adalah list (frasa, bobot, rima) dengan frasa utama lebih dulu.
+    """
+
+    def __init__(self, groups):
+        self.phrases, self.rhymes = [], []
+        self.base, self.count = [], []
+        self.prob, self.alias = [], []
+        # (id chunk, rima) -> (slot, prob, alias) untuk chunk yang punya lebih dari satu frasa
+        self.rhyme_tables = {}
+        for chunk_id, group in enumerate(groups):
+            base = len(self.phrases)
+            self.base.append(base)
+            self.count.append(len(group))
+            prob, alias = alias_table([weight for _, weight, _ in group])
+            self.prob.extend(prob)
+            self.alias.extend(base + i for i in alias)
+            for phrase, _, rhyme in group:
+                self.phrases.append(phrase)
+                self.rhymes.append(rhyme)
+            if len(group) == 1:
+                continue
+            by_rhyme = {}
+            for i, (_, weight, rhyme) in enumerate(group):
+                if rhyme is not None and weight > 0:
+                    by_rhyme.setdefault(rhyme, []).append((base + i, weight))
+            for rhyme, members in by_rhyme.items():
+                prob, alias = alias_table([weight for _, weight in members])
+                slots = [slot for slot, _ in members]
+                self.rhyme_tables[chunk_id, rhyme] = (slots, prob, [slots[i] for i in alias])
+        self._arrays = None
+
+    @classmethod
+    def from_dictionary(cls, dictionary, chunk_keys):
+        """Dibuat dari dictionary tema; chunk tanpa entri memakai placeholder seperti _build_phrase_table."""
+        groups = []
+        for key in chunk_keys:
+            entry = dictionary.get(key)
+            if entry is None:
+                groups.append([(f"({key})", 1, None)])
+                continue
+            group = [(entry['phrase'], entry.get('weight', 1), entry.get('rhyme_key'))]
+            group.extend((variant['phrase'], variant.get('weight', 1), variant.get('rhyme_key'))
+                         for variant in entry.get('variants', ()))
+            groups.append(group)
+        return cls(groups)
+
+    def _pick_slot(self, chunk_id, rand):
+        u = rand() * self.count[chunk_id]
+        j = int(u)
+        slot = self.base[chunk_id] + j
+        return slot if u - j < self.prob[slot] else self.alias[slot]
+
+    def pick(self, ids, rng=None, rhyme=False):
+        """Satu frasa per id chunk, dipilih acak sesuai bobot (dan rima bait jika rhyme=True)."""
+        rng = rng or random.Random()
+        if rhyme:
+            return self._pick_rhyme(ids, rng)
+        np = numpy_for(len(ids)) if len(ids) >= NUMPY_MIN_LINES else None
+        if np is not None:
+            return self._pick_numpy(np, ids, rng)
+        phrases, count, base, prob, alias, rand = self.phrases, self.count, self.base, self.prob, self.alias, rng.random
+        picked = []
+        for chunk_id in (ids.tolist() if hasattr(ids, 'tolist') else ids):
+            u = rand() * count[chunk_id]
+            j = int(u)
+            slot = base[chunk_id] + j
+            picked.append(phrases[slot if u - j < prob[slot] else alias[slot]])
+        return picked
+
+    def _pick_numpy(self, np, ids, rng):
+        if self._arrays is None:
+            self._arrays = (np.array(self.count, dtype=np.int64), np.array(self.base, dtype=np.int64),
+                            np.array(self.prob), np.array(self.alias, dtype=np.int64))
+        count, base, prob, alias = self._arrays
+        ids = np.asarray(ids, dtype=np.int64)
+        u = np.random.default_rng(rng.getrandbits(64)).random(len(ids)) * count[ids]
+        j = u.astype(np.int64)
+        slots = base[ids] + j
+        slots = np.where(u - j < prob[slots], slots, alias[slots])
+        return list(map(self.phrases.__getitem__, slots.tolist()))
+
+    def _pick_rhyme(self, ids, rng):
+        rand = rng.random
+        slots = []
+        for i, chunk_id in enumerate(ids.tolist() if hasattr(ids, 'tolist') else ids):
+            table = None
+            if i % 4 >= 2:
+                # Pasangan rima parikan: baris 3 dengan baris 1, baris 4 dengan baris 2.
+                table = self.rhyme_tables.get((chunk_id, self.rhymes[slots[i - 2]]))
+            if table is None:
+                slots.append(self._pick_slot(chunk_id, rand))
+                continue
+            members, prob, alias = table
+            u = rand() * len(members)
+            j = int(u)
+            slots.append(members[j] if u - j < prob[j] else alias[j])
+        return list(map(self.phrases.__getitem__, slots))
@@ -0,0 +1,317 @@
+# src/core/lowmem.py
+
+import io
+from array import array
+from itertools import repeat
+
+from src.core.backends import get_backend
+from src.core.profiling import PROFILER
+from src.core.header import new_header, pack_header, unpack_header
+from src.core.engine import (
+    BOUNDARY,
+    DEFAULT_CHUNK_SIZE,
+    MODES,
+    PADDING_CHAR,
+    load_codebook,
+    vigenere_process,
+    _bytes_to_zero_width,
+    _check_headerless_length,
+    _locate_zero_width_payload,
+    _mode_functions,
+    _pad_count,
+    _parse_header,
+    _rotate_key,
+    _serialize_header
+)
+
+# --- MODE HEMAT MEMORI ---
+# encrypt_into/decrypt_into menghasilkan output yang sama persis dengan
+# fungsi wrapper biasa, tetapi teks diproses per blok LOW_MEMORY_BLOCK
+# karakter dan puisi/plaintext langsung ditulis ke `sink` (objek dengan
+# method write, misalnya io.StringIO atau file). Selain output, yang tumbuh
+# bersama input hanyalah header: run non-huruf dan run kapital (array uint32)
+# serta teks non-huruf.
+LOW_MEMORY_BLOCK = 64 * 1024
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+class _LayoutBuilder:
+    """Mengumpulkan data header v2 blok demi blok; run yang terpotong batas blok disambung."""
+
+    def __init__(self):
+        self.alpha = 0
+        self.gaps, self.runs, self.upper = array(_UINT32), array(_UINT32), array(_UINT32)
+        self.run_text = []
+        self._letters_since_run = 0
+        self._lower_since_upper = 0
+
+    def add(self, letter_count, gaps, runs, run_text, upper):
+        self.alpha += letter_count
+        self.run_text.append(run_text)
+        if runs:
+            # Gap 0 dan tidak ada huruf sejak run terakhir: run ini lanjutan run di blok sebelumnya.
+            if gaps[0] == 0 and self._letters_since_run == 0 and self.runs:
+                self.runs[-1] += runs[0]
+            else:
+                self.gaps.append(self._letters_since_run + gaps[0])
+                self.runs.append(runs[0])
+            self.gaps.extend(gaps[1:])
+            self.runs.extend(runs[1:])
+            self._letters_since_run = letter_count - sum(gaps)
+        else:
+            self._letters_since_run += letter_count
+        if upper:
+            if upper[0] == 0 and self._lower_since_upper == 0 and self.upper:
+                self.upper[-1] += upper[1]
+            else:
+                self.upper.append(self._lower_since_upper + upper[0])
+                self.upper.append(upper[1])
+            self.upper.extend(upper[2:])
+            self._lower_since_upper = letter_count - sum(upper)
+        else:
+            self._lower_since_upper += letter_count
+
+    def header(self, length, padded, chunk_size):
+        return new_header(self.alpha, length, self.gaps, self.runs, "".join(self.run_text), self.upper,
+                          padded, chunk_size, (self._letters_since_run, self._lower_since_upper))
+
+class _PoemWriter:
+    """Menulis baris puisi dari huruf ciphertext ke sink, dengan format bait yang sama seperti core_encrypt."""
+
+    def __init__(self, sink, codebook, backend):
+        self.sink = sink
+        self.phrases = codebook.phrases
+        self.chunk_size = codebook.chunk_size
+        self.backend = backend
+        self.line_no = 0
+        self.carry = ""
+
+    def write(self, cipher_letters):
+        cipher_letters = self.carry + cipher_letters
+        keep = len(cipher_letters) - len(cipher_letters) % self.chunk_size
+        self.carry = cipher_letters[keep:]
+        self._write_lines(cipher_letters[:keep])
+
+    def finish(self):
+        padded = _pad_count(len(self.carry), self.chunk_size)
+        if self.carry:
+            self._write_lines(self.carry + PADDING_CHAR * padded)
+        return padded
+
+    def _write_lines(self, cipher_letters):
+        if not cipher_letters:
+            return
+        with PROFILER.stage("lookup") as stage:
+            stage.add(len(cipher_letters))
+            lines = self.backend.gather(self.phrases, self.backend.chunk_ids(cipher_letters, self.chunk_size))
+        with PROFILER.stage("assemble"):
+            parts = []
+            line_no = self.line_no
+            for line in lines:
+                if line_no:
+                    parts.append("\n\n" if line_no % 4 == 0 else "\n")
+                parts.append(line)
+                line_no += 1
+            self.line_no = line_no
+            self.sink.write("".join(parts))
+
+def _encrypt_blocks(plaintext, key_upper, backend, poem=None, layout=None):
+    """Satu lintasan per blok: mengisi `layout` dan/atau menulis puisi terenkripsi ke `poem`."""
+    block_size = LOW_MEMORY_BLOCK
+    phase = 0
+    for start in range(0, len(plaintext), block_size):
+        with PROFILER.stage("split") as stage:
+            block = plaintext[start:start + block_size]
+            stage.add_text(block)
+            letters, gaps, runs, run_text, upper = backend.split_runs(block)
+        if layout is not None:
+            layout.add(len(letters), gaps, runs, run_text, upper)
+        if poem is not None and letters:
+            poem.write(vigenere_process(letters, _rotate_key(key_upper, phase), 'encrypt', backend))
+            phase += len(letters)
+
+def encrypt_into(plaintext, key, theme_path, sink=None, mode='standard', backend=None):
+    """
+    Versi hemat memori dari encrypt/encrypt_headerless/encrypt_steganography.
+    Output ditulis ke `sink`; jika sink None, hasilnya dikembalikan sebagai
+    string (lewat io.StringIO).
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    if mode not in MODES:
+        raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    output = io.StringIO() if sink is None else sink
+    key_upper = key.upper()
+    layout = _LayoutBuilder()
+    poem = _PoemWriter(output, codebook, backend)
+
+    if mode == 'steganography':
+        # Payload ada di akhir puisi, jadi header cukup dikumpulkan sambil menulis.
+        _encrypt_blocks(plaintext, key_upper, backend, poem, layout)
+        header_obj = layout.header(len(plaintext), poem.finish(), codebook.chunk_size)
+        with PROFILER.stage("header") as stage:
+            stego_payload = _bytes_to_zero_width(pack_header(header_obj))
+            stage.add_text(stego_payload)
+        output.write(stego_payload)
+    else:
+        # Header (atau pemeriksaan panjang headerless) dibutuhkan sebelum
+        # puisi, sehingga teks dilewati dua kali alih-alih menyimpan hurufnya.
+        _encrypt_blocks(plaintext, key_upper, backend, layout=layout)
+        padded = _pad_count(layout.alpha, codebook.chunk_size)
+        if mode == 'headerless':
+            _check_headerless_length(layout.alpha, codebook.chunk_size)
+        else:
+            header_obj = layout.header(len(plaintext), padded, codebook.chunk_size)
+            output.write(_serialize_header(header_obj) + BOUNDARY)
+        layout = None
+        _encrypt_blocks(plaintext, key_upper, backend, poem)
+        poem.finish()
+    return output.getvalue() if sink is None else None
+
+class _PlaintextWriter:
+    """Mengembalikan huruf kapital dan run non-huruf header v2 blok demi blok (lihat restore_plaintext)."""
+
+    def __init__(self, sink, header_obj):
+        self.sink = sink
+        self.upper = header_obj["upper"]
+        self.gaps = header_obj["gaps"]
+        self.runs = header_obj["runs"]
+        self.run_text = header_obj["run_text"]
+        self._case_index = 0
+        self._case_left = self.upper[0] if self.upper else None
+        self._run_index = 0
+        self._text_pos = 0
+        self._gap_left = self.gaps[0] if self.gaps else None
+
+    def seek(self, alpha, plain, run, gap_left, case, case_left):
+        """Melompat ke keadaan satu entri indeks seek (lihat SEEK_INDEX_FIELDS)."""
+        self._run_index, self._gap_left = run, gap_left or None
+        self._text_pos = plain - alpha
+        self._case_index, self._case_left = case, case_left or None
+
+    def _apply_case(self, letters_upper):
+        upper, index, left = self.upper, self._case_index, self._case_left
+        lower = letters_upper.lower()
+        parts = []
+        pos = 0
+        size = len(letters_upper)
+        while pos < size:
+            if left is None:
+                parts.append(lower[pos:])
+                break
+            take = left if left < size - pos else size - pos
+            parts.append((letters_upper if index % 2 else lower)[pos:pos + take])
+            pos += take
+            left -= take
+            while left == 0:
+                index += 1
+                left = upper[index] if index < len(upper) else None
+        self._case_index, self._case_left = index, left
+        return "".join(parts)
+
+    def write(self, letters_upper):
+        with PROFILER.stage("restore") as stage:
+            letters = self._apply_case(letters_upper)
+            gaps, runs, run_text = self.gaps, self.runs, self.run_text
+            index, text_pos, gap_left = self._run_index, self._text_pos, self._gap_left
+            parts = []
+            append = parts.append
+            pos = 0
+            size = len(letters)
+            while gap_left is not None and gap_left <= size - pos:
+                append(letters[pos:pos + gap_left])
+                pos += gap_left
+                run_len = runs[index]
+                append(run_text[text_pos:text_pos + run_len])
+                text_pos += run_len
+                index += 1
+                gap_left = gaps[index] if index < len(gaps) else None
+            if gap_left is not None:
+                gap_left -= size - pos
+            append(letters[pos:])
+            self._run_index, self._text_pos, self._gap_left = index, text_pos, gap_left
+            piece = "".join(parts)
+            stage.add_text(piece)
+            self.sink.write(piece)
+
+    def finish(self):
+        # Run non-huruf di akhir teks (atau sisa run jika huruf kurang dari header).
+        self.sink.write(self.run_text[self._text_pos:])
+
+def _iter_poem_blocks(text, start, end, block_chars):
+    """
+    Baris tidak kosong dari text[start:end].strip(), per blok sekitar
+    `block_chars` karakter (dipotong di akhir baris) tanpa menyalin seluruh puisi.
+    """
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    while start < end:
+        cut = text.find('\n', min(start + block_chars, end), end)
+        if cut == -1:
+            cut = end
+        yield [line for line in text[start:cut].split('\n') if line]
+        start = cut + 1
+
+def decrypt_into(ciphertext, key, theme_path, sink=None, mode='standard', backend=None):
+    """
+    Versi hemat memori dari decrypt/decrypt_headerless/decrypt_steganography.
+    Ciphertext dengan header v1 (JSON) atau steganografi codec v1 didekripsi
+    lewat jalur biasa lalu ditulis ke sink.
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    if mode not in MODES:
+        raise ValueError(f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    output = io.StringIO() if sink is None else sink
+    header_obj = None
+    body_start, body_end = 0, len(ciphertext)
+
+    if mode == 'standard':
+        boundary = ciphertext.find(BOUNDARY)
+        try:
+            if boundary == -1:
+                raise ValueError
+            header_obj = _parse_header(ciphertext[:boundary])
+        except Exception:
+            raise ValueError("Invalid ciphertext format or corrupt header.")
+        body_start = boundary + len(BOUNDARY)
+    elif mode == 'steganography':
+        with PROFILER.stage("parse_header") as stage:
+            located = _locate_zero_width_payload(ciphertext)
+            if located is not None:
+                body_end, payload = located
+                header_obj = unpack_header(payload)[0]
+                stage.add(len(payload))
+    if mode != 'headerless' and (header_obj is None or header_obj.get("version", 1) < 2):
+        output.write(_mode_functions(mode)[1](ciphertext, key, codebook, backend))
+        return output.getvalue() if sink is None else None
+
+    if header_obj is not None and header_obj.get("chunk_size", DEFAULT_CHUNK_SIZE) != codebook.chunk_size:
+        raise ValueError(f"Ciphertext dibuat dengan chunk_size {header_obj.get('chunk_size', DEFAULT_CHUNK_SIZE)}, "
+                         f"tetapi tema ini memakai chunk_size {codebook.chunk_size}.")
+    key_upper = key.upper()
+    inverse_get = codebook.inverse.get
+    writer = output if header_obj is None else _PlaintextWriter(output, header_obj)
+    # Header menyimpan jumlah huruf asli; huruf padding di akhir diabaikan.
+    remaining = None if header_obj is None else header_obj["alpha"]
+    phase = 0
+    # Satu baris puisi jauh lebih panjang dari huruf yang diwakilinya.
+    for lines in _iter_poem_blocks(ciphertext, body_start, body_end, 4 * LOW_MEMORY_BLOCK):
+        if remaining is not None and remaining <= 0:
+            break
+        with PROFILER.stage("inverse") as stage:
+            letters = "".join(map(inverse_get, lines, repeat("")))
+            stage.add(len(letters))
+        if remaining is not None:
+            letters = letters[:remaining]
+            remaining -= len(letters)
+        writer.write(vigenere_process(letters, _rotate_key(key_upper, phase), 'decrypt', backend))
+        phase += len(letters)
+    if header_obj is not None:
+        writer.finish()
+    return output.getvalue() if sink is None else None
@@ -0,0 +1,170 @@
+# src/core/matching.py
+
+import heapq
+import unicodedata
+from collections import Counter, defaultdict
+
+# --- PENCOCOKAN FRASA TOLERAN ---
+# Puisi yang melewati aplikasi chat atau email sering kembali dengan huruf
+# besar/kecil berubah, spasi dirapatkan atau diganda, dan salah ketik kecil.
+# PhraseMatcher mencocokkan baris seperti itu dalam dua tingkat:
+#   1. kunci ternormalisasi (NFKC, casefold, spasi dirapatkan) lewat dict;
+#   2. indeks trigram dengan prefix filtering: frasa berjarak <= limit
+#      berbagi paling sedikit T trigram dengan baris (batas q-gram), jadi
+#      pasti memuat salah satu dari (jumlah trigram - T + 1) trigram baris
+#      yang paling jarang. Hanya posting list trigram jarang itu yang dibaca;
+#      kandidatnya disaring dengan batas panjang dan jumlah trigram bersama,
+#      lalu hanya yang lolos (paling banyak MAX_CANDIDATES, dari yang paling
+#      banyak berbagi trigram) yang dihitung jarak Levenshtein-nya.
+# Baris hanya diterima jika frasa terdekat unik dan jaraknya dalam batas.
+NGRAM = 3
+# Jarak edit maksimum: satu edit per sekian karakter baris (minimal 1).
+CHARS_PER_EDIT = 6
+# Kandidat terbanyak (menurut jumlah trigram bersama) yang dihitung jarak editnya.
+MAX_CANDIDATES = 32
+_PAD = "\x00" * (NGRAM - 1)
+
+def normalize_line(line):
+    """Kunci pembanding baris: NFKC, casefold, dan spasi beruntun menjadi satu spasi."""
+    return " ".join(unicodedata.normalize('NFKC', line).casefold().split())
+
+def _ngrams(text):
+    """
+    Trigram teks (dengan padding) sebagai (trigram, kemunculan ke-k); trigram
+    yang muncul dua kali menjadi dua kunci berbeda, sehingga irisan dua himpunan
+    ini sama dengan irisan multiset trigramnya.
+    """
+    padded = _PAD + text + _PAD
+    seen = Counter()
+    grams = []
+    for i in range(len(padded) - NGRAM + 1):
+        gram = padded[i:i + NGRAM]
+        seen[gram] += 1
+        grams.append((gram, seen[gram]))
+    return grams
+
+def max_distance(text):
+    return max(1, len(text) // CHARS_PER_EDIT)
+
+def edit_distance(a, b, limit):
+    """Jarak Levenshtein a-b, atau limit + 1 jika lebih dari `limit` (berhenti lebih awal)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+class PhraseMatcher:
+    """Indeks frasa -> chunk untuk baris yang tidak cocok persis; dibuat sekali per codebook."""
+
+    def __init__(self, items):
+        # Kunci ternormalisasi -> id frasa; None jika dua frasa berbeda chunk
+        # menjadi sama setelah normalisasi (tidak bisa dibedakan).
+        self.normalized = {}
+        self.keys, self.phrases, self.chunks = [], [], []
+        self.postings = defaultdict(list)
+        # Himpunan trigram tiap frasa, untuk menghitung trigram bersama kandidat.
+        self.gram_sets = []
+        for phrase, chunk in items:
+            key = normalize_line(phrase)
+            if key in self.normalized:
+                phrase_id = self.normalized[key]
+                if phrase_id is not None and self.chunks[phrase_id] != chunk:
+                    self.normalized[key] = None
+                continue
+            self.normalized[key] = len(self.keys)
+            self.keys.append(key)
+            self.phrases.append(phrase)
+            self.chunks.append(chunk)
+            self.gram_sets.append(frozenset(_ngrams(key)))
+        for key, phrase_id in self.normalized.items():
+            if phrase_id is None:
+                continue
+            for gram in _ngrams(key):
+                self.postings[gram].append(phrase_id)
+
+    def candidates(self, key, limit):
+        """
+        (jumlah trigram bersama, id frasa) untuk frasa yang mungkin berjarak
+        <= limit dari `key`, paling banyak MAX_CANDIDATES dan dari yang paling
+        banyak berbagi trigram.
+        """
+        grams = _ngrams(key)
+        # Batas q-gram: dua teks berjarak <= limit berbagi paling sedikit
+        # max(panjang) + NGRAM - 1 - NGRAM * limit trigram (dengan padding).
+        needed = len(grams) - NGRAM * limit
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        probe = rarest if needed <= 0 else rarest[:len(grams) - needed + 1]
+        phrase_ids = set()
+        for gram in probe:
+            phrase_ids.update(self.postings.get(gram, ()))
+        query = frozenset(grams)
+        scored = []
+        for phrase_id in phrase_ids:
+            candidate_len = len(self.keys[phrase_id])
+            if abs(candidate_len - len(key)) > limit:
+                continue
+            count = len(query & self.gram_sets[phrase_id])
+            if count >= max(len(key), candidate_len) + NGRAM - 1 - NGRAM * limit:
+                scored.append((count, phrase_id))
+        return heapq.nlargest(MAX_CANDIDATES, scored)
+
+    def match(self, line):
+        """
+        Mengembalikan (chunk, frasa, jarak edit ternormalisasi) untuk baris, atau
+        None jika tidak ada frasa yang cukup dekat atau ada dua frasa sama dekat.
+        """
+        key = normalize_line(line)
+        if not key:
+            return None
+        if key in self.normalized:
+            phrase_id = self.normalized[key]
+            return None if phrase_id is None else (self.chunks[phrase_id], self.phrases[phrase_id], 0)
+        limit = max_distance(key)
+        best_id, tied = None, False
+        for count, phrase_id in self.candidates(key, limit):
+            candidate = self.keys[phrase_id]
+            # Batas q-gram diperketat setelah `limit` turun karena kandidat yang lebih dekat.
+            if count < max(len(key), len(candidate)) + NGRAM - 1 - NGRAM * limit:
+                continue
+            distance = edit_distance(key, candidate, limit)
+            if distance > limit:
+                continue
+            if best_id is None or distance < limit:
+                best_id, tied = phrase_id, False
+            else:
+                tied = True
+            # Setelah ada kandidat, yang lain hanya perlu diperiksa sampai jarak yang sama (seri).
+            limit = distance
+        if best_id is None or tied:
+            return None
+        return self.chunks[best_id], self.phrases[best_id], limit
+
+class MatchReport:
+    """
+    Hasil dekripsi toleran. `corrected` berisi (nomor baris, baris asli, frasa,
+    jarak edit) untuk baris yang diperbaiki; `unmatched` berisi (nomor baris,
+    baris asli) untuk baris yang tidak bisa dicocokkan dengan yakin dan dibuang.
+    Nomor baris dihitung dari 1 di badan puisi.
+    """
+
+    def __init__(self):
+        self.corrected = []
+        self.unmatched = []
+
+    def __bool__(self):
+        return bool(self.corrected or self.unmatched)
+
+    def summary(self, limit=5):
+        lines = [f"{len(self.corrected)} baris diperbaiki, {len(self.unmatched)} baris tidak dikenali."]
+        for line_no, line in self.unmatched[:limit]:
+            lines.append(f"  baris {line_no}: {line!r}")
+        if len(self.unmatched) > limit:
+            lines.append(f"  ... dan {len(self.unmatched) - limit} baris lain")
+        return "\n".join(lines)
@@ -0,0 +1,267 @@
+# src/core/parallel.py
+
+import os
+from bisect import bisect_right
+from functools import partial
+from itertools import accumulate, repeat
+
+from src.core.backends import get_backend
+from src.core.profiling import PROFILER
+from src.core.header import new_header, restore_plaintext
+from src.core.engine import (
+    PADDING_CHAR,
+    Codebook,
+    vigenere_process,
+    _assemble_stanzas,
+    _chunk_size,
+    _inverse_table,
+    _pad_count,
+    _phrase_table,
+    _rotate_key
+)
+from src.core.lowmem import _LayoutBuilder
+
+# --- PARALEL UNTUK SATU PESAN BESAR ---
+# core_encrypt/core_decrypt dengan workers > 1 membagi satu pesan ke process
+# pool. Teks (atau puisi) disalin sekali ke shared memory sebagai UTF-8 dan
+# worker hanya menerima offset. Lintasan pertama memisahkan huruf per
+# potongan (enkripsi: split_runs, dekripsi: lookup baris puisi) lalu menulis
+# hurufnya kembali di awal potongan itu sendiri, satu byte per huruf.
+# Setelah jumlah huruf per potongan diketahui, aliran huruf dibagi ulang
+# menjadi segmen: fase kunci segmen adalah offset hurufnya, segmen enkripsi
+# berisi bait utuh (kelipatan 4 baris) sehingga puisinya cukup disambung
+# dengan "\n\n", dan header disambung dengan _LayoutBuilder seperti mode
+# hemat memori. Output sama persis dengan jalur serial.
+# Pesan yang lebih pendek dari ini diproses serial; ongkos menyalakan pool lebih besar.
+PARALLEL_MIN_CHARS = 1 << 20
+
+def _parallel_workers(workers, size):
+    """Jumlah worker efektif: 0/None = jumlah core, dan 1 untuk pesan pendek."""
+    if not workers:
+        workers = os.cpu_count() or 1
+    return workers if size >= PARALLEL_MIN_CHARS else 1
+
+# Keadaan proses worker; diisi sekali oleh initializer pool.
+_parallel_worker = {}
+
+def _init_parallel_worker(shm_name, table, header_obj, backend, profile):
+    from multiprocessing import shared_memory
+    _parallel_worker.update(
+        shm=shared_memory.SharedMemory(name=shm_name),
+        table=table,
+        header=header_obj,
+        backend=get_backend(backend),
+    )
+    if profile:
+        PROFILER.enable()
+
+def _run_parallel_task(func, task):
+    return func(*task), (PROFILER.take() if PROFILER.enabled else None)
+
+class _ParallelPool:
+    """Process pool beserta shared memory berisi `data`; statistik profiler worker digabung ke proses ini."""
+
+    def __init__(self, data, table, header_obj, backend, workers):
+        self.data = data
+        self.initargs = (table, header_obj, backend, PROFILER.enabled)
+        self.workers = workers
+
+    def __enter__(self):
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, len(self.data)))
+        try:
+            self.shm.buf[:len(self.data)] = self.data
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_parallel_worker,
+                                                initargs=(self.shm.name, *self.initargs))
+        except BaseException:
+            self._release()
+            raise
+        return self
+
+    def map(self, func, tasks):
+        results = []
+        for result, stats in self.executor.map(partial(_run_parallel_task, func), tasks):
+            if stats:
+                PROFILER.merge(stats)
+            results.append(result)
+        return results
+
+    def _release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __exit__(self, *exc_info):
+        try:
+            self.executor.shutdown()
+        finally:
+            self._release()
+        return False
+
+def _cut_points(data, parts, newline=False):
+    """Membagi bytes UTF-8 menjadi `parts` potongan (start, stop) di awal karakter, atau setelah "\\n"."""
+    size = len(data)
+    points = [0]
+    for k in range(1, parts):
+        pos = max(points[-1], size * k // parts)
+        if newline:
+            pos = data.find(b'\n', pos)
+            pos = size if pos == -1 else pos + 1
+        else:
+            while pos < size and data[pos] & 0xC0 == 0x80:
+                pos += 1
+        points.append(pos)
+    points.append(size)
+    return list(zip(points, points[1:]))
+
+def _segments(total, parts, align):
+    """Membagi huruf [0, total) menjadi paling banyak `parts` segmen yang batasnya kelipatan `align`."""
+    step = -(-total // (parts * align)) * align or align
+    return [(start, min(start + step, total)) for start in range(0, total, step)] or [(0, 0)]
+
+def _letter_regions(pieces, counts, start, stop):
+    """Bagian buffer (offset, panjang) yang memuat huruf ke-start sampai sebelum ke-stop."""
+    regions = []
+    alpha = 0
+    for (offset, _), count in zip(pieces, counts):
+        lo, hi = max(start, alpha), min(stop, alpha + count)
+        if lo < hi:
+            regions.append((offset + lo - alpha, hi - lo))
+        alpha += count
+    return regions
+
+def _store_letters(buf, start, stop, letters):
+    # Huruf non-ASCII cukup diwakili '?': bagi vigenere() keduanya sama-sama di luar A-Z.
+    data = letters.encode('ascii', 'replace')
+    if len(data) > stop - start:
+        # Baris puisi yang lebih pendek dari huruf yang diwakilinya; pemanggil kembali ke jalur serial.
+        return False
+    buf[start:start + len(data)] = data
+    return True
+
+def _read_letters(regions):
+    buf = _parallel_worker["shm"].buf
+    return "".join(str(buf[offset:offset + length], 'ascii') for offset, length in regions)
+
+def _parallel_split(start, stop):
+    buf = _parallel_worker["shm"].buf
+    with PROFILER.stage("split") as stage:
+        stage.add(stop - start)
+        text = str(buf[start:stop], 'utf-8', 'surrogatepass')
+        letters, gaps, runs, run_text, upper = _parallel_worker["backend"].split_runs(text)
+    if len(letters) != len(text) - len(run_text):
+        # Huruf yang memanjang saat upper() (mis. 'ß' -> 'SS') menggeser run kapital;
+        # header seperti itu hanya bisa dibuat ulang persis oleh jalur serial.
+        return None
+    if not _store_letters(buf, start, stop, letters):
+        return None
+    return len(letters), gaps, runs, run_text, upper
+
+def _parallel_encrypt_segment(regions, key_upper, padded):
+    table, backend = _parallel_worker["table"], _parallel_worker["backend"]
+    vigenere_ciphertext = vigenere_process(_read_letters(regions), key_upper, 'encrypt', backend)
+    vigenere_ciphertext += PADDING_CHAR * padded
+    with PROFILER.stage("lookup") as stage:
+        stage.add(len(vigenere_ciphertext))
+        poetic_lines = backend.gather(_phrase_table(table), backend.chunk_ids(vigenere_ciphertext, _chunk_size(table)))
+    with PROFILER.stage("assemble") as stage:
+        poem = _assemble_stanzas(poetic_lines)
+        stage.add_text(poem)
+    return poem
+
+def _parallel_encrypt(plaintext, key_upper, dictionary, backend, workers):
+    """Jalur paralel core_encrypt (header v2); None jika harus kembali ke jalur serial."""
+    chunk_size = _chunk_size(dictionary)
+    if not isinstance(dictionary, Codebook):
+        # Tabel frasa dibuat sekali di sini, bukan di setiap worker.
+        dictionary = Codebook(dictionary)
+    data = plaintext.encode('utf-8', 'surrogatepass')
+    pieces = _cut_points(data, workers)
+    with _ParallelPool(data, dictionary, None, backend, workers) as pool:
+        splits = pool.map(_parallel_split, pieces)
+        if None in splits:
+            return None
+        layout = _LayoutBuilder()
+        for split in splits:
+            layout.add(*split)
+        counts = [split[0] for split in splits]
+        padded = _pad_count(layout.alpha, chunk_size)
+        tasks = [
+            (_letter_regions(pieces, counts, start, stop), _rotate_key(key_upper, start),
+             padded if stop == layout.alpha else 0)
+            for start, stop in _segments(layout.alpha, workers, 4 * chunk_size)
+        ]
+        poetic_output = "\n\n".join(pool.map(_parallel_encrypt_segment, tasks)).strip()
+    return poetic_output, layout.header(len(plaintext), padded, chunk_size)
+
+def _parallel_inverse(start, stop):
+    buf = _parallel_worker["shm"].buf
+    inverse_get = _inverse_table(_parallel_worker["table"]).get
+    with PROFILER.stage("inverse") as stage:
+        lines = [line for line in str(buf[start:stop], 'utf-8', 'surrogatepass').split('\n') if line]
+        letters = "".join(map(inverse_get, lines, repeat("")))
+        stage.add(len(letters))
+    return len(letters) if _store_letters(buf, start, stop, letters) else None
+
+def _restore_window(start, stop, last, run_starts, text_before, case_bounds):
+    """
+    Bagian header v2 yang dipakai huruf [start, stop): (run, run_stop, gap_left,
+    text_start, text_stop, case, case_stop, case_left). Run non-huruf tepat di
+    `start` sudah ditulis segmen sebelumnya, kecuali run di awal teks.
+    """
+    run = bisect_right(run_starts, start) if start else 0
+    run_stop = len(run_starts) if last else bisect_right(run_starts, stop)
+    gap_left = run_starts[run] - start if run < len(run_starts) else 0
+    case = bisect_right(case_bounds, start)
+    case_stop = bisect_right(case_bounds, stop)
+    case_left = case_bounds[case] - start if case < len(case_bounds) else 0
+    return run, run_stop, gap_left, text_before[run], text_before[run_stop], case, case_stop, case_left
+
+def _parallel_decrypt_segment(regions, key_upper, window):
+    letters = vigenere_process(_read_letters(regions), key_upper, 'decrypt', _parallel_worker["backend"])
+    header_obj = _parallel_worker["header"]
+    if header_obj is None:
+        return letters
+    run, run_stop, gap_left, text_start, text_stop, case, case_stop, case_left = window
+    with PROFILER.stage("restore") as stage:
+        # Potongan header untuk segmen ini saja, lalu restore_plaintext seperti jalur serial.
+        gaps = [gap_left, *header_obj["gaps"][run + 1:run_stop]] if run < run_stop else []
+        upper = header_obj["upper"]
+        if case < len(upper):
+            # Indeks genap di `upper` adalah run huruf kecil; run kapital yang terpotong diawali run kosong.
+            upper = [0] * (case % 2) + [case_left, *upper[case + 1:case_stop + 1]]
+        else:
+            upper = []
+        segment_header = new_header(len(letters), 0, gaps, header_obj["runs"][run:run_stop],
+                                    header_obj["run_text"][text_start:text_stop], upper)
+        plaintext = restore_plaintext(letters, segment_header)
+        stage.add_text(plaintext)
+    return plaintext
+
+def _parallel_decrypt(poetic_body, key_upper, inverse_map, header_obj, backend, workers):
+    """
+    Jalur paralel core_decrypt (header v2) dan decrypt_headerless (header_obj
+    None); None jika harus kembali ke jalur serial, termasuk jika jumlah huruf
+    tidak cocok dengan header.
+    """
+    data = poetic_body.strip().encode('utf-8', 'surrogatepass')
+    pieces = _cut_points(data, workers, newline=True)
+    with _ParallelPool(data, inverse_map, header_obj, backend, workers) as pool:
+        counts = pool.map(_parallel_inverse, pieces)
+        if None in counts:
+            return None
+        alpha = sum(counts)
+        if header_obj is not None:
+            if alpha != header_obj["alpha"] + int(header_obj["padded"]):
+                return None
+            alpha = header_obj["alpha"]
+            run_starts = list(accumulate(header_obj["gaps"]))
+            text_before = [0, *accumulate(header_obj["runs"])]
+            case_bounds = list(accumulate(header_obj["upper"]))
+        tasks = [
+            (_letter_regions(pieces, counts, start, stop), _rotate_key(key_upper, start),
+             None if header_obj is None else
+             _restore_window(start, stop, stop == alpha, run_starts, text_before, case_bounds))
+            for start, stop in _segments(alpha, workers, 1)
+        ]
+        return "".join(pool.map(_parallel_decrypt_segment, tasks))
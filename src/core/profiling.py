@@ -0,0 +1,144 @@
+# src/core/profiling.py
+
+import threading
+import time
+
+# --- INSTRUMENTASI TAHAP ENGINE ---
+# Setiap tahap (muat tema, filter huruf, Vigenère, lookup frasa, susun bait,
+# header, ...) mencatat jumlah panggilan, total waktu, dan byte yang diproses.
+# Saat profiler mati, stage() mengembalikan satu objek no-op bersama sehingga
+# biayanya hanya satu pemanggilan method per tahap.
+STAGE_ORDER = (
+    "theme_load", "split", "vigenere", "lookup", "assemble", "header",
+    "parse_header", "inverse", "restore",
+)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add(self, nbytes):
+        pass
+
+    def add_text(self, text):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("_profiler", "_name", "_start", "_bytes")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._bytes = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler._record(self._name, time.perf_counter() - self._start, self._bytes)
+        return False
+
+    def add(self, nbytes):
+        self._bytes += nbytes
+
+    def add_text(self, text):
+        """Menambah ukuran UTF-8 teks; hanya dihitung saat profiler aktif."""
+        self._bytes += len(text.encode('utf-8', 'surrogatepass'))
+
+class StageProfiler:
+    """Pencatat waktu dan byte per tahap; aman dipakai dari beberapa thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def _record(self, name, seconds, nbytes):
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = self._stats[name] = {"calls": 0, "seconds": 0.0, "bytes": 0}
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            entry["bytes"] += nbytes
+
+    def enable(self, reset=True):
+        if reset:
+            self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Salinan statistik: {tahap: {"calls", "seconds", "bytes"}}."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stats.items()}
+
+    def take(self):
+        """Mengambil statistik sejak pemanggilan terakhir lalu mengosongkannya."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+    def merge(self, stats):
+        """Menggabungkan statistik dari proses lain (misalnya worker layanan)."""
+        with self._lock:
+            for name, other in stats.items():
+                entry = self._stats.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0})
+                for field in ("calls", "seconds", "bytes"):
+                    entry[field] += other[field]
+
+# Profiler milik proses ini; dipakai oleh engine.
+PROFILER = StageProfiler()
+
+def _ordered(stats):
+    known = [name for name in STAGE_ORDER if name in stats]
+    return known + sorted(name for name in stats if name not in STAGE_ORDER)
+
+# --- FORMAT LAPORAN ---
+def format_report(stats, wall_seconds=None):
+    """Tabel rincian tahap untuk ditampilkan di terminal."""
+    total = sum(entry["seconds"] for entry in stats.values())
+    reference = wall_seconds if wall_seconds else total
+    lines = [f"{'tahap':<14}{'panggilan':>10}{'waktu (ms)':>12}{'%':>7}{'byte':>12}{'MB/detik':>10}"]
+    for name in _ordered(stats):
+        entry = stats[name]
+        share = 100 * entry["seconds"] / reference if reference else 0.0
+        rate = f"{entry['bytes'] / entry['seconds'] / 1e6:.1f}" if entry["seconds"] > 0 and entry["bytes"] else "-"
+        lines.append(f"{name:<14}{entry['calls']:>10}{entry['seconds'] * 1e3:>12.3f}{share:>6.1f}%"
+                     f"{entry['bytes']:>12}{rate:>10}")
+    lines.append(f"{'total tahap':<14}{'':>10}{total * 1e3:>12.3f}")
+    if wall_seconds is not None:
+        lines.append(f"{'total waktu':<14}{'':>10}{wall_seconds * 1e3:>12.3f}")
+    return "\n".join(lines)
+
+def to_prometheus(stats, prefix="wayang"):
+    """Statistik tahap dalam format teks eksposisi Prometheus."""
+    metrics = (
+        ("stage_calls_total", "counter", "Jumlah pemanggilan tahap engine.", "calls"),
+        ("stage_seconds_total", "counter", "Total waktu tahap engine dalam detik.", "seconds"),
+        ("stage_bytes_total", "counter", "Total byte yang diproses tahap engine.", "bytes"),
+    )
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name in _ordered(stats):
+            lines.append(f'{prefix}_{metric}{{stage="{name}"}} {stats[name][field]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,263 @@
+# src/core/result_cache.py
+
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from src.core.header import HEADER_VERSION
+
+# --- CACHE HASIL (BERALAMAT ISI) ---
+# Banyak request berulang persis: teks, kunci, tema, dan mode yang sama.
+# Enkripsi/dekripsi Wayang-Cipher deterministik (kecuali mode homofonik), jadi
+# hasilnya bisa disimpan dengan kunci SHA-256 dari semua input tersebut. Tema
+# diwakili sidiknya (Codebook.fingerprint), bukan path-nya: jika file tema
+# berubah, load_codebook memuat ulang tema dengan sidik baru sehingga entri
+# lama tidak pernah cocok lagi, dan watch_theme langsung membuangnya.
+# Dua penyimpanan tersedia dengan antarmuka yang sama:
+#   MemoryStore : OrderedDict di memori proses (LRU)
+#   SqliteStore : file sqlite, bisa dipakai bersama antar-proses dan antar-run
+# Keduanya dibatasi jumlah entri dan total byte hasil; yang paling lama tidak
+# dipakai dibuang lebih dulu. Catatan: hasil dekripsi adalah plaintext, jadi
+# file cache sqlite perlu dilindungi seperti plaintext itu sendiri.
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Versi format keluaran engine yang ikut di-hash ke setiap kunci. Naikkan
+# RESULT_FORMAT_VERSION setiap kali keluaran encrypt/decrypt berubah untuk
+# input yang sama (mis. kodek steganografi baru); versi header biner ikut
+# otomatis. Entri dari versi lama di file sqlite tidak pernah cocok lagi dan
+# terbuang lewat LRU.
+RESULT_FORMAT_VERSION = 1
+ENGINE_FORMAT = f"wayang-result/{RESULT_FORMAT_VERSION}/header-v{HEADER_VERSION}"
+
+_LENGTH = struct.Struct('<Q')
+
+def result_key(direction, mode, fingerprint, key, text):
+    """
+    Kunci cache (32 byte): SHA-256 versi format engine (ENGINE_FORMAT), arah,
+    mode, sidik tema, kunci, dan teks input. Setiap bagian diawali panjangnya, jadi batas antar-bagian tidak
+    bisa digeser (mis. kunci "A\\x00B" + teks "C" vs kunci "A" + teks "B\\x00C").
+    """
+    digest = hashlib.sha256()
+    for part in (ENGINE_FORMAT, direction, mode, fingerprint.hex(), key, text):
+        data = part.encode('utf-8', 'surrogatepass')
+        digest.update(_LENGTH.pack(len(data)))
+        digest.update(data)
+    return digest.digest()
+
+class MemoryStore:
+    """Penyimpanan LRU di memori: kunci -> (sidik tema, hasil, ukuran byte)."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._themes = {}
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, theme, value, size):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[2]
+        self._entries[key] = (theme, value, size)
+        self.nbytes += size
+
+    def evict(self, max_entries, max_bytes):
+        """Membuang entri tertua sampai batas terpenuhi; mengembalikan jumlah yang dibuang."""
+        evicted = 0
+        while self._entries and (len(self._entries) > max_entries or self.nbytes > max_bytes):
+            self.nbytes -= self._entries.popitem(last=False)[1][2]
+            evicted += 1
+        return evicted
+
+    def drop_theme(self, theme):
+        stale = [key for key, entry in self._entries.items() if entry[0] == theme]
+        for key in stale:
+            self.nbytes -= self._entries.pop(key)[2]
+        return len(stale)
+
+    def theme_of(self, path):
+        return self._themes.get(path)
+
+    def set_theme(self, path, theme):
+        self._themes[path] = theme
+
+    def clear(self):
+        self._entries.clear()
+        self._themes.clear()
+        self.nbytes = 0
+
+    def close(self):
+        pass
+
+class SqliteStore:
+    """
+    Penyimpanan LRU di file sqlite (mode WAL). Urutan pemakaian disimpan
+    sebagai nomor urut `used` yang naik setiap kali entri dibaca atau ditulis.
+    Jumlah entri dan total byte dijaga trigger di tabel `meta`, jadi put tidak
+    perlu memindai seluruh tabel (dan tetap benar jika file dipakai bersama).
+    Hasil disimpan sebagai BLOB UTF-8 'surrogatepass': sqlite menolak teks
+    dengan surrogate tunggal, yang bisa muncul di hasil dekripsi.
+    """
+
+    def __init__(self, path):
+        import sqlite3  # hanya dimuat jika cache sqlite dipakai
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Baris yang diganti INSERT OR REPLACE hanya memicu trigger DELETE jika ini aktif.
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, theme TEXT NOT NULL, "
+                           "value BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS themes (path TEXT PRIMARY KEY, theme TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                           "entries INTEGER NOT NULL, bytes INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO meta SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM results")
+        self._conn.execute("CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN "
+                           "UPDATE meta SET entries = entries + 1, bytes = bytes + NEW.size; END")
+        self._conn.execute("CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN "
+                           "UPDATE meta SET entries = entries - 1, bytes = bytes - OLD.size; END")
+        self._conn.execute("CREATE TRIGGER IF NOT EXISTS results_size AFTER UPDATE OF size ON results BEGIN "
+                           "UPDATE meta SET bytes = bytes - OLD.size + NEW.size; END")
+
+    def _next_used(self):
+        return self._conn.execute("SELECT COALESCE(MAX(used), 0) + 1 FROM results").fetchone()[0]
+
+    def _totals(self):
+        return self._conn.execute("SELECT entries, bytes FROM meta").fetchone()
+
+    def __len__(self):
+        return self._totals()[0]
+
+    @property
+    def nbytes(self):
+        return self._totals()[1]
+
+    def get(self, key):
+        row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE results SET used = ? WHERE key = ?", (self._next_used(), key))
+        value = row[0]
+        # File cache lama menyimpan hasil sebagai TEXT.
+        return value.decode('utf-8', 'surrogatepass') if isinstance(value, bytes) else value
+
+    def put(self, key, theme, value, size):
+        self._conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                           (key, theme, value.encode('utf-8', 'surrogatepass'), size, self._next_used()))
+
+    def evict(self, max_entries, max_bytes):
+        count, total = self._totals()
+        if count <= max_entries and total <= max_bytes:
+            return 0
+        # Entri terbaru lebih dulu: simpan selama kedua batas masih terpenuhi.
+        kept = kept_bytes = 0
+        cutoff = None
+        for used, size in self._conn.execute("SELECT used, size FROM results ORDER BY used DESC"):
+            if kept + 1 > max_entries or kept_bytes + size > max_bytes:
+                cutoff = used
+                break
+            kept += 1
+            kept_bytes += size
+        return self._conn.execute("DELETE FROM results WHERE used <= ?", (cutoff,)).rowcount
+
+    def drop_theme(self, theme):
+        return self._conn.execute("DELETE FROM results WHERE theme = ?", (theme,)).rowcount
+
+    def theme_of(self, path):
+        row = self._conn.execute("SELECT theme FROM themes WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def set_theme(self, path, theme):
+        self._conn.execute("INSERT OR REPLACE INTO themes VALUES (?, ?)", (path, theme))
+
+    def clear(self):
+        self._conn.execute("DELETE FROM results")
+        self._conn.execute("DELETE FROM themes")
+
+    def close(self):
+        self._conn.close()
+
+class ResultCache:
+    """
+    Cache hasil enkripsi/dekripsi yang dibatasi jumlah entri dan total byte.
+    path=None memakai MemoryStore; path file memakai SqliteStore. Penghitung
+    hits/misses/evictions/invalidations berlaku untuk objek ini saja.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, path=None):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Batas cache hasil harus positif.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.store = MemoryStore() if path is None else SqliteStore(path)
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def watch_theme(self, theme_path, fingerprint):
+        """Mencatat sidik tema untuk sebuah path; jika sidiknya berubah, entri sidik lama dibuang."""
+        if theme_path is None:
+            return
+        theme = fingerprint.hex()
+        with self._lock:
+            previous = self.store.theme_of(theme_path)
+            if previous == theme:
+                return
+            if previous is not None:
+                self.invalidations += self.store.drop_theme(previous)
+            self.store.set_theme(theme_path, theme)
+
+    def get(self, key):
+        with self._lock:
+            value = self.store.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, fingerprint, value):
+        size = len(value.encode('utf-8', 'surrogatepass'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self.store.put(key, fingerprint.hex(), value, size)
+            self.evictions += self.store.evict(self.max_entries, self.max_bytes)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self.store),
+                "bytes": self.store.nbytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "backend": "memory" if self.path is None else "sqlite",
+            }
+
+    def clear(self):
+        with self._lock:
+            self.store.clear()
+
+    def close(self):
+        with self._lock:
+            self.store.close()
+
+    def __repr__(self):
+        stats = self.stats()
+        return f"ResultCache({stats['backend']}, {stats['entries']} entri, {stats['hits']} hit, {stats['misses']} miss)"
@@ -0,0 +1,257 @@
+# src/core/seek.py
+
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, repeat
+
+from src.core.backends import get_backend
+from src.core.profiling import PROFILER
+from src.core.header import SEEK_INDEX_FIELDS, unpack_header
+from src.core.engine import (
+    BOUNDARY,
+    DEFAULT_CHUNK_SIZE,
+    STEGO_LENGTH_DIGITS,
+    STEGO_MARKER,
+    load_codebook,
+    vigenere_process,
+    _FROM_STEGO_DIGITS,
+    _locate_zero_width_payload,
+    _mode_functions,
+    _parse_header,
+    _rotate_key,
+    _stego_digit_count
+)
+from src.core.lowmem import LOW_MEMORY_BLOCK, _PlaintextWriter
+
+# --- DEKRIPSI SEBAGIAN (INDEKS SEEK) ---
+# Dengan seek_index=True, header menyimpan satu entri setiap SEEK_INDEX_STRIDE
+# baris puisi: offset byte baris itu, offset huruf dan plaintext-nya, serta
+# posisi run non-huruf dan run kapital. decrypt_range mulai dari entri
+# terdekat sebelum `start`, sehingga hanya baris di sekitar rentang yang
+# di-lookup dan didekripsi.
+SEEK_INDEX_STRIDE = 256
+RANGE_MODES = ('standard', 'steganography')
+# Ukuran potongan puisi (byte) pertama yang dibaca decrypt_range.
+RANGE_READ_BYTES = 16 * 1024
+_BOUNDARY_BYTES = BOUNDARY.encode('ascii')
+# Penanda dan semua digit steganografi berukuran 3 byte dalam UTF-8.
+_STEGO_CHAR_BYTES = 3
+
+def _seek_entries(positions, gaps, runs, upper, start=(0, 0, 0, 0, 0)):
+    """
+    Entri indeks seek untuk setiap (offset byte, jumlah huruf) awal baris, dari
+    run header v2. `start` (lihat _seek_resume_point) membatasi perhitungan ke
+    run mulai indeks tertentu; semua posisi harus berada setelah titik itu.
+    """
+    run0, letters0, text0, case0, bound0 = start
+    run_starts = list(accumulate(gaps[run0:], initial=letters0))[1:]
+    text_before = list(accumulate(runs[run0:], initial=text0))
+    case_bounds = list(accumulate(upper[case0:], initial=bound0))[1:]
+    entries = array('Q')
+    for byte_offset, alpha in positions:
+        # Run yang tepat berada sebelum huruf ini sudah termasuk sebelum `plain`.
+        run = bisect_right(run_starts, alpha)
+        gap_left = run_starts[run] - alpha if run < len(run_starts) else 0
+        case = bisect_right(case_bounds, alpha)
+        case_left = case_bounds[case] - alpha if case < len(case_bounds) else 0
+        entries.extend((byte_offset, alpha, alpha + text_before[run], run0 + run, gap_left, case0 + case, case_left))
+    return entries
+
+def _seek_resume_point(header_obj):
+    """
+    (run, huruf, teks, case, batas) untuk _seek_entries: indeks run non-huruf
+    dan run `upper` beserta posisi huruf/teks sebelum keduanya, di atau
+    sebelum run terakhir masing-masing. Append hanya bisa menyambung atau
+    menambah run mulai dari sana, jadi entri indeks sebelum posisi itu tidak
+    berubah. Dihitung dari `tail` dan ekor gaps/runs/upper saja.
+    """
+    gaps, runs, upper = header_obj["gaps"], header_obj["runs"], header_obj["upper"]
+    letters_since_run, lower_since_upper = header_obj["tail"]
+    alpha = header_obj["alpha"]
+    run0 = letters0 = text0 = case0 = bound0 = 0
+    if len(gaps):
+        run0 = len(gaps) - 1
+        letters0 = alpha - letters_since_run - gaps[-1]
+        text0 = len(header_obj["run_text"]) - runs[-1]
+    if len(upper):
+        case0 = len(upper) - 1
+        bound0 = alpha - lower_since_upper - upper[-1]
+    # Kedua titik dimundurkan ke posisi huruf yang sama agar _seek_entries
+    # bisa mulai dari sana untuk run non-huruf maupun run `upper`.
+    resume = min(letters0, bound0)
+    while run0 and letters0 > resume:
+        run0 -= 1
+        letters0 -= gaps[run0]
+        text0 -= runs[run0]
+    while case0 and bound0 > resume:
+        case0 -= 1
+        bound0 -= upper[case0]
+    return run0, letters0, text0, case0, bound0
+
+def _build_seek_index(poetic_lines, chunk_size, gaps, runs, upper, stride=None):
+    stride = stride or SEEK_INDEX_STRIDE
+    positions = []
+    line_bytes = 0
+    for line_no in range(stride, len(poetic_lines), stride):
+        block = "".join(poetic_lines[line_no - stride:line_no])
+        line_bytes += len(block) if block.isascii() else len(block.encode('utf-8'))
+        # Pemisah sebelum baris ke-n: "\n", atau "\n\n" di awal bait.
+        positions.append((line_bytes + line_no + line_no // 4, line_no * chunk_size))
+    return {"stride": stride, "entries": _seek_entries(positions, gaps, runs, upper)}
+
+def _append_seek_index(index, body_bytes, new_lines, first_line, chunk_size, header_obj, start):
+    """
+    Indeks seek setelah append (entri lama diperpanjang di tempat): baris baru
+    (mulai baris ke-`first_line`, di offset byte `body_bytes`) mendapat entri
+    setiap `stride` baris. Dari entri lama, hanya yang berada setelah titik
+    `start` (_seek_resume_point header lama) yang dihitung ulang, karena run
+    terakhir teks lama bisa bersambung dengan teks baru.
+    """
+    stride = index["stride"]
+    fields = len(SEEK_INDEX_FIELDS)
+    entries = index["entries"]
+    last_alpha = entries[1 - fields] if entries else 0
+    resume_alpha = max(start[1], start[4])
+    keep = len(entries)
+    while keep and entries[keep - fields + 1] >= resume_alpha:
+        keep -= fields
+    positions = [(entries[i], entries[i + 1]) for i in range(keep, len(entries), fields)]
+    line_no = first_line
+    offset = body_bytes
+    # Baris baru diawali pemisahnya sendiri; bagian kosong adalah "\n" tambahan antar-bait.
+    for part in new_lines.split('\n'):
+        if part:
+            alpha = line_no * chunk_size
+            if line_no and line_no % stride == 0 and alpha > last_alpha:
+                positions.append((offset, alpha))
+            line_no += 1
+        offset += (len(part) if part.isascii() else len(part.encode('utf-8'))) + 1
+    if not isinstance(entries, array):
+        entries = array('Q', entries)
+    del entries[keep:]
+    entries.extend(_seek_entries(positions, header_obj["gaps"], header_obj["runs"], header_obj["upper"], start))
+    return {"stride": stride, "entries": entries}
+
+class _ListSink:
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+
+def _locate_stego_payload_bytes(data):
+    """Seperti _locate_zero_width_payload untuk buffer bytes/mmap; hanya ekor buffer yang didekode."""
+    end = len(data)
+    while end and data[end - 1] in b" \t\r\n\x0b\x0c":
+        end -= 1
+    length_start = end - _STEGO_CHAR_BYTES * (STEGO_LENGTH_DIGITS + 1)
+    try:
+        if length_start < 0:
+            raise ValueError
+        tail = data[length_start:end].decode('utf-8')
+        if tail[-1] != STEGO_MARKER:
+            return None
+        payload_len = int(tail[:-1].translate(_FROM_STEGO_DIGITS), 8)
+        payload_start = length_start - _STEGO_CHAR_BYTES * _stego_digit_count(payload_len)
+        if payload_start < 0:
+            raise ValueError
+        located = _locate_zero_width_payload(data[payload_start:end].decode('utf-8'))
+        if located is None or located[0] != 0:
+            raise ValueError
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Data steganografi rusak atau terpotong.")
+    return payload_start, located[1]
+
+def _decrypt_range(data, key, codebook, start, end, mode, backend):
+    if mode == 'standard':
+        boundary = data.find(_BOUNDARY_BYTES)
+        try:
+            if boundary == -1:
+                raise ValueError
+            header_obj = _parse_header(data[:boundary].decode('ascii'))
+        except Exception:
+            raise ValueError("Invalid ciphertext format or corrupt header.")
+        body_start, body_end = boundary + len(_BOUNDARY_BYTES), len(data)
+    else:
+        with PROFILER.stage("parse_header") as stage:
+            located = _locate_stego_payload_bytes(data)
+            if located is not None:
+                body_end, payload = located
+                header_obj = unpack_header(payload)[0]
+                stage.add(len(payload))
+        body_start = 0
+    if mode == 'steganography' and located is None or header_obj.get("version", 1) < 2:
+        # Header v1 tidak mendukung indeks: dekripsi penuh lalu potong.
+        decrypt_func = _mode_functions(mode)[1]
+        return decrypt_func(data[:].decode('utf-8'), key, codebook, backend)[start:end]
+    if header_obj.get("chunk_size", DEFAULT_CHUNK_SIZE) != codebook.chunk_size:
+        raise ValueError(f"Ciphertext dibuat dengan chunk_size {header_obj.get('chunk_size', DEFAULT_CHUNK_SIZE)}, "
+                         f"tetapi tema ini memakai chunk_size {codebook.chunk_size}.")
+
+    start, end, _ = slice(start, end).indices(header_obj["length"])
+    if start >= end:
+        return ""
+    output = _ListSink()
+    writer = _PlaintextWriter(output, header_obj)
+    byte_offset = alpha = plain = 0
+    index = header_obj.get("index")
+    if index is not None:
+        fields = len(SEEK_INDEX_FIELDS)
+        entries = index["entries"]
+        # Entri terakhir yang dimulai di atau sebelum `start`; tanpa entri, mulai dari awal puisi.
+        entry = bisect_right(entries[2::fields], start)
+        if entry:
+            byte_offset, alpha, plain, run, gap_left, case, case_left = entries[(entry - 1) * fields:entry * fields]
+            writer.seek(alpha, plain, run, gap_left, case, case_left)
+
+    key_upper = key.upper()
+    inverse_get = codebook.inverse.get
+    remaining = header_obj["alpha"] - alpha
+    pos = body_start + byte_offset
+    needed = end - plain
+    read_bytes = RANGE_READ_BYTES
+    while output.size < needed and remaining > 0 and pos < body_end:
+        stop = min(pos + read_bytes, body_end)
+        # Rentang panjang (atau tanpa indeks) dibaca dengan potongan yang makin besar.
+        read_bytes = min(2 * read_bytes, 4 * LOW_MEMORY_BLOCK)
+        if stop < body_end:
+            # Potong di akhir baris; baris yang lebih panjang dari satu potongan dibaca utuh.
+            cut = data.rfind(b'\n', pos, stop)
+            if cut <= pos:
+                cut = data.find(b'\n', stop, body_end)
+            stop = body_end if cut == -1 else cut
+        with PROFILER.stage("inverse") as stage:
+            lines = [line for line in data[pos:stop].decode('utf-8').split('\n') if line]
+            letters = "".join(map(inverse_get, lines, repeat("")))[:remaining]
+            stage.add(len(letters))
+        pos = stop + 1
+        remaining -= len(letters)
+        writer.write(vigenere_process(letters, _rotate_key(key_upper, alpha), 'decrypt', backend))
+        alpha += len(letters)
+    if output.size < needed:
+        writer.finish()
+    return "".join(output.parts)[start - plain:end - plain]
+
+def decrypt_range(ciphertext, key, theme_path, start, end, mode='standard', backend=None):
+    """
+    Mendekripsi hanya plaintext[start:end] (offset karakter, semantik slice).
+    `ciphertext` adalah path file (dibaca lewat mmap) atau bytes. Tanpa indeks
+    seek di header, puisi tetap dibaca dari awal tetapi berhenti setelah `end`.
+    """
+    if not key:
+        raise ValueError("Kunci tidak boleh kosong.")
+    if mode not in RANGE_MODES:
+        raise ValueError(f"decrypt_range hanya mendukung mode: {', '.join(RANGE_MODES)}")
+    codebook = load_codebook(theme_path)
+    backend = get_backend(backend)
+    if not isinstance(ciphertext, (str, os.PathLike)):
+        return _decrypt_range(ciphertext, key, codebook, start, end, mode, backend)
+    with open(ciphertext, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _decrypt_range(b"", key, codebook, start, end, mode, backend)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _decrypt_range(data, key, codebook, start, end, mode, backend)
@@ -0,0 +1,427 @@
+# src/core/service.py
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.core.detect import DEFAULT_THEME_DIR, list_theme_paths
+from src.core.engine import MODES, _mode_functions, load_codebook
+from src.core.result_cache import result_key
+from src.core.profiling import PROFILER, StageProfiler, to_prometheus
+
+# --- LAYANAN HTTP/JSON (ASYNCIO) ---
+# Protokol: HTTP/1.1 minimal dengan keep-alive dan pipelining, lewat TCP
+# maupun Unix socket.
+#   POST /encrypt, POST /decrypt : {"text", "key", "theme"?, "mode"?} -> {"result"}
+#   GET  /stats                  : statistik layanan (JSON)
+#   GET  /metrics                : statistik layanan + tahap engine (teks Prometheus)
+#   GET  /themes                 : daftar tema yang sudah dimuat
+# Respons untuk satu koneksi selalu dikirim sesuai urutan request-nya.
+# Dengan cache hasil (ResultCache), request yang hasilnya sudah tersimpan
+# dijawab langsung dari proses utama tanpa melewati pool worker.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONCURRENCY = 64
+# Jumlah request per koneksi yang boleh menunggu respons sebelum pembacaan
+# koneksi tersebut dijeda (backpressure ke klien lewat TCP).
+PIPELINE_DEPTH = 32
+MAX_BODY_SIZE = 64 * 1024 * 1024
+# Jumlah sampel latensi terakhir yang dipakai untuk p50/p99 di /stats.
+LATENCY_SAMPLES = 4096
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+            413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+            501: "Not Implemented"}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# Path tema milik proses worker layanan. Initializer pool memanaskan cache
+# codebook; setiap pekerjaan memakai load_codebook, sehingga tema yang diubah
+# di disk (mtime baru) dimuat ulang tanpa menyalakan ulang layanan.
+_service_themes = {}
+
+def _init_service_worker(theme_paths, profile=False):
+    if profile:
+        PROFILER.enable()
+    _service_themes.update(theme_paths)
+    for path in theme_paths.values():
+        load_codebook(path)
+
+def _run_service_job(direction, mode, theme, text, key):
+    """Mengembalikan (hasil, statistik tahap sejak pekerjaan sebelumnya di worker ini)."""
+    func = _mode_functions(mode)[0 if direction == 'encrypt' else 1]
+    result = func(text, key, load_codebook(_service_themes[theme]))
+    return result, (PROFILER.take() if PROFILER.enabled else None)
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+class CipherService:
+    """
+    Server asyncio yang menyimpan semua tema dalam keadaan termuat dan
+    menjalankan pekerjaan CPU di pool worker. `workers=0` menjalankan
+    pekerjaan di satu thread (berguna untuk tes dan mesin satu core).
+    `profile=True` mengaktifkan profiler tahap di worker dan menggabungkan
+    hasilnya ke /metrics. `cache` (ResultCache, opsional) menyimpan hasil
+    request yang berulang.
+    """
+
+    def __init__(self, theme_dir=DEFAULT_THEME_DIR, workers=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 default_theme=None, profile=False, cache=None):
+        self.theme_paths = list_theme_paths(theme_dir)
+        if not self.theme_paths:
+            raise ValueError(f"Tidak ada file tema di '{theme_dir}'.")
+        self.default_theme = default_theme or next(iter(self.theme_paths))
+        if self.default_theme not in self.theme_paths:
+            raise ValueError(f"Tema '{self.default_theme}' tidak ditemukan di '{theme_dir}'.")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_concurrency = max_concurrency
+        self.profile = profile
+        self.cache = cache
+        # Sidik tema terakhir yang dicatat ke cache hasil (lihat _theme_fingerprint).
+        self._fingerprints = {}
+        self.stage_profiler = StageProfiler()
+        self._executor = None
+        # Cache sqlite: satu thread khusus (koneksinya dipakai bersama) agar
+        # baca/tulis file dan WAL tidak menahan event loop.
+        self._cache_executor = None
+        self._semaphore = None
+        self._servers = []
+        # Koneksi yang sedang terbuka: task handler -> writer-nya.
+        self._connections = {}
+        self._started = None
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {"requests": 0, "errors": 0, "connections": 0, "in_flight": 0, "max_in_flight": 0,
+                         "waiting": 0, "bytes_in": 0, "bytes_out": 0}
+        self.by_endpoint = {}
+
+    # --- SIKLUS HIDUP ---
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Memuat tema, menyalakan pool worker, dan mulai mendengarkan. Port 0 memilih port bebas."""
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_service_worker,
+                                                 initargs=(self.theme_paths, self.profile))
+        else:
+            self._executor = ThreadPoolExecutor(1)
+        # Tema juga dimuat di proses ini (untuk mode thread, validasi awal, dan sidik tema cache).
+        _init_service_worker(self.theme_paths, self.profile)
+        if self.cache is not None:
+            for name, path in self.theme_paths.items():
+                self._fingerprints[name] = load_codebook(path).fingerprint
+                self.cache.watch_theme(path, self._fingerprints[name])
+            if self.cache.path is not None:
+                self._cache_executor = ThreadPoolExecutor(1, thread_name_prefix="wayang-cache")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._started = time.monotonic()
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_connection, host, port))
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._servers.append(await asyncio.start_unix_server(self._handle_connection, unix_path))
+        return self
+
+    @property
+    def port(self):
+        for server in self._servers:
+            for sock in server.sockets:
+                address = sock.getsockname()
+                if isinstance(address, tuple):
+                    return address[1]
+        return None
+
+    async def serve_forever(self):
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        # Koneksi keep-alive yang menganggur ditutup dulu agar handler-nya
+        # selesai lewat EOF, bukan dibatalkan saat event loop berhenti.
+        for writer in list(self._connections.values()):
+            writer.close()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.profile:
+            PROFILER.disable()
+        if self.cache is not None:
+            await self._cache_call(self.cache.close)
+        if self._cache_executor is not None:
+            self._cache_executor.shutdown()
+            self._cache_executor = None
+
+    # --- STATISTIK ---
+    def stats(self):
+        uptime = time.monotonic() - self._started if self._started else 0.0
+        latencies = sorted(self._latencies)
+        p50, p99 = _percentile(latencies, 0.50), _percentile(latencies, 0.99)
+        return {
+            **self.counters,
+            "uptime_s": uptime,
+            "requests_per_s": self.counters["requests"] / uptime if uptime > 0 else 0.0,
+            "latency_p50_ms": p50 * 1e3 if p50 is not None else None,
+            "latency_p99_ms": p99 * 1e3 if p99 is not None else None,
+            "by_endpoint": dict(self.by_endpoint),
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "themes": list(self.theme_paths),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    def metrics(self):
+        """Statistik layanan dan tahap engine dalam format teks Prometheus."""
+        stats = self.stats()
+        lines = []
+        for name, kind, help_text, value in (
+            ("requests_total", "counter", "Jumlah request yang diterima.", stats["requests"]),
+            ("errors_total", "counter", "Jumlah request yang gagal.", stats["errors"]),
+            ("connections_total", "counter", "Jumlah koneksi yang diterima.", stats["connections"]),
+            ("bytes_in_total", "counter", "Total byte body request.", stats["bytes_in"]),
+            ("bytes_out_total", "counter", "Total byte respons.", stats["bytes_out"]),
+            ("in_flight", "gauge", "Pekerjaan yang sedang berjalan.", stats["in_flight"]),
+            ("waiting", "gauge", "Pekerjaan yang menunggu slot.", stats["waiting"]),
+            ("uptime_seconds", "gauge", "Lama layanan berjalan.", stats["uptime_s"]),
+            *(() if stats["cache"] is None else (
+                ("cache_hits_total", "counter", "Request yang dijawab dari cache hasil.", stats["cache"]["hits"]),
+                ("cache_misses_total", "counter", "Request yang tidak ada di cache hasil.", stats["cache"]["misses"]),
+                ("cache_evictions_total", "counter", "Entri cache hasil yang dibuang (LRU).", stats["cache"]["evictions"]),
+                ("cache_entries", "gauge", "Jumlah entri cache hasil.", stats["cache"]["entries"]),
+                ("cache_bytes", "gauge", "Total byte hasil di cache.", stats["cache"]["bytes"]),
+            )),
+        ):
+            lines += [f"# HELP wayang_{name} {help_text}", f"# TYPE wayang_{name} {kind}", f"wayang_{name} {value}"]
+        lines += ["# HELP wayang_latency_seconds Latensi request terakhir.", "# TYPE wayang_latency_seconds summary"]
+        for quantile, key in (("0.5", "latency_p50_ms"), ("0.99", "latency_p99_ms")):
+            if stats[key] is not None:
+                lines.append(f'wayang_latency_seconds{{quantile="{quantile}"}} {stats[key] / 1e3}')
+        lines += ["# HELP wayang_endpoint_requests_total Jumlah request per endpoint.",
+                  "# TYPE wayang_endpoint_requests_total counter"]
+        for endpoint, count in sorted(stats["by_endpoint"].items()):
+            lines.append(f'wayang_endpoint_requests_total{{endpoint="{endpoint}"}} {count}')
+        text = "\n".join(lines) + "\n"
+        if self.profile:
+            text += to_prometheus(self.stage_profiler.snapshot())
+        return text
+
+    # --- PROTOKOL HTTP ---
+    async def _handle_connection(self, reader, writer):
+        self.counters["connections"] += 1
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        responses = asyncio.Queue(PIPELINE_DEPTH)
+        sender = asyncio.ensure_future(self._send_responses(responses, writer))
+        try:
+            try:
+                while True:
+                    try:
+                        request = await _read_request(reader)
+                    except HttpError as e:
+                        # Framing request tidak bisa dipercaya: jawab, lalu tutup koneksi.
+                        self.counters["errors"] += 1
+                        await responses.put(_completed(_response(e.status, {"error": str(e)}, close=True)))
+                        break
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    self.counters["bytes_in"] += len(body)
+                    close = headers.get("connection", "").lower() == "close"
+                    # Request berikutnya boleh langsung dibaca (pipelining); put()
+                    # menunggu jika antrean respons koneksi ini penuh.
+                    await responses.put(asyncio.ensure_future(self._dispatch(method, path, body, close)))
+                    if close:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            await responses.put(None)
+            await sender
+        except asyncio.CancelledError:
+            # Dibatalkan dari luar: pengirim ikut dihentikan, bukan ditunggu.
+            sender.cancel()
+            raise
+        finally:
+            del self._connections[task]
+
+    async def _send_responses(self, responses, writer):
+        try:
+            while True:
+                pending = await responses.get()
+                if pending is None:
+                    break
+                data = await pending
+                self.counters["bytes_out"] += len(data)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body, close):
+        started = time.perf_counter()
+        endpoint = path.split('?', 1)[0]
+        self.counters["requests"] += 1
+        self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+        try:
+            if endpoint in ("/encrypt", "/decrypt"):
+                if method != "POST":
+                    raise HttpError(405, "Gunakan POST.")
+                status, payload = 200, {"result": await self._run_job(endpoint[1:], body)}
+            elif endpoint == "/stats":
+                status, payload = 200, self.stats()
+            elif endpoint == "/metrics":
+                status, payload = 200, self.metrics()
+            elif endpoint == "/themes":
+                status, payload = 200, {"themes": list(self.theme_paths), "default": self.default_theme}
+            else:
+                raise HttpError(404, f"Endpoint '{endpoint}' tidak dikenal.")
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        if status != 200:
+            self.counters["errors"] += 1
+        self._latencies.append(time.perf_counter() - started)
+        return _response(status, payload, close)
+
+    async def _run_job(self, direction, body):
+        try:
+            request = json.loads(body)
+            text, key = request["text"], request["key"]
+        except (ValueError, KeyError, TypeError):
+            raise HttpError(400, 'Body harus JSON dengan field "text" dan "key".')
+        if not isinstance(text, str) or not isinstance(key, str) or not key:
+            raise HttpError(400, 'Field "text" dan "key" harus string dan kunci tidak boleh kosong.')
+        theme = request.get("theme") or self.default_theme
+        mode = request.get("mode") or "standard"
+        if theme not in self.theme_paths:
+            raise HttpError(400, f"Tema '{theme}' tidak dikenal.")
+        if mode not in MODES:
+            raise HttpError(400, f"Mode '{mode}' tidak dikenal. Pilihan: {', '.join(MODES)}")
+        if self.cache is not None:
+            fingerprint = await self._theme_fingerprint(theme)
+            cache_key = result_key(direction, mode, fingerprint, key, text)
+            cached = await self._cache_call(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+
+        # Backpressure: paling banyak max_concurrency pekerjaan CPU berjalan;
+        # sisanya menunggu di sini tanpa memenuhi antrean pool.
+        self.counters["waiting"] += 1
+        async with self._semaphore:
+            self.counters["waiting"] -= 1
+            self.counters["in_flight"] += 1
+            self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+            try:
+                loop = asyncio.get_running_loop()
+                result, stage_stats = await loop.run_in_executor(
+                    self._executor, _run_service_job, direction, mode, theme, text, key)
+            finally:
+                self.counters["in_flight"] -= 1
+        if stage_stats:
+            self.stage_profiler.merge(stage_stats)
+        if self.cache is not None:
+            await self._cache_call(self.cache.put, cache_key, fingerprint, result)
+        return result
+
+    async def _theme_fingerprint(self, theme):
+        """Sidik tema saat ini; jika file tema berubah, entri cache sidik lama dibuang."""
+        path = self.theme_paths[theme]
+        fingerprint = load_codebook(path).fingerprint
+        if self._fingerprints.get(theme) != fingerprint:
+            self._fingerprints[theme] = fingerprint
+            await self._cache_call(self.cache.watch_theme, path, fingerprint)
+        return fingerprint
+
+    async def _cache_call(self, func, *args):
+        """Memanggil metode cache: langsung untuk cache memori, lewat thread cache untuk sqlite."""
+        if self._cache_executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._cache_executor, func, *args)
+
+def _completed(value):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
+
+def _response(status, payload, close=False):
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), "application/json"
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+    return head.encode('ascii') + body
+
+async def _read_line(reader, status=400):
+    """Membaca satu baris; baris yang melebihi batas buffer reader menjadi HttpError."""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(status, "Baris request atau header terlalu panjang.")
+
+async def _read_request(reader):
+    """Membaca satu request HTTP; None jika koneksi ditutup sebelum request baru."""
+    request_line = await _read_line(reader)
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, "Baris request HTTP tidak valid.")
+    headers = {}
+    while True:
+        line = await _read_line(reader, 431)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    # Body hanya dibatasi Content-Length; body chunked akan terbaca sebagai request berikutnya.
+    if "transfer-encoding" in headers:
+        raise HttpError(501, "Transfer-Encoding tidak didukung; kirim body dengan Content-Length.")
+    if "content-length" not in headers and method.upper() == "POST":
+        raise HttpError(411, "POST membutuhkan Content-Length.")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Content-Length tidak valid.")
+    if length < 0:
+        raise HttpError(400, "Content-Length tidak valid.")
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, f"Body melebihi {MAX_BODY_SIZE} byte.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+def run_service(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, theme_dir=DEFAULT_THEME_DIR,
+                workers=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, default_theme=None, ready=None, profile=False,
+                cache=None):
+    """Menjalankan layanan sampai dihentikan (Ctrl+C)."""
+    async def main():
+        service = CipherService(theme_dir, workers, max_concurrency, default_theme, profile, cache)
+        await service.start(host, port, unix_path)
+        if ready:
+            ready(service)
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
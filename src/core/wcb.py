@@ -0,0 +1,236 @@
+# src/core/wcb.py
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+
+from src.core.backends import ALPHABET
+
+# --- FORMAT CODEBOOK TERKOMPILASI (.wcb) ---
+# Tata letak (semua bilangan little-endian):
+#   prefix   : struct _PREFIX di bawah
+#   metadata : JSON UTF-8 (metadata tema), lalu padding ke kelipatan 4
+#   offsets  : uint32[jumlah_slot + 1], frasa slot i = blob[offsets[i]:offsets[i+1]]
+#   index    : uint32[jumlah_entri], slot yang diurutkan menurut bytes frasanya
+#              (untuk pencarian biner frasa -> chunk)
+#   varian   : uint32[jumlah_slot - jumlah_id], id chunk setiap slot varian
+#   blob     : semua frasa dalam UTF-8, disambung berurutan menurut slot
+# Slot 0..jumlah_id-1 adalah frasa utama (slot = id chunk); slot sesudahnya
+# adalah frasa varian tema homofonik (lihat src/core/homophonic.py).
+WCB_MAGIC = b'WCB'
+WCB_VERSION = 2
+WCB_SUFFIX = '.wcb'
+
+# magic, versi, chunk_size, jumlah id, jumlah entri indeks, ukuran file sumber,
+# mtime file sumber (ns), panjang metadata, jumlah slot
+_PREFIX = struct.Struct('<3sBHxxIIQqII')
+
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+# Jumlah hasil pencarian frasa -> chunk dan frasa terdekode yang diingat per
+# codebook ter-mmap (LRU), agar baris yang berulang tidak dicari/didekode ulang
+# tanpa menyalin seluruh codebook ke memori.
+MEMO_SIZE = 4096
+
+def compiled_path_for(theme_path):
+    """Path .wcb yang berdampingan dengan file tema JSON."""
+    return os.path.splitext(theme_path)[0] + WCB_SUFFIX
+
+def chunk_to_id(chunk):
+    chunk_id = 0
+    for char in chunk:
+        index = ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"Kunci codebook '{chunk}' bukan huruf A-Z.")
+        chunk_id = chunk_id * 26 + index
+    return chunk_id
+
+def id_to_chunk(chunk_id, chunk_size):
+    chars = []
+    for _ in range(chunk_size):
+        chunk_id, index = divmod(chunk_id, 26)
+        chars.append(ALPHABET[index])
+    return "".join(reversed(chars))
+
+def _le_array(values):
+    values = array(_UINT32, values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def write_compiled(wcb_path, phrases, inverse, metadata, chunk_size, source_size=0, source_mtime_ns=0, variants=()):
+    """
+    Menulis codebook terkompilasi. `phrases` diindeks dengan id chunk,
+    `inverse` adalah peta frasa -> chunk (seperti Codebook.inverse), dan
+    `variants` berisi (chunk, frasa) varian tema homofonik.
+    File ditulis ke berkas sementara lalu diganti secara atomik.
+    """
+    if len(phrases) != 26 ** chunk_size:
+        raise ValueError("Jumlah frasa tidak sesuai dengan chunk_size.")
+    for chunk in inverse.values():
+        if len(chunk) != chunk_size:
+            raise ValueError(f"Kunci codebook '{chunk}' tidak sesuai dengan chunk_size {chunk_size}.")
+    variant_slots = {phrase: len(phrases) + i for i, (_, phrase) in enumerate(variants)}
+    encoded = [phrase.encode('utf-8') for phrase in phrases]
+    encoded += [phrase.encode('utf-8') for _, phrase in variants]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    entries = sorted((phrase.encode('utf-8'), variant_slots.get(phrase) or chunk_to_id(chunk))
+                     for phrase, chunk in inverse.items())
+
+    metadata_bytes = json.dumps(metadata, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    metadata_bytes += b"\0" * (-(_PREFIX.size + len(metadata_bytes)) % 4)
+    prefix = _PREFIX.pack(WCB_MAGIC, WCB_VERSION, chunk_size, len(phrases), len(entries),
+                          source_size, source_mtime_ns, len(metadata_bytes), len(encoded))
+
+    tmp_path = f"{wcb_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix)
+        f.write(metadata_bytes)
+        f.write(_le_array(offsets).tobytes())
+        f.write(_le_array(slot for _, slot in entries).tobytes())
+        f.write(_le_array(chunk_to_id(chunk) for chunk, _ in variants).tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp_path, wcb_path)
+
+class MappedIndex:
+    """
+    Peta frasa -> chunk berbasis pencarian biner di atas indeks terurut.
+    Paling banyak MEMO_SIZE hasil pencarian terakhir diingat (LRU).
+    """
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+        self._lookup = lru_cache(maxsize=MEMO_SIZE)(self._find)
+
+    def __len__(self):
+        return self._compiled.n_index
+
+    def _find(self, phrase):
+        compiled = self._compiled
+        key = phrase.encode('utf-8')
+        index = compiled.index
+        lo, hi = 0, compiled.n_index
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if compiled.phrase_bytes(index[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < compiled.n_index and compiled.phrase_bytes(index[lo]) == key:
+            return id_to_chunk(compiled.slot_chunk(index[lo]), compiled.chunk_size)
+        return None
+
+    def get(self, phrase, default=None):
+        if not isinstance(phrase, str):
+            return default
+        chunk = self._lookup(phrase)
+        return default if chunk is None else chunk
+
+    def __getitem__(self, phrase):
+        chunk = self.get(phrase)
+        if chunk is None:
+            raise KeyError(phrase)
+        return chunk
+
+    def __contains__(self, phrase):
+        return self.get(phrase) is not None
+
+    def __iter__(self):
+        compiled = self._compiled
+        return (compiled.phrase_bytes(slot).decode('utf-8') for slot in compiled.index)
+
+    def items(self):
+        return ((phrase, self[phrase]) for phrase in self)
+
+class MappedPhrases(Sequence):
+    """
+    Tabel frasa (diindeks dengan id chunk) yang dibaca langsung dari mmap;
+    frasa didekode saat diakses, paling banyak MEMO_SIZE diingat (LRU).
+    """
+
+    def __init__(self, compiled):
+        self._compiled = compiled
+        self._len = compiled.n_ids
+        self._decode = lru_cache(maxsize=MEMO_SIZE)(self._decode_slot)
+
+    def _decode_slot(self, chunk_id):
+        return self._compiled.phrase_bytes(chunk_id).decode('utf-8')
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, chunk_id):
+        if isinstance(chunk_id, slice):
+            return [self[i] for i in range(*chunk_id.indices(self._len))]
+        if chunk_id < 0:
+            chunk_id += self._len
+        if not 0 <= chunk_id < self._len:
+            raise IndexError(chunk_id)
+        return self._decode(chunk_id)
+
+    def __iter__(self):
+        return (self._decode_slot(i) for i in range(self._len))
+
+class CompiledCodebook:
+    """File .wcb yang sudah di-mmap."""
+
+    def __init__(self, wcb_path):
+        self.path = wcb_path
+        with open(wcb_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.chunk_size, self.n_ids, self.n_index,
+             self.source_size, self.source_mtime_ns, metadata_len, self.n_slots) = _PREFIX.unpack_from(self._mm, 0)
+        except struct.error:
+            raise ValueError(f"File codebook terkompilasi '{wcb_path}' rusak.")
+        if magic != WCB_MAGIC or version != WCB_VERSION:
+            raise ValueError(f"File '{wcb_path}' bukan codebook terkompilasi versi {WCB_VERSION}.")
+        pos = _PREFIX.size
+        self.metadata = json.loads(self._mm[pos:pos + metadata_len].rstrip(b"\0").decode('utf-8'))
+        pos += metadata_len
+        self.offsets = self._read_array(pos, self.n_slots + 1)
+        pos += 4 * (self.n_slots + 1)
+        self.index = self._read_array(pos, self.n_index)
+        pos += 4 * self.n_index
+        self.variant_chunks = self._read_array(pos, self.n_slots - self.n_ids)
+        self._blob_start = pos + 4 * (self.n_slots - self.n_ids)
+        if self._blob_start + self.offsets[-1] > len(self._mm):
+            raise ValueError(f"File codebook terkompilasi '{wcb_path}' terpotong.")
+
+    def _read_array(self, pos, count):
+        values = array(_UINT32)
+        values.frombytes(self._mm[pos:pos + 4 * count])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def phrase_bytes(self, chunk_id):
+        start = self._blob_start
+        return self._mm[start + self.offsets[chunk_id]:start + self.offsets[chunk_id + 1]]
+
+    def slot_chunk(self, slot):
+        """Id chunk sebuah slot frasa (slot frasa utama sama dengan id chunk-nya)."""
+        return slot if slot < self.n_ids else self.variant_chunks[slot - self.n_ids]
+
+    def phrase_list(self):
+        """Semua frasa sebagai list yang diindeks dengan id chunk (lihat juga MappedPhrases)."""
+        return [self.phrase_bytes(i).decode('utf-8') for i in range(self.n_ids)]
+
+    def variant_list(self):
+        """(id chunk, frasa) setiap slot varian, berurutan menurut slot."""
+        return [(self.variant_chunks[i], self.phrase_bytes(self.n_ids + i).decode('utf-8'))
+                for i in range(self.n_slots - self.n_ids)]
+
+    def matches_source(self, stat_result):
+        return (self.source_size == stat_result.st_size
+                and self.source_mtime_ns == stat_result.st_mtime_ns)
+
+    def close(self):
+        self._mm.close()
@@ -0,0 +1,172 @@
+# tests/test_append.py
+
+import unittest
+import os
+import tempfile
+from unittest import mock
+import src.core.append as append
+import src.core.engine as engine
+import src.core.seek as seek
+from src.core.append import APPEND_MODES, encrypt_append, encrypt_append_file
+from src.core.header import TAIL_MIN_RUNS, pack_header, unpack_header
+from src.core.engine import (
+    core_encrypt,
+    encrypt,
+    decrypt,
+    load_codebook,
+    _header_to_zero_width,
+    _mode_functions
+)
+from tests.test_chunk_size import make_codebook
+
+class TestAppend(unittest.TestCase):
+    """
+    Kelas tes untuk encrypt_append/encrypt_append_file (melanjutkan ciphertext yang sudah ada).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        # Pasangan (teks lama, teks baru): jumlah huruf ganjil (padding), run
+        # kapital dan non-huruf yang tersambung di batas, teks kosong, non-ASCII.
+        self.pairs = [
+            ("Pada suatu hari, Raja", " JAWA membeli 12 ekor ayam!"),
+            ("ABC", "DEF ghi"),
+            ("abc", "de"),
+            ("Awal... ", "!!! lanjut"),
+            ("", "Teks pertama."),
+            ("Sudah ada.", ""),
+            ("!?", "123"),
+            ("Café naïve", " — ÜBER 😎 emoji"),
+        ]
+        self.tail_bytes = append.APPEND_TAIL_BYTES
+
+    def tearDown(self):
+        append.APPEND_TAIL_BYTES = self.tail_bytes
+
+    def test_01_same_as_full_encrypt(self):
+        """Memastikan hasil append sama persis dengan mengenkripsi gabungan teks sekaligus."""
+        for codebook in (self.codebook, make_codebook(3), make_codebook(1)):
+            for mode in APPEND_MODES:
+                encrypt_func = _mode_functions(mode)[0]
+                for old, new in self.pairs:
+                    with self.subTest(chunk_size=codebook.chunk_size, mode=mode, old=old, new=new):
+                        appended = encrypt_append(encrypt_func(old, self.key, codebook), new, self.key, codebook, mode)
+                        self.assertEqual(appended, encrypt_func(old + new, self.key, codebook))
+
+    def test_02_log_lines(self):
+        """Memastikan append berulang baris demi baris tetap bisa didekripsi utuh."""
+        lines = [f"2026-10-18 12:00:{i:02d} INFO Pengguna {i} masuk\n" for i in range(25)]
+        for mode in APPEND_MODES:
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            with self.subTest(mode=mode):
+                ciphertext = encrypt_func(lines[0], self.key, self.codebook)
+                for line in lines[1:]:
+                    ciphertext = encrypt_append(ciphertext, line, self.key, self.codebook, mode)
+                self.assertEqual(decrypt_func(ciphertext, self.key, self.codebook), "".join(lines))
+
+    def test_03_legacy_formats(self):
+        """Memastikan ciphertext header v1 dan steganografi codec v1 tetap bisa ditambahi."""
+        poetic_output, header_obj = core_encrypt("Teks lama, v1", self.key, self.codebook, header_version=1)
+        legacy_stego = poetic_output + _header_to_zero_width(header_obj)
+        appended = encrypt_append(legacy_stego, " dan baru", self.key, self.codebook, 'steganography')
+        self.assertEqual(appended, engine.encrypt_steganography("Teks lama, v1 dan baru", self.key, self.codebook))
+        legacy_standard = engine.BOUNDARY.join((engine._serialize_header(header_obj), poetic_output))
+        appended = encrypt_append(legacy_standard, " dan baru", self.key, self.codebook)
+        self.assertEqual(decrypt(appended, self.key, self.codebook), "Teks lama, v1 dan baru")
+
+    def test_04_append_file(self):
+        """Memastikan append ke file (termasuk ekor file yang harus diperbesar) sama dengan enkripsi penuh."""
+        old = "Baris lama yang cukup panjang, dengan Huruf KAPITAL. " * 50
+        new = "Baris baru!\n"
+        for tail_bytes in (16, 64 * 1024):
+            append.APPEND_TAIL_BYTES = tail_bytes
+            for mode in APPEND_MODES:
+                encrypt_func = _mode_functions(mode)[0]
+                fd, path = tempfile.mkstemp(suffix=".puisi")
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                        f.write(encrypt_func(old, self.key, self.codebook))
+                    encrypt_append_file(path, new, self.key, self.codebook, mode)
+                    with open(path, 'r', encoding='utf-8', newline='') as f:
+                        with self.subTest(tail_bytes=tail_bytes, mode=mode):
+                            self.assertEqual(f.read(), encrypt_func(old + new, self.key, self.codebook))
+                finally:
+                    os.remove(path)
+
+    def test_05_invalid_input(self):
+        """Memastikan mode headerless, kunci kosong, dan tema berbeda ditolak."""
+        ciphertext = encrypt("Halo Dunia", self.key, self.codebook)
+        with self.assertRaises(ValueError):
+            encrypt_append("HALO", "DUNIA", self.key, self.codebook, 'headerless')
+        with self.assertRaises(ValueError):
+            encrypt_append(ciphertext, "lagi", "", self.codebook)
+        with self.assertRaises(ValueError):
+            encrypt_append(ciphertext, "lagi", self.key, make_codebook(3))
+        with self.assertRaises(ValueError):
+            encrypt_append("bukan ciphertext", "lagi", self.key, self.codebook)
+
+    def test_06_seek_index_extended(self):
+        """Memastikan indeks seek ikut diperpanjang saat append, sama dengan enkripsi penuh ber-indeks."""
+        stride = seek.SEEK_INDEX_STRIDE
+        seek.SEEK_INDEX_STRIDE = 4
+        try:
+            for codebook in (self.codebook, make_codebook(3)):
+                for mode in APPEND_MODES:
+                    encrypt_func = _mode_functions(mode)[0]
+                    for old, new in self.pairs + [("Log lama, BARIS " * 30, "KAPITAL lanjut... " * 20)]:
+                        with self.subTest(chunk_size=codebook.chunk_size, mode=mode, old=old[:20], new=new[:20]):
+                            expected = encrypt_func(old + new, self.key, codebook, seek_index=True)
+                            existing = encrypt_func(old, self.key, codebook, seek_index=True)
+                            self.assertEqual(encrypt_append(existing, new, self.key, codebook, mode), expected)
+                    fd, path = tempfile.mkstemp(suffix=".puisi")
+                    try:
+                        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                            f.write(encrypt_func("Baris lama 😎 dengan Huruf KAPITAL. " * 40, self.key, codebook,
+                                                 seek_index=True))
+                        append.APPEND_TAIL_BYTES = 64
+                        encrypt_append_file(path, "Baris BARU!\n" * 10, self.key, codebook, mode)
+                        with open(path, 'r', encoding='utf-8', newline='') as f:
+                            self.assertEqual(f.read(), encrypt_func("Baris lama 😎 dengan Huruf KAPITAL. " * 40
+                                                                    + "Baris BARU!\n" * 10, self.key, codebook,
+                                                                    seek_index=True))
+                    finally:
+                        append.APPEND_TAIL_BYTES = self.tail_bytes
+                        os.remove(path)
+        finally:
+            seek.SEEK_INDEX_STRIDE = stride
+
+    def test_07_cost_scales_with_new_text(self):
+        """Memastikan append tidak menyalin/menjumlah run header lama dan hanya menambah entri indeks untuk baris baru."""
+        old_text = "Baris lama, dengan Huruf KAPITAL. " * 2000
+        _, header_obj = core_encrypt(old_text, self.key, self.codebook)
+        self.assertGreaterEqual(len(header_obj["gaps"]) + len(header_obj["upper"]), TAIL_MIN_RUNS)
+        unpacked = unpack_header(pack_header(header_obj))[0]
+        self.assertEqual(unpacked["tail"], header_obj["tail"])
+        layout = append._layout_from_header(unpacked)
+        self.assertIs(layout.gaps, unpacked["gaps"])
+        self.assertIs(layout.upper, unpacked["upper"])
+        # Header kecil tidak menyimpan `tail`; nilainya dihitung ulang saat dibaca.
+        _, small = core_encrypt("Abc, de", self.key, self.codebook)
+        self.assertEqual(pack_header(small), pack_header(dict(small, tail=(0, 0))))
+        self.assertEqual(unpack_header(pack_header(small))[0]["tail"], small["tail"])
+
+        stride = seek.SEEK_INDEX_STRIDE
+        seek.SEEK_INDEX_STRIDE = 8
+        try:
+            new_text = " Teks BARU, lanjut." * 20
+            existing = encrypt(old_text, self.key, self.codebook, seek_index=True)
+            recomputed = []
+            seek_entries = seek._seek_entries
+            def counting(positions, *args):
+                recomputed.extend(positions)
+                return seek_entries(positions, *args)
+            with mock.patch.object(seek, '_seek_entries', counting):
+                result = encrypt_append(existing, new_text, self.key, self.codebook)
+            self.assertEqual(result, encrypt(old_text + new_text, self.key, self.codebook, seek_index=True))
+            new_lines = len([c for c in new_text if c.isalpha()]) // self.codebook.chunk_size
+            self.assertLessEqual(len(recomputed), new_lines // 8 + 2)
+        finally:
+            seek.SEEK_INDEX_STRIDE = stride
+
+if __name__ == '__main__':
+    unittest.main()
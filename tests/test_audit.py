@@ -0,0 +1,77 @@
+# tests/test_audit.py
+
+import unittest
+from src.core.engine import encrypt, encrypt_headerless, vigenere_process, load_codebook
+from src.core.audit import (
+    np,
+    audit,
+    letter_frequencies,
+    poem_letters,
+    score_keys,
+    _chi_squared,
+    _to_indices
+)
+
+PLAINTEXT = (
+    "Pada suatu hari raja jawa pergi ke pasar untuk membeli ayam dan beras. Di sana ia bertemu dengan seorang "
+    "petani yang sedang menjual sayuran segar dari kebunnya. Mereka berbincang tentang hujan yang belum juga "
+    "turun dan sungai yang mulai kering. Petani itu berkata bahwa anaknya akan pergi ke kota untuk belajar "
+    "menjadi guru. Sang raja tersenyum lalu memberikan sekantong uang perak sebagai bekal perjalanan."
+)
+
+@unittest.skipIf(np is None, "Audit membutuhkan NumPy.")
+class TestAudit(unittest.TestCase):
+    """
+    Kelas tes untuk alat audit (panjang kunci, pemulihan kunci, penilaian kamus).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        letters = "".join(c for c in PLAINTEXT if c.isalpha()).upper()
+        self.letters = letters[:len(letters) - len(letters) % 2]
+        self.ciphertext = encrypt_headerless(self.letters, self.key, self.codebook)
+        self.wordlist = ["kunci", "JAWA", "sandi", "rahasia", "RAHASIA", "parikan", "", "  wayang  "]
+
+    def test_01_recovers_key(self):
+        """Memastikan panjang kunci dan kuncinya dipulihkan dari ciphertext headerless."""
+        report = audit(self.ciphertext, self.codebook, mode='headerless', max_key_length=16)
+        best = report["recovered"][0]
+        self.assertEqual(best["key_length"], 7)
+        self.assertEqual(best["key"], self.key)
+        self.assertTrue(self.letters.startswith(best["preview"]))
+        self.assertGreater(report["ioc"][6], report["ioc"][5])
+
+    def test_02_dictionary_scores_match_decryption(self):
+        """Memastikan skor vektor sama dengan chi-kuadrat hasil dekripsi sebenarnya, dan kunci asli di peringkat pertama."""
+        cipher_letters = poem_letters(self.ciphertext, self.codebook, 'headerless')
+        frequencies = letter_frequencies('id')
+        result = score_keys(cipher_letters, self.wordlist, frequencies, top=10)
+        self.assertEqual(result["attempts"], 6)
+        self.assertEqual(result["candidates"][0][1], self.key)
+        for chi, key in result["candidates"]:
+            decrypted = _to_indices(vigenere_process(cipher_letters, key, 'decrypt'))
+            expected = _chi_squared(np.bincount(decrypted, minlength=26).astype(np.float64), frequencies)
+            self.assertAlmostEqual(chi, float(expected), places=6)
+
+    def test_03_workers_same_result(self):
+        """Memastikan penilaian kamus dengan beberapa proses sama dengan satu proses."""
+        cipher_letters = poem_letters(self.ciphertext, self.codebook, 'headerless')
+        frequencies = letter_frequencies('id')
+        keys = self.wordlist * 50 + [f"KUNCI{i}" for i in range(200)]
+        single = score_keys(cipher_letters, keys, frequencies, workers=1, top=5)
+        parallel = score_keys(cipher_letters, keys, frequencies, workers=2, top=5)
+        self.assertEqual(single["candidates"], parallel["candidates"])
+        self.assertEqual(single["attempts"], parallel["attempts"])
+
+    def test_04_other_modes_and_errors(self):
+        """Memastikan puisi mode standar ikut bisa diaudit, dan bahasa tak dikenal ditolak."""
+        standard = encrypt(PLAINTEXT, self.key, self.codebook)
+        report = audit(standard, self.codebook, mode='standard', keys=["RAHASIA", "JAWA"], top=1)
+        self.assertEqual(report["dictionary"]["candidates"][0]["key"], self.key)
+        with self.assertRaises(ValueError):
+            letter_frequencies('xx')
+        with self.assertRaises(ValueError):
+            audit("bukan puisi", self.codebook, mode='headerless')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_backends.py
+
+import unittest
+import os
+import random
+from src.core.backends import BACKENDS, get_backend
+from src.core.engine import (
+    core_encrypt,
+    core_decrypt,
+    vigenere_process,
+    load_codebook,
+    encrypt,
+    decrypt
+)
+
+class TestBackends(unittest.TestCase):
+    """
+    Kelas tes untuk memastikan semua backend menghasilkan output yang identik
+    dengan backend referensi (Python murni).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook(os.path.join("data", "parikan_jowo_final.json"))
+        rng = random.Random(7)
+        pool = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ  ,.!?0123\n"
+        self.samples = [
+            "Teks standar dengan header, angka 1!",
+            "Ini adalah teks kompleks dengan angka 123 dan simbol 😎!",
+            "Straße Ärger ÉTÉ",
+            "",
+            "".join(rng.choice(pool) for _ in range(2000)),
+        ]
+
+    def test_01_encrypt_identical_to_reference(self):
+        """Memastikan puisi dan header identik untuk setiap backend."""
+        for text in self.samples:
+            expected = core_encrypt(text, self.key, self.codebook, 'python')
+            for name in BACKENDS:
+                with self.subTest(backend=name, text=text[:20]):
+                    self.assertEqual(core_encrypt(text, self.key, self.codebook, name), expected)
+
+    def test_02_decrypt_identical_to_reference(self):
+        """Memastikan dekripsi (kunci benar maupun salah) identik untuk setiap backend."""
+        for text in self.samples:
+            poem, header_obj = core_encrypt(text, self.key, self.codebook, 'python')
+            for key in (self.key, "SALAH"):
+                expected = core_decrypt(poem, key, self.codebook, header_obj, 'python')
+                for name in BACKENDS:
+                    with self.subTest(backend=name, key=key):
+                        self.assertEqual(core_decrypt(poem, key, self.codebook, header_obj, name), expected)
+
+    def test_03_vigenere_identical_to_reference(self):
+        """Memastikan vigenere_process identik, termasuk untuk karakter di luar A-Z."""
+        text = "HALODUNIA" * 50 + "É1"
+        for mode in ('encrypt', 'decrypt'):
+            expected = vigenere_process(text, "KUNCI9", mode, 'python')
+            for name in BACKENDS:
+                self.assertEqual(vigenere_process(text, "KUNCI9", mode, name), expected)
+
+    def test_04_explicit_backend_in_wrapper(self):
+        """Memastikan wrapper menerima pilihan backend secara eksplisit."""
+        original_text = "Pilih backend sendiri."
+        encrypted_output = encrypt(original_text, self.key, self.codebook, backend='translate')
+        self.assertEqual(decrypt(encrypted_output, self.key, self.codebook, backend='python'), original_text)
+
+    def test_05_unknown_backend_fail(self):
+        """Memastikan nama backend yang tidak dikenal menghasilkan ValueError."""
+        with self.assertRaises(ValueError):
+            get_backend('cuda')
+
+if __name__ == '__main__':
+    unittest.main()
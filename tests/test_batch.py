@@ -0,0 +1,47 @@
+# tests/test_batch.py
+
+import unittest
+import os
+from main import batch_output_paths
+from src.core.batch import encrypt_many, decrypt_many
+from src.core.engine import encrypt
+
+class TestBatch(unittest.TestCase):
+    """
+    Kelas tes untuk API batch berbasis process pool.
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.theme_path = os.path.join("data", "parikan_jowo_final.json")
+        self.jobs = [(f"Pesan nomor {i}, dikirim massal!", self.key) for i in range(40)]
+
+    def test_01_results_keep_input_order(self):
+        """Memastikan hasil batch (dengan beberapa worker) sama dan berurutan seperti pemanggilan tunggal."""
+        results = encrypt_many(self.jobs, self.theme_path, workers=2, chunksize=3)
+        self.assertEqual(results, [encrypt(text, key, self.theme_path) for text, key in self.jobs])
+        decrypted = decrypt_many([(c, self.key) for c in results], self.theme_path, workers=2)
+        self.assertEqual(decrypted, [text for text, _ in self.jobs])
+
+    def test_02_errors_can_be_returned(self):
+        """Memastikan satu pesan yang gagal tidak menghentikan seluruh batch."""
+        jobs = [("GENAP", self.key), ("GENAPX", self.key)]
+        results = encrypt_many(jobs, self.theme_path, mode='headerless', workers=1, return_exceptions=True)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertIsInstance(results[1], str)
+        with self.assertRaises(ValueError):
+            encrypt_many(jobs, self.theme_path, mode='headerless', workers=1)
+
+    def test_03_unknown_mode_fail(self):
+        """Memastikan mode yang tidak dikenal menghasilkan ValueError."""
+        with self.assertRaises(ValueError):
+            encrypt_many(self.jobs, self.theme_path, mode='rahasia')
+
+    def test_04_output_paths_do_not_collide(self):
+        """Memastikan file bernama sama dari direktori berbeda mendapat path keluaran berbeda."""
+        inputs = [os.path.join("masuk", "a", "m.txt"), os.path.join("masuk", "b", "m.txt")]
+        outputs = batch_output_paths(inputs, "keluar")
+        self.assertEqual(outputs, [os.path.join("keluar", "a", "m.txt"), os.path.join("keluar", "b", "m.txt")])
+        self.assertEqual(batch_output_paths([os.path.join("masuk", "m.txt")], "keluar"), [os.path.join("keluar", "m.txt")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# tests/test_bench.py
+
+import unittest
+import os
+import copy
+from bench.suite import TARGETS, make_text, run_suite, compare_to_baseline
+
+class TestBenchSuite(unittest.TestCase):
+    """
+    Kelas tes singkat untuk memastikan suite benchmark tetap bisa dijalankan.
+    """
+    def setUp(self):
+        self.theme_path = os.path.join("data", "parikan_jowo_final.json")
+
+    def test_01_suite_covers_every_target(self):
+        """Memastikan setiap target menghasilkan metrik lengkap pada ukuran kecil."""
+        report = run_suite(sizes=[100], themes=[self.theme_path], time_budget=0.0)
+        self.assertEqual(len(report["results"]), len(TARGETS))
+        for name, result in report["results"].items():
+            with self.subTest(name=name):
+                self.assertGreater(result["p50_ms"], 0)
+                self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+                self.assertGreater(result["peak_kb"], 0)
+
+    def test_02_regression_is_detected(self):
+        """Memastikan perlambatan di atas toleransi dilaporkan sebagai regresi."""
+        report = run_suite(sizes=[100], themes=[self.theme_path], targets=['core_encrypt'], time_budget=0.0)
+        self.assertEqual(compare_to_baseline(report, report, tolerance=0.25), [])
+        slower = copy.deepcopy(report)
+        for result in slower["results"].values():
+            result["p50_ms"] *= 2
+        regressions = compare_to_baseline(slower, report, tolerance=0.25)
+        self.assertEqual([metric for _, metric, _, _ in regressions], ["p50_ms"])
+
+    def test_03_text_is_deterministic(self):
+        """Memastikan input benchmark sama persis antar proses."""
+        self.assertEqual(make_text(1000), make_text(1000))
+        self.assertEqual(len(make_text(12345)), 12345)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# tests/test_chunk_size.py
+
+import unittest
+import io
+import json
+import base64
+from src.core.engine import (
+    BOUNDARY,
+    Codebook,
+    core_encrypt,
+    core_decrypt,
+    encrypt,
+    decrypt,
+    encrypt_headerless,
+    decrypt_headerless,
+    encrypt_steganography,
+    decrypt_steganography,
+    encrypt_stream,
+    decrypt_stream,
+    _chunk_keys
+)
+from src.core.header import pack_header, unpack_header
+
+def make_codebook(chunk_size):
+    """Codebook sintetis dengan satu frasa unik per chunk."""
+    dictionary = {key: {"phrase": f"Frasa {key.lower()}"} for key in _chunk_keys(chunk_size)}
+    return Codebook(dictionary, {"name": f"uji-{chunk_size}", "chunk_size": chunk_size})
+
+class TestChunkSize(unittest.TestCase):
+    """
+    Kelas tes untuk codebook dengan chunk 1 sampai 4 huruf per baris.
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Codebook 4 huruf berisi 26^4 frasa; cukup dibuat sekali.
+        cls.codebooks = {n: make_codebook(n) for n in (1, 2, 3, 4)}
+
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang."
+
+    def test_01_round_trip_all_modes(self):
+        """Memastikan mode standar, steganografi, dan headerless bekerja untuk setiap chunk_size."""
+        for n, codebook in self.codebooks.items():
+            with self.subTest(chunk_size=n):
+                for extra in ("", "x", "xy", "xyz"):
+                    text = self.text + extra
+                    self.assertEqual(decrypt(encrypt(text, self.key, codebook), self.key, codebook), text)
+                    stego = encrypt_steganography(text, self.key, codebook)
+                    self.assertEqual(decrypt_steganography(stego, self.key, codebook), text)
+                letters = "ABCDEFGHIJKL"
+                poem = encrypt_headerless(letters, self.key, codebook)
+                self.assertEqual(len(poem.replace("\n\n", "\n").split("\n")), len(letters) // n)
+                self.assertEqual(decrypt_headerless(poem, self.key, codebook), letters)
+
+    def test_02_stream_round_trip(self):
+        """Memastikan API stream membawa sisa huruf antar potongan untuk setiap chunk_size."""
+        text = self.text * 20 + "xy"
+        for n, codebook in self.codebooks.items():
+            for read_size in (5, 64, 10_000):
+                with self.subTest(chunk_size=n, read_size=read_size):
+                    stream_output = "".join(encrypt_stream(io.StringIO(text), self.key, codebook, chunk_size=read_size))
+                    poem_lines = [line for line in stream_output.split("\n") if line and not line.startswith("---POE")]
+                    reference = [line for line in core_encrypt(text, self.key, codebook)[0].split("\n") if line]
+                    self.assertEqual(poem_lines, reference)
+                    self.assertEqual("".join(decrypt_stream(io.StringIO(stream_output), self.key, codebook)), text)
+
+    def test_03_headerless_length_must_match_chunk(self):
+        """Memastikan mode headerless menolak jumlah huruf yang bukan kelipatan chunk_size."""
+        with self.assertRaises(ValueError):
+            encrypt_headerless("ABCD", self.key, self.codebooks[3])
+        with self.assertRaises(ValueError):
+            list(encrypt_stream(io.StringIO("ABCD"), self.key, self.codebooks[3], headerless=True))
+
+    def test_04_header_padding_bits(self):
+        """Memastikan padding lebih dari satu huruf dan chunk_size tersimpan di header v2."""
+        _, header_obj = core_encrypt("abcde", self.key, self.codebooks[4])
+        self.assertEqual(header_obj["padded"], 3)
+        unpacked = unpack_header(pack_header(header_obj))[0]
+        self.assertEqual(unpacked["padded"], 3)
+        self.assertEqual(unpacked["chunk_size"], 4)
+        # Header bigram tetap sama seperti sebelum chunk_size bisa diatur.
+        _, bigram_header = core_encrypt("abc", self.key, self.codebooks[2])
+        self.assertEqual(pack_header(bigram_header)[4], 0x01)
+
+    def test_05_chunk_size_mismatch_fail(self):
+        """Memastikan ciphertext yang dibaca dengan tema chunk_size lain menghasilkan ValueError."""
+        poem, header_obj = core_encrypt(self.text, self.key, self.codebooks[3])
+        with self.assertRaises(ValueError):
+            core_decrypt(poem, self.key, self.codebooks[2], header_obj)
+        stream_output = "".join(encrypt_stream(io.StringIO(self.text), self.key, self.codebooks[3]))
+        with self.assertRaises(ValueError):
+            list(decrypt_stream(io.StringIO(stream_output), self.key, self.codebooks[2]))
+
+    def test_06_legacy_json_header_with_chunk_size(self):
+        """Memastikan header JSON v1 menyimpan chunk_size selain bigram dan tetap bisa didekripsi."""
+        poem, header_obj = core_encrypt(self.text + "x", self.key, self.codebooks[3], header_version=1)
+        self.assertEqual(header_obj["chunk_size"], 3)
+        letter_count = sum(c.isalpha() for c in self.text + "x")
+        self.assertEqual(header_obj["padded"], -letter_count % 3)
+        legacy_header = base64.b64encode(json.dumps(header_obj, sort_keys=True).encode('utf-8')).decode('utf-8')
+        self.assertEqual(decrypt(f"{legacy_header}{BOUNDARY}{poem}", self.key, self.codebooks[3]), self.text + "x")
+        _, bigram_header = core_encrypt(self.text + "x", self.key, self.codebooks[2], header_version=1)
+        self.assertNotIn("chunk_size", bigram_header)
+        self.assertIs(bigram_header["padded"], True)
+
+    def test_07_invalid_chunk_size_fail(self):
+        """Memastikan chunk_size di luar 1-4 ditolak saat tema dimuat."""
+        with self.assertRaises(ValueError):
+            Codebook({}, {"chunk_size": 5})
+
+if __name__ == '__main__':
+    unittest.main()
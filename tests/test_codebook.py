@@ -0,0 +1,72 @@
+# tests/test_codebook.py
+
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from src.core.engine import (
+    Codebook,
+    load_codebook,
+    clear_codebook_cache,
+    encrypt,
+    decrypt
+)
+
+class TestCodebookCache(unittest.TestCase):
+    """
+    Kelas tes untuk cache codebook yang dipakai bersama oleh semua wrapper.
+    """
+    def setUp(self):
+        clear_codebook_cache()
+        self.key = "RAHASIA"
+        self.theme_path = os.path.join("data", "parikan_jowo_final.json")
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        clear_codebook_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_01_cache_returns_same_object(self):
+        """Memastikan tema yang sama hanya di-parse sekali."""
+        first = load_codebook(self.theme_path)
+        second = load_codebook(os.path.abspath(self.theme_path))
+        self.assertIs(first, second)
+        self.assertIsInstance(first, Codebook)
+        self.assertEqual(len(first.dictionary), 676)
+        self.assertEqual(first.metadata.get("chunk_size"), 2)
+        self.assertEqual(first.inverse[first.forward["AB"]], "AB")
+
+    def test_02_hot_reload_on_mtime_change(self):
+        """Memastikan perubahan file tema langsung terbaca tanpa restart."""
+        copy_path = os.path.join(self.tmp_dir, "tema.json")
+        shutil.copy(self.theme_path, copy_path)
+        before = load_codebook(copy_path)
+
+        with open(copy_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["dictionary"]["AA"]["phrase"] = "Frasa pengganti untuk tes"
+        with open(copy_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        stat = os.stat(copy_path)
+        os.utime(copy_path, ns=(stat.st_atime_ns, before.mtime_ns + 1_000_000_000))
+
+        after = load_codebook(copy_path)
+        self.assertIsNot(before, after)
+        self.assertEqual(after.forward["AA"], "Frasa pengganti untuk tes")
+
+    def test_03_wrappers_accept_codebook_object(self):
+        """Memastikan wrapper bisa menerima objek Codebook selain path tema."""
+        codebook = load_codebook(self.theme_path)
+        original_text = "Pesan singkat, dikirim berulang kali."
+        encrypted_output = encrypt(original_text, self.key, codebook)
+        self.assertEqual(encrypted_output, encrypt(original_text, self.key, self.theme_path))
+        self.assertEqual(decrypt(encrypted_output, self.key, codebook), original_text)
+
+    def test_04_missing_theme_fail(self):
+        """Memastikan tema yang tidak ada menghasilkan ValueError."""
+        with self.assertRaises(ValueError):
+            load_codebook(os.path.join(self.tmp_dir, "tidak_ada.json"))
+
+if __name__ == '__main__':
+    unittest.main()
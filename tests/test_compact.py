@@ -0,0 +1,112 @@
+# tests/test_compact.py
+
+import random
+import unittest
+import src.core.backends as backends
+import src.core.compact as compact
+from src.core.engine import MODES, Codebook, load_codebook, encrypt, _mode_functions
+from src.core.seek import decrypt_range
+from src.core.compact import (
+    encrypt_compact, decrypt_compact, to_compact, from_compact, unpack_compact, pack_ids, unpack_ids, id_bits
+)
+from tests.test_chunk_size import make_codebook
+from tests.test_homophonic import make_homophonic_dictionary
+
+class TestCompact(unittest.TestCase):
+    """
+    Kelas tes untuk bentuk ringkas (id chunk terkemas, src/core/compact.py).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.texts = [
+            "",
+            "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!",
+            "  AWALAN spasi\n\nbaris baru\tdan TAB...  ",
+            "Café naïve — ÜBER 😎 emoji",
+            "Jalan-jalan ke KOTA Solo, beli 3 BATIK. " * 40,
+        ]
+
+    def test_01_lossless_round_trip(self):
+        """Memastikan puisi -> bentuk ringkas -> puisi identik dan dekripsi langsung sama untuk semua mode."""
+        for codebook in (self.codebook, make_codebook(1), make_codebook(3)):
+            for mode in MODES:
+                encrypt_func, decrypt_func = _mode_functions(mode)
+                for text in self.texts:
+                    if mode == 'headerless':
+                        text = "".join(c for c in text if c.isalpha())
+                        text = text[:len(text) - len(text) % codebook.chunk_size]
+                    with self.subTest(chunk_size=codebook.chunk_size, mode=mode, text=text[:20]):
+                        ciphertext = encrypt_func(text, self.key, codebook)
+                        data = to_compact(ciphertext, codebook, mode)
+                        self.assertEqual(from_compact(data, codebook, mode), ciphertext)
+                        self.assertEqual(decrypt_compact(data, self.key), decrypt_func(ciphertext, self.key, codebook))
+                        self.assertEqual(encrypt_compact(text, self.key, codebook, headerless=mode == 'headerless'), data)
+
+    def test_02_ten_bit_ids(self):
+        """Memastikan bigram dikemas 10 bit per id dan jalur tanpa NumPy menghasilkan byte yang sama."""
+        self.assertEqual([id_bits(n) for n in (1, 2, 3, 4)], [5, 10, 15, 19])
+        text = "HURUFSAJA" * 100
+        data = encrypt_compact(text, self.key, self.codebook, headerless=True)
+        self.assertEqual(len(unpack_compact(data).ids), len(text) // 2)
+        self.assertEqual(len(data) - compact._PREFIX.size, (len(text) // 2 * 10 + 7) // 8)
+        rng = random.Random(7)
+        original_np = backends.load_numpy()
+        for bits in (5, 10, 15, 19):
+            ids = [rng.randrange(1 << bits) for _ in range(rng.randrange(50, 60))]
+            packed = pack_ids(ids, bits)
+            backends.np = None
+            try:
+                self.assertEqual(pack_ids(ids, bits), packed)
+                self.assertEqual(unpack_ids(packed, len(ids), bits), ids)
+            finally:
+                backends.np = original_np
+            self.assertEqual(unpack_ids(packed, len(ids), bits), ids)
+
+    def test_03_wrong_theme_and_corrupt_data(self):
+        """Memastikan sidik tema yang berbeda dan data rusak/terpotong menjadi ValueError."""
+        data = encrypt_compact(self.texts[1], self.key, self.codebook)
+        with self.assertRaises(ValueError):
+            from_compact(data, "data/parikan_jowo_alus.json")
+        with self.assertRaises(ValueError):
+            from_compact(data, self.codebook, 'headerless_tanpa_nama')
+        with self.assertRaises(ValueError):
+            unpack_compact(data[:-3])
+        with self.assertRaises(ValueError):
+            unpack_compact(b"XYZ" + data[3:])
+        headerless = encrypt_compact("ABCD", self.key, self.codebook, headerless=True)
+        with self.assertRaises(ValueError):
+            from_compact(headerless, self.codebook, 'standard')
+        self.assertEqual(from_compact(headerless, self.codebook), _mode_functions('headerless')[0]("ABCD", self.key, self.codebook))
+
+    def test_04_seek_index_preserved(self):
+        """Memastikan indeks seek tetap berlaku setelah puisi dirender ulang dari bentuk ringkas."""
+        text = self.texts[-1]
+        ciphertext = encrypt(text, self.key, self.codebook, seek_index=True)
+        rendered = from_compact(to_compact(ciphertext, self.codebook), self.codebook)
+        self.assertEqual(rendered, ciphertext)
+        self.assertEqual(decrypt_range(rendered.encode('utf-8'), self.key, self.codebook, 500, 560), text[500:560])
+
+    def test_05_homophonic_poem_lossless(self):
+        """Memastikan puisi homofonik dikonversi dua arah tanpa kehilangan varian, dan dekripsinya tetap tanpa tema."""
+        codebook = Codebook(make_homophonic_dictionary())
+        for mode in MODES:
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            text = self.texts[4]
+            if mode == 'headerless':
+                text = "".join(c for c in text if c.isalpha())
+            for choice in ('weighted', 'rhyme'):
+                with self.subTest(mode=mode, homophonic=choice):
+                    ciphertext = encrypt_func(text, self.key, codebook, homophonic=choice)
+                    data = to_compact(ciphertext, codebook, mode)
+                    self.assertIsNotNone(unpack_compact(data).variants)
+                    self.assertEqual(from_compact(data, codebook, mode), ciphertext)
+                    self.assertEqual(decrypt_compact(data, self.key), decrypt_func(ciphertext, self.key, codebook))
+        # Puisi tanpa varian dari tema homofonik tetap memakai format tanpa nomor varian.
+        plain = encrypt(self.texts[1], self.key, codebook)
+        self.assertEqual(to_compact(plain, codebook), encrypt_compact(self.texts[1], self.key, codebook))
+        with self.assertRaises(ValueError):
+            unpack_compact(to_compact(encrypt(self.texts[1], self.key, codebook, homophonic='weighted'), codebook)[:-4])
+
+if __name__ == '__main__':
+    unittest.main()
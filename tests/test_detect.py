@@ -0,0 +1,79 @@
+# tests/test_detect.py
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.engine import MODES, core_encrypt, load_codebook, encrypt_stream, _header_to_zero_width, _mode_functions
+from src.core.detect import detect, decrypt_auto, sniff_mode, theme_index, list_theme_paths
+
+class TestDetect(unittest.TestCase):
+    """
+    Kelas tes untuk deteksi otomatis mode dan tema (decrypt --auto).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang ke rumah."
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_01_every_theme_and_mode(self):
+        """Memastikan mode dan tema setiap tema di data/ terdeteksi dan hasil dekripsinya benar."""
+        for theme_path in list_theme_paths().values():
+            for mode in MODES:
+                encrypt_func, decrypt_func = _mode_functions(mode)
+                text = "".join(c for c in self.text if c.isalpha())[:40] if mode == 'headerless' else self.text
+                with self.subTest(theme=theme_path, mode=mode):
+                    ciphertext = encrypt_func(text, self.key, theme_path)
+                    detection = detect(ciphertext)
+                    self.assertEqual((detection.mode, detection.theme_path), (mode, theme_path))
+                    self.assertEqual(detection.hits, detection.sampled)
+                    plaintext, _ = decrypt_auto(ciphertext, self.key)
+                    self.assertEqual(plaintext, decrypt_func(ciphertext, self.key, theme_path))
+
+    def test_02_sniff_mode(self):
+        """Memastikan header base64, payload steganografi v1/v2, dan format stream dikenali dari bentuk teks."""
+        theme_path = list_theme_paths()['parikan_jowo_final']
+        poem, header_obj = core_encrypt(self.text, self.key, load_codebook(theme_path), header_version=1)
+        self.assertEqual(sniff_mode(poem), 'headerless')
+        self.assertEqual(sniff_mode(poem + _header_to_zero_width(header_obj) + "\n"), 'steganography')
+        self.assertEqual(sniff_mode(_mode_functions('standard')[0](self.text, self.key, theme_path).replace("\n", "\r\n")), 'standard')
+        stream = "".join(encrypt_stream(io.StringIO(self.text), self.key, theme_path))
+        self.assertEqual(sniff_mode(stream), 'stream')
+        with self.assertRaises(ValueError):
+            detect(stream)
+
+    def test_03_unknown_and_ambiguous_theme(self):
+        """Memastikan puisi dari tema yang tidak ada, atau yang cocok dengan dua tema sama kuat, ditolak."""
+        source = list_theme_paths()['parikan_jowo_final']
+        ciphertext = _mode_functions('headerless')[0]("ABCDEFGHIJ", self.key, source)
+        with self.assertRaises(ValueError):
+            detect("baris biasa\nbukan puisi tema\n")
+        with self.assertRaises(ValueError):
+            detect(ciphertext, self.tmp_dir)
+        shutil.copy(source, os.path.join(self.tmp_dir, "a.json"))
+        shutil.copy(source, os.path.join(self.tmp_dir, "b.json"))
+        with self.assertRaises(ValueError):
+            detect(ciphertext, self.tmp_dir)
+
+    def test_04_index_rebuilt_when_themes_change(self):
+        """Memastikan indeks gabungan disimpan di cache dan dibangun ulang jika isi direktori tema berubah."""
+        paths = list_theme_paths()
+        shutil.copy(paths['parikan_jowo_alus'], os.path.join(self.tmp_dir, "alus.json"))
+        index = theme_index(self.tmp_dir)
+        self.assertIs(theme_index(self.tmp_dir), index)
+        ciphertext = _mode_functions('standard')[0](self.text, self.key, paths['parikan_jowo_final'])
+        with self.assertRaises(ValueError):
+            detect(ciphertext, self.tmp_dir)
+        shutil.copy(paths['parikan_jowo_final'], os.path.join(self.tmp_dir, "final.json"))
+        self.assertIsNot(theme_index(self.tmp_dir), index)
+        self.assertEqual(detect(ciphertext, self.tmp_dir).theme_path, os.path.join(self.tmp_dir, "final.json"))
+        phrase = ciphertext.split("\n")[2]
+        self.assertIn((os.path.join(self.tmp_dir, "final.json"), theme_index(self.tmp_dir).lookup(phrase)[0][1]),
+                      theme_index(self.tmp_dir).lookup(phrase.upper()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_generate_codebook.py
+
+import argparse
+import os
+import tempfile
+import unittest
+from generate_codebook import IndexPermutation, build_space, space_size, decode_phrase, generate_phrases, generate_final_codebook, positive_int
+
+class TestCodebookGenerator(unittest.TestCase):
+    """
+    Kelas tes untuk generator codebook berbasis sampling indeks.
+    """
+    def test_01_same_seed_same_phrases(self):
+        """Memastikan seed yang sama menghasilkan frasa yang sama, berapa pun jumlah worker-nya."""
+        phrases, _ = generate_phrases(676, seed=42)
+        self.assertEqual(len(set(phrases)), 676)
+        self.assertEqual(generate_phrases(676, seed=42, workers=2)[0], phrases)
+        self.assertNotEqual(generate_phrases(676, seed=43)[0], phrases)
+
+    def test_02_decode_covers_space(self):
+        """Memastikan setiap indeks diurai menjadi frasa berbeda dan kata ganda ditolak."""
+        vocabs = {'benda': {'an': ['udan', 'wulan', 'dalan']}}
+        space = build_space(["Golek {benda} tekan {benda}"], vocabs)
+        self.assertEqual(space_size(space), 9)
+        decoded = [decode_phrase(space, i) for i in range(9)]
+        self.assertEqual(decoded.count(None), 3)
+        self.assertIn("Golek udan tekan wulan", decoded)
+        self.assertEqual(len(generate_phrases(100, seed=1, space=space)[0]), 6)
+
+    def test_03_permutation_visits_each_index_once(self):
+        """Memastikan permutasi indeks mencakup seluruh ruang tepat sekali tanpa menyimpannya."""
+        for total in (1, 5, 1000, 4097):
+            permutation = IndexPermutation(total, seed=9)
+            self.assertEqual(sorted(permutation.indices(0, permutation.size)), list(range(total)))
+            split = list(permutation.indices(0, 100)) + list(permutation.indices(100, permutation.size))
+            self.assertEqual(split, list(permutation.indices(0, permutation.size)))
+
+    def test_04_variants_must_be_positive(self):
+        """Memastikan jumlah varian < 1 ditolak, baik oleh fungsi maupun argumen CLI, tanpa menulis file tema."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "kosong.json")
+            for variants in (0, -2):
+                with self.assertRaises(ValueError):
+                    generate_final_codebook(seed=1, chunk_size=1, output_filename=output, variants=variants)
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    positive_int(str(variants))
+            self.assertFalse(os.path.exists(output))
+        self.assertEqual(positive_int("3"), 3)
+        with self.assertRaises(argparse.ArgumentTypeError):
+            positive_int("dua")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_header.py
+
+import unittest
+import os
+import json
+import base64
+from src.core.engine import (
+    BOUNDARY,
+    core_encrypt,
+    encrypt,
+    decrypt,
+    load_codebook
+)
+from src.core.header import pack_header, unpack_header, is_packed_header
+
+class TestBinaryHeader(unittest.TestCase):
+    """
+    Kelas tes untuk header biner v2 dan kompatibilitas dengan header JSON v1.
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook(os.path.join("data", "parikan_jowo_final.json"))
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!  Lalu pulang.\n" * 20
+
+    def test_01_pack_unpack_round_trip(self):
+        """Memastikan header v2 kembali utuh setelah dikemas dan dibaca ulang."""
+        _, header_obj = core_encrypt(self.text + "x", self.key, self.codebook)
+        packed = pack_header(header_obj)
+        self.assertTrue(is_packed_header(packed))
+        unpacked, end = unpack_header(packed)
+        self.assertEqual(end, len(packed))
+        self.assertEqual(unpacked, header_obj)
+        self.assertTrue(unpacked["padded"])
+
+    def test_02_decrypt_reads_legacy_json_header(self):
+        """Memastikan ciphertext lama (header JSON) tetap bisa didekripsi."""
+        poetic_output, header_obj = core_encrypt(self.text, self.key, self.codebook, header_version=1)
+        legacy_header = base64.b64encode(json.dumps(header_obj, sort_keys=True).encode('utf-8')).decode('utf-8')
+        legacy_ciphertext = f"{legacy_header}{BOUNDARY}{poetic_output}"
+        self.assertEqual(decrypt(legacy_ciphertext, self.key, self.codebook), self.text)
+
+    def test_03_binary_header_is_smaller(self):
+        """Memastikan header v2 jauh lebih kecil dari header v1 untuk prosa biasa."""
+        _, legacy_obj = core_encrypt(self.text, self.key, self.codebook, header_version=1)
+        legacy_size = len(base64.b64encode(json.dumps(legacy_obj, sort_keys=True).encode('utf-8')))
+        new_size = len(encrypt(self.text, self.key, self.codebook).split(BOUNDARY, 1)[0])
+        self.assertLess(new_size * 4, legacy_size)
+
+    def test_04_corrupt_binary_header_fail(self):
+        """Memastikan header biner yang terpotong menghasilkan ValueError."""
+        encrypted_output = encrypt(self.text, self.key, self.codebook)
+        encoded_header, poetic_body = encrypted_output.split(BOUNDARY, 1)
+        truncated = base64.b64encode(base64.b64decode(encoded_header)[:-10]).decode('utf-8')
+        with self.assertRaises(ValueError):
+            decrypt(f"{truncated}{BOUNDARY}{poetic_body}", self.key, self.codebook)
+
+    def test_05_lone_surrogates_round_trip(self):
+        """Memastikan teks dengan surrogate tunggal (misalnya dari surrogateescape) tetap bisa dienkripsi."""
+        text = "a\ud800b, byte mentah \udcff!"
+        self.assertEqual(decrypt(encrypt(text, self.key, self.codebook), self.key, self.codebook), text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# tests/test_homophonic.py
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+import src.core.backends as backends
+from src.core.engine import MODES, BOUNDARY, Codebook, MappedCodebook, load_codebook, clear_codebook_cache, compile_theme, _chunk_keys, _mode_functions
+from src.core.homophonic import alias_table
+
+def make_homophonic_dictionary():
+    """Tema bigram sintetis: frasa utama berbobot 3 dan dua varian berbobot 1 dan 2."""
+    return {
+        key: {"phrase": f"Frasa {key.lower()} utama", "rhyme_key": "a", "weight": 3,
+              "variants": [{"phrase": f"Varian {key.lower()} siji", "rhyme_key": "i", "weight": 1},
+                           {"phrase": f"Varian {key.lower()} loro", "rhyme_key": "o", "weight": 2}]}
+        for key in _chunk_keys(2)
+    }
+
+class TestHomophonic(unittest.TestCase):
+    """
+    Kelas tes untuk codebook homofonik dan pemilihan frasa lewat tabel alias.
+    """
+    def setUp(self):
+        clear_codebook_cache()
+        self.key = "RAHASIA"
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang ke rumah. " * 20
+        self.tmp_dir = tempfile.mkdtemp()
+        self.theme_path = os.path.join(self.tmp_dir, "homofon.json")
+        with open(self.theme_path, 'w', encoding='utf-8') as f:
+            json.dump({"metadata": {"name": "uji-homofon"}, "dictionary": make_homophonic_dictionary()}, f)
+
+    def tearDown(self):
+        clear_codebook_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_01_alias_table_matches_weights(self):
+        """Memastikan distribusi yang tersirat dari tabel alias sama persis dengan bobotnya."""
+        for weights in ([1], [3, 1, 2], [5, 5], [1, 0.5, 7, 2, 2.5]):
+            prob, alias = alias_table(weights)
+            implied = [0.0] * len(weights)
+            for i, (p, a) in enumerate(zip(prob, alias)):
+                implied[i] += p / len(weights)
+                implied[a] += (1 - p) / len(weights)
+            for got, weight in zip(implied, weights):
+                self.assertAlmostEqual(got, weight / sum(weights))
+        with self.assertRaises(ValueError):
+            alias_table([])
+
+    def test_02_round_trip_all_modes(self):
+        """Memastikan puisi homofonik memakai varian dan tetap terdekripsi, dari JSON maupun .wcb."""
+        parsed = load_codebook(self.theme_path)
+        compile_theme(self.theme_path)
+        clear_codebook_cache()
+        mapped = load_codebook(self.theme_path)
+        self.assertIsInstance(mapped, MappedCodebook)
+        self.assertEqual(dict(mapped.inverse.items()), parsed.inverse)
+        self.assertEqual(len(parsed.inverse), 3 * 676)
+        for codebook in (parsed, mapped):
+            for mode in MODES:
+                encrypt_func, decrypt_func = _mode_functions(mode)
+                text = "".join(c for c in self.text if c.isalpha()) if mode == 'headerless' else self.text
+                expected = text.upper() if mode == 'headerless' else text
+                for choice in ('weighted', 'rhyme'):
+                    with self.subTest(codebook=type(codebook).__name__, mode=mode, homophonic=choice):
+                        ciphertext = encrypt_func(text, self.key, codebook, homophonic=choice)
+                        self.assertNotEqual(ciphertext, encrypt_func(text, self.key, codebook))
+                        self.assertIn("Varian", ciphertext)
+                        self.assertEqual(decrypt_func(ciphertext, self.key, codebook), expected)
+        with self.assertRaises(ValueError):
+            _mode_functions('standard')[0](self.text, self.key, parsed, homophonic='acak')
+
+    def test_03_weighted_frequencies(self):
+        """Memastikan frekuensi pilihan mengikuti bobot 3:1:2, dengan maupun tanpa NumPy."""
+        table = load_codebook(self.theme_path).homophones
+        ids = [27] * 30000
+        original_np = backends.load_numpy()
+        for np_module in (original_np, None):
+            backends.np = np_module
+            try:
+                counts = Counter(table.pick(ids, random.Random(5)))
+            finally:
+                backends.np = original_np
+            self.assertEqual(len(counts), 3)
+            self.assertAlmostEqual(counts["Frasa bb utama"] / len(ids), 3 / 6, delta=0.02)
+            self.assertAlmostEqual(counts["Varian bb siji"] / len(ids), 1 / 6, delta=0.02)
+            self.assertAlmostEqual(counts["Varian bb loro"] / len(ids), 2 / 6, delta=0.02)
+
+    def test_04_rhyme_preference_and_collisions(self):
+        """Memastikan mode rima membuat baris 3/4 berima dengan baris 1/2, dan varian yang bentrok ditolak."""
+        codebook = load_codebook(self.theme_path)
+        rhyme_of = {phrase: slot_rhyme for phrase, slot_rhyme in zip(codebook.homophones.phrases, codebook.homophones.rhymes)}
+        ciphertext = _mode_functions('standard')[0](self.text, self.key, codebook, homophonic='rhyme')
+        stanzas = [stanza.split("\n") for stanza in ciphertext.split(BOUNDARY)[1].split("\n\n")]
+        for lines in stanzas:
+            for first, second in zip(lines, lines[2:]):
+                self.assertEqual(rhyme_of[first], rhyme_of[second])
+
+        dictionary = make_homophonic_dictionary()
+        dictionary["AB"]["variants"].append({"phrase": dictionary["AC"]["phrase"]})
+        with self.assertRaises(ValueError):
+            Codebook(dictionary)
+
+    def test_05_zero_and_invalid_weights(self):
+        """Memastikan frasa berbobot 0 tidak pernah dipilih, dan bobot yang bukan angka ditolak saat tema dimuat."""
+        for weights in ([0, 1], [1, 0, 0, 2], [0.1, 0, 0.2, 0, 0.7], [3, 0, 0, 0, 0, 0, 0]):
+            prob, alias = alias_table(weights)
+            for i, weight in enumerate(weights):
+                if weight == 0:
+                    self.assertEqual(prob[i], 0.0)
+                    self.assertNotIn(i, alias)
+
+        dictionary = make_homophonic_dictionary()
+        for entry in dictionary.values():
+            entry["variants"][1]["weight"] = 0
+            entry["variants"][0]["rhyme_key"] = "o"
+        with open(self.theme_path, 'w', encoding='utf-8') as f:
+            json.dump({"dictionary": dictionary}, f)
+        codebook = load_codebook(self.theme_path)
+        for choice in ('weighted', 'rhyme'):
+            ciphertext = _mode_functions('standard')[0](self.text * 5, self.key, codebook, homophonic=choice)
+            self.assertIn("siji", ciphertext)
+            self.assertNotIn("loro", ciphertext)
+        self.assertFalse(set(codebook.homophones.pick([27] * 20000, random.Random(1))) & {"Varian bb loro"})
+
+        for weight in ("2", True, None, -1, float("nan")):
+            dictionary = make_homophonic_dictionary()
+            dictionary["AB"]["variants"][0]["weight"] = weight
+            with self.subTest(weight=weight), self.assertRaises(ValueError):
+                Codebook(dictionary)
+        dictionary = make_homophonic_dictionary()
+        dictionary["AB"]["weight"] = 0
+        for variant in dictionary["AB"]["variants"]:
+            variant["weight"] = 0.0
+        with self.assertRaises(ValueError):
+            Codebook(dictionary)
+
+if __name__ == '__main__':
+    unittest.main()
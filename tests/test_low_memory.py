@@ -0,0 +1,119 @@
+# tests/test_low_memory.py
+
+import unittest
+import io
+import tracemalloc
+import src.core.lowmem as lowmem
+from src.core.engine import (
+    MODES,
+    load_codebook,
+    _mode_functions
+)
+from src.core.lowmem import encrypt_into, decrypt_into
+from tests.test_chunk_size import make_codebook
+
+class CountingSink:
+    """Sink yang hanya menghitung karakter, agar tracemalloc mengukur memori kerja engine saja."""
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+
+def peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+class TestLowMemory(unittest.TestCase):
+    """
+    Kelas tes untuk mode hemat memori (encrypt_into/decrypt_into).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.texts = [
+            "",
+            "!?",
+            "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!",
+            "  AWALAN spasi\n\nbaris baru\tdan TAB...  ",
+            "Café naïve — ÜBER 😎 emoji",
+            "HURUFSAJA",
+        ]
+        self.block = lowmem.LOW_MEMORY_BLOCK
+
+    def tearDown(self):
+        lowmem.LOW_MEMORY_BLOCK = self.block
+
+    def assert_same_as_regular(self, codebook):
+        for mode in MODES:
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            for text in self.texts:
+                with self.subTest(mode=mode, text=text, block=lowmem.LOW_MEMORY_BLOCK):
+                    try:
+                        expected = encrypt_func(text, self.key, codebook)
+                    except ValueError:
+                        with self.assertRaises(ValueError):
+                            encrypt_into(text, self.key, codebook, mode=mode)
+                        continue
+                    self.assertEqual(encrypt_into(text, self.key, codebook, mode=mode), expected)
+                    self.assertEqual(decrypt_into(expected, self.key, codebook, mode=mode),
+                                     decrypt_func(expected, self.key, codebook))
+
+    def test_01_identical_output(self):
+        """Memastikan output sama persis dengan fungsi biasa untuk semua mode."""
+        self.assert_same_as_regular(self.codebook)
+
+    def test_02_block_boundaries(self):
+        """Memastikan run huruf kapital dan non-huruf yang terpotong batas blok disambung dengan benar."""
+        for block in (1, 2, 3, 7):
+            lowmem.LOW_MEMORY_BLOCK = block
+            self.assert_same_as_regular(self.codebook)
+            self.assert_same_as_regular(make_codebook(3))
+
+    def test_03_writes_to_sink(self):
+        """Memastikan output ditulis ke sink dan tidak dikembalikan."""
+        sink = io.StringIO()
+        text = "Pesan untuk sink, 123!"
+        self.assertIsNone(encrypt_into(text, self.key, self.codebook, sink, mode='steganography'))
+        plain_sink = io.StringIO()
+        decrypt_into(sink.getvalue(), self.key, self.codebook, plain_sink, mode='steganography')
+        self.assertEqual(plain_sink.getvalue(), text)
+
+    def test_04_peak_memory_bounded(self):
+        """Memastikan puncak memori (tracemalloc) kelipatan kecil dari ukuran input dan jauh di bawah jalur biasa."""
+        text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang. " * 3000
+        # Blok kecil agar memori kerja per blok (konstan) tidak menutupi bagian yang tumbuh bersama input.
+        lowmem.LOW_MEMORY_BLOCK = 4096
+        for mode in MODES:
+            if mode == 'headerless':
+                continue
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            ciphertext = encrypt_func(text, self.key, self.codebook)
+            with self.subTest(mode=mode):
+                low_encrypt = peak_memory(encrypt_into, text, self.key, self.codebook, CountingSink(), mode=mode)
+                low_decrypt = peak_memory(decrypt_into, ciphertext, self.key, self.codebook, CountingSink(), mode=mode)
+                self.assertLess(low_encrypt, 8 * len(text))
+                self.assertLess(low_decrypt, 6 * len(text))
+                self.assertLess(2 * low_encrypt, peak_memory(encrypt_func, text, self.key, self.codebook))
+                self.assertLess(2 * low_decrypt, peak_memory(decrypt_func, ciphertext, self.key, self.codebook))
+
+    def test_05_headerless_memory_constant(self):
+        """Memastikan memori kerja mode headerless tidak tumbuh bersama ukuran input."""
+        small = "HURUFSAJA" * 20000
+        large = small * 4
+        for func, inputs in (
+            (encrypt_into, (small, large)),
+            (decrypt_into, [encrypt_into(text, self.key, self.codebook, mode='headerless') for text in (small, large)]),
+        ):
+            with self.subTest(func=func.__name__):
+                small_peak, large_peak = (
+                    peak_memory(func, text, self.key, self.codebook, CountingSink(), mode='headerless') for text in inputs
+                )
+                self.assertLess(large_peak, 1.5 * small_peak)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# tests/test_matching.py
+
+import unittest
+from unittest import mock
+import src.core.matching as matching
+from src.core.engine import MODES, BOUNDARY, load_codebook, core_encrypt, core_decrypt, _mode_functions
+from src.core.matching import MatchReport, PhraseMatcher, normalize_line, edit_distance
+
+def mangle(poem, line_edits):
+    """Menerapkan fungsi pengubah ke baris-baris puisi tertentu (indeks baris tidak kosong setelah header)."""
+    header, sep, body = poem.rpartition(BOUNDARY)
+    lines = body.split('\n')
+    positions = [i for i, line in enumerate(lines) if line.strip()]
+    for index, edit in line_edits.items():
+        lines[positions[index]] = edit(lines[positions[index]])
+    return header + sep + '\n'.join(lines)
+
+class TestTolerantMatching(unittest.TestCase):
+    """
+    Kelas tes untuk dekripsi toleran (src/core/matching.py).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang."
+        self.edits = {
+            0: str.upper,
+            1: lambda line: "  " + line.replace(" ", "   ") + " \r",
+            2: lambda line: line[:3] + "x" + line[4:],
+            3: lambda line: line[:5] + line[6:],
+        }
+
+    def test_01_mangled_lines_recovered(self):
+        """Memastikan huruf besar/kecil, spasi, CRLF, dan salah ketik kecil diperbaiki di semua mode."""
+        for mode in MODES:
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            text = "".join(c for c in self.text if c.isalpha())[:40] if mode == 'headerless' else self.text
+            with self.subTest(mode=mode):
+                mangled = mangle(encrypt_func(text, self.key, self.codebook), self.edits)
+                report = MatchReport()
+                restored = decrypt_func(mangled, self.key, self.codebook, tolerant=True, report=report)
+                expected = text.upper() if mode == 'headerless' else text
+                self.assertEqual(restored, expected)
+                self.assertEqual(len(report.corrected), 4)
+                self.assertEqual([distance for *_, distance in report.corrected], [0, 0, 1, 1])
+                self.assertEqual(report.unmatched, [])
+
+    def test_02_unmatched_lines_reported(self):
+        """Memastikan baris yang tidak dikenali dilaporkan, atau menjadi ValueError tanpa report."""
+        poem, header_obj = core_encrypt(self.text, self.key, self.codebook)
+        mangled = mangle(poem, {2: lambda line: "baris yang sama sekali lain"})
+        with self.assertRaises(ValueError):
+            core_decrypt(mangled, self.key, self.codebook, header_obj, tolerant=True)
+        report = MatchReport()
+        core_decrypt(mangled, self.key, self.codebook, header_obj, tolerant=True, report=report)
+        self.assertEqual([line for _, line in report.unmatched], ["baris yang sama sekali lain"])
+        self.assertIn("baris yang sama sekali lain", report.summary())
+
+    def test_03_ambiguous_matches_rejected(self):
+        """Memastikan baris yang sama dekat dengan dua frasa, atau frasa yang sama setelah normalisasi, ditolak."""
+        matcher = PhraseMatcher([("Ati sepi", "AB"), ("Ati sepa", "CD"), ("Kudu LUNGA", "EF"), ("kudu  lunga", "GH")])
+        self.assertIsNone(matcher.match("Ati sepo"))
+        self.assertEqual(matcher.match("ati sepi")[:2], ("AB", "Ati sepi"))
+        self.assertIsNone(matcher.match("Kudu lunga"))
+        self.assertIsNone(matcher.match(""))
+        self.assertEqual(normalize_line("  ATI\tsepi \r"), "ati sepi")
+        self.assertEqual(edit_distance("kitten", "sitting", 5), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 2), 3)
+
+    def test_04_candidate_index_is_selective(self):
+        """Memastikan jarak edit hanya dihitung untuk sebagian kecil frasa tema."""
+        matcher = self.codebook.matcher
+        calls = []
+        original = matching.edit_distance
+        def counting(a, b, limit):
+            calls.append(b)
+            return original(a, b, limit)
+        with mock.patch.object(matching, "edit_distance", counting):
+            for phrase in matcher.phrases[:50]:
+                typo = phrase[:4] + "q" + phrase[5:]
+                self.assertEqual(matcher.match(typo)[1], phrase)
+        self.assertLess(len(calls) / 50, len(matcher.phrases) / 20)
+
+    def test_05_candidate_counts_bounded(self):
+        """Memastikan prefix filtering hanya meloloskan sedikit kandidat per baris, tidak pernah lebih dari MAX_CANDIDATES."""
+        matcher = self.codebook.matcher
+        counts = []
+        for phrase in matcher.keys[:100]:
+            typo = phrase[:4] + "q" + phrase[5:]
+            limit = matching.max_distance(typo)
+            candidates = matcher.candidates(typo, limit)
+            self.assertIn(matcher.normalized[phrase], [phrase_id for _, phrase_id in candidates])
+            self.assertTrue(all(abs(len(matcher.keys[i]) - len(typo)) <= limit for _, i in candidates))
+            self.assertEqual([count for count, _ in candidates], sorted((count for count, _ in candidates), reverse=True))
+            counts.append(len(candidates))
+        self.assertLessEqual(max(counts), matching.MAX_CANDIDATES)
+        self.assertLess(sum(counts) / len(counts), len(matcher.phrases) / 25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_parallel.py
+
+import unittest
+import src.core.parallel as parallel
+from src.core.backends import get_backend
+from src.core.engine import MODES, core_encrypt, core_decrypt, load_codebook, _mode_functions
+from src.core.parallel import _parallel_workers
+from src.core.profiling import PROFILER
+from tests.test_chunk_size import make_codebook
+
+class TestParallel(unittest.TestCase):
+    """
+    Kelas tes untuk enkripsi/dekripsi paralel satu pesan (workers > 1).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.texts = [
+            "",
+            "!?",
+            "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!",
+            "  AWALAN spasi\n\nbaris baru\tdan TAB...  ",
+            "Café naïve — ÜBER 😎 emoji",
+            "HURUFSAJA" * 7,
+            "Jalan-jalan ke KOTA Solo, beli 3 BATIK. " * 40,
+        ]
+        self.min_chars = parallel.PARALLEL_MIN_CHARS
+        # Pesan pendek pun dibagi ke pool agar batas potongan dan segmen ikut teruji.
+        parallel.PARALLEL_MIN_CHARS = 0
+
+    def tearDown(self):
+        parallel.PARALLEL_MIN_CHARS = self.min_chars
+        PROFILER.disable()
+        PROFILER.reset()
+
+    def assert_same_as_serial(self, codebook, workers):
+        for mode in MODES:
+            encrypt_func, decrypt_func = _mode_functions(mode)
+            for text in self.texts:
+                with self.subTest(mode=mode, text=text[:30], workers=workers):
+                    try:
+                        expected = encrypt_func(text, self.key, codebook)
+                    except ValueError:
+                        continue
+                    self.assertEqual(encrypt_func(text, self.key, codebook, workers=workers), expected)
+                    self.assertEqual(decrypt_func(expected, self.key, codebook, workers=workers),
+                                     decrypt_func(expected, self.key, codebook))
+
+    def test_01_identical_output(self):
+        """Memastikan output paralel sama persis dengan jalur serial untuk semua mode."""
+        for workers in (2, 3):
+            self.assert_same_as_serial(self.codebook, workers)
+
+    def test_02_other_chunk_sizes(self):
+        """Memastikan segmen tetap berisi bait utuh untuk chunk_size selain bigram."""
+        for chunk_size in (1, 3):
+            self.assert_same_as_serial(make_codebook(chunk_size), 4)
+
+    def test_03_serial_fallback(self):
+        """Memastikan pesan pendek tetap serial dan huruf yang memanjang saat upper() kembali ke jalur serial."""
+        parallel.PARALLEL_MIN_CHARS = 1000
+        self.assertEqual(_parallel_workers(8, 999), 1)
+        self.assertEqual(_parallel_workers(8, 1000), 8)
+        parallel.PARALLEL_MIN_CHARS = 0
+        text = "Straße GROSS straße " * 10
+        self.assertIsNone(parallel._parallel_encrypt(text, self.key, self.codebook, get_backend(), 2))
+        poem, header_obj = core_encrypt(text, self.key, self.codebook, workers=2)
+        self.assertEqual((poem, header_obj), core_encrypt(text, self.key, self.codebook))
+        self.assertEqual(core_decrypt(poem, self.key, self.codebook, header_obj, workers=2),
+                         core_decrypt(poem, self.key, self.codebook, header_obj))
+
+    def test_04_worker_stages_merged(self):
+        """Memastikan statistik tahap dari proses worker digabung ke profiler proses utama."""
+        text = self.texts[-1]
+        PROFILER.enable()
+        poem, header_obj = core_encrypt(text, self.key, self.codebook, workers=2)
+        core_decrypt(poem, self.key, self.codebook, header_obj, workers=2)
+        stats = PROFILER.snapshot()
+        for stage in ("split", "vigenere", "lookup", "assemble", "inverse", "restore"):
+            self.assertIn(stage, stats)
+        self.assertEqual(stats["split"]["bytes"], len(text.encode('utf-8')))
+        self.assertEqual(stats["restore"]["bytes"], len(text.encode('utf-8')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# tests/test_profiling.py
+
+import unittest
+from src.core.engine import encrypt, decrypt, encrypt_steganography, decrypt_steganography, load_codebook
+from src.core.profiling import PROFILER, format_report, to_prometheus
+
+class TestStageProfiler(unittest.TestCase):
+    """
+    Kelas tes untuk instrumentasi tahap engine (waktu dan byte per tahap).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.text = "Pada suatu hari, Raja Jawa membeli 12 ekor ayam! 😎"
+
+    def tearDown(self):
+        PROFILER.disable()
+        PROFILER.reset()
+
+    def test_01_disabled_records_nothing(self):
+        """Memastikan profiler yang mati tidak mencatat apa pun."""
+        PROFILER.reset()
+        decrypt(encrypt(self.text, self.key, self.codebook), self.key, self.codebook)
+        self.assertEqual(PROFILER.snapshot(), {})
+
+    def test_02_stages_recorded(self):
+        """Memastikan setiap tahap enkripsi dan dekripsi tercatat beserta byte-nya."""
+        PROFILER.enable()
+        ciphertext = encrypt(self.text, self.key, "data/parikan_jowo_final.json")
+        self.assertEqual(decrypt(ciphertext, self.key, self.codebook), self.text)
+        stats = PROFILER.snapshot()
+        for stage in ("theme_load", "split", "vigenere", "lookup", "assemble", "header",
+                      "parse_header", "inverse", "restore"):
+            self.assertIn(stage, stats)
+        self.assertEqual(stats["split"]["bytes"], len(self.text.encode('utf-8')))
+        self.assertEqual(stats["restore"]["bytes"], len(self.text.encode('utf-8')))
+        self.assertEqual(stats["vigenere"]["calls"], 2)
+        letters = sum(c.isalpha() for c in self.text)
+        self.assertEqual(stats["vigenere"]["bytes"], 2 * letters)
+
+    def test_03_steganography_header_stage(self):
+        """Memastikan payload steganografi tercatat sebagai tahap header."""
+        PROFILER.enable()
+        ciphertext = encrypt_steganography(self.text, self.key, self.codebook)
+        self.assertEqual(decrypt_steganography(ciphertext, self.key, self.codebook), self.text)
+        stats = PROFILER.take()
+        self.assertEqual(stats["header"]["calls"], 1)
+        self.assertEqual(stats["parse_header"]["calls"], 1)
+        self.assertEqual(PROFILER.snapshot(), {})
+
+    def test_04_report_formats(self):
+        """Memastikan laporan terminal dan teks Prometheus memuat semua tahap."""
+        PROFILER.enable()
+        encrypt(self.text, self.key, self.codebook)
+        stats = PROFILER.snapshot()
+        report = format_report(stats, wall_seconds=1.0)
+        self.assertIn("vigenere", report)
+        self.assertIn("total waktu", report)
+        prometheus = to_prometheus(stats)
+        self.assertIn("# TYPE wayang_stage_seconds_total counter", prometheus)
+        self.assertIn('wayang_stage_calls_total{stage="lookup"} 1', prometheus)
+
+if __name__ == '__main__':
+    unittest.main()
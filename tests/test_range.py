@@ -0,0 +1,94 @@
+# tests/test_range.py
+
+import unittest
+import os
+import tempfile
+import src.core.engine as engine
+import src.core.seek as seek
+from src.core.engine import (
+    core_encrypt,
+    load_codebook,
+    _header_to_zero_width,
+    _mode_functions
+)
+from src.core.header import pack_header, unpack_header
+from src.core.seek import RANGE_MODES, decrypt_range
+from src.core.profiling import PROFILER
+from tests.test_chunk_size import make_codebook
+
+class TestDecryptRange(unittest.TestCase):
+    """
+    Kelas tes untuk indeks seek di header dan decrypt_range (dekripsi sebagian).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook("data/parikan_jowo_final.json")
+        self.text = "".join(f"Rekaman {i}: Raja JAWA membeli {i} ekor ayam!\n" for i in range(200)) + "..."
+        self.stride = seek.SEEK_INDEX_STRIDE
+        self.read_bytes = seek.RANGE_READ_BYTES
+
+    def tearDown(self):
+        seek.SEEK_INDEX_STRIDE = self.stride
+        seek.RANGE_READ_BYTES = self.read_bytes
+        PROFILER.disable()
+        PROFILER.reset()
+
+    def ranges(self, length):
+        return [(0, 10), (5, 6), (length // 2, length // 2 + 77), (length - 5, length + 10),
+                (-20, None), (None, 3), (100, 50), (0, length)]
+
+    def test_01_matches_full_decrypt(self):
+        """Memastikan setiap rentang sama dengan potongan hasil dekripsi penuh, dengan dan tanpa indeks."""
+        for codebook in (self.codebook, make_codebook(3), make_codebook(1)):
+            for mode in RANGE_MODES:
+                encrypt_func = _mode_functions(mode)[0]
+                for stride, seek_index in ((256, False), (1, True), (3, True), (17, True)):
+                    seek.SEEK_INDEX_STRIDE = stride
+                    seek.RANGE_READ_BYTES = 64
+                    data = encrypt_func(self.text, self.key, codebook, seek_index=seek_index).encode('utf-8')
+                    for start, end in self.ranges(len(self.text)):
+                        with self.subTest(chunk_size=codebook.chunk_size, mode=mode, stride=stride,
+                                          seek_index=seek_index, start=start, end=end):
+                            self.assertEqual(decrypt_range(data, self.key, codebook, start, end, mode),
+                                             self.text[start:end])
+
+    def test_02_index_round_trip(self):
+        """Memastikan indeks seek ikut dikemas dan dibaca ulang dari header biner."""
+        seek.SEEK_INDEX_STRIDE = 8
+        _, header_obj = core_encrypt(self.text, self.key, self.codebook, seek_index=True)
+        self.assertEqual(header_obj["index"]["stride"], 8)
+        self.assertEqual(unpack_header(pack_header(header_obj))[0], header_obj)
+        _, plain_header = core_encrypt(self.text, self.key, self.codebook)
+        self.assertNotIn("index", unpack_header(pack_header(plain_header))[0])
+
+    def test_03_reads_only_needed_stanzas(self):
+        """Memastikan rentang kecil dengan indeks hanya me-lookup sebagian kecil baris puisi (dibaca lewat mmap)."""
+        seek.SEEK_INDEX_STRIDE = 16
+        seek.RANGE_READ_BYTES = 256
+        text = self.text * 20
+        fd, path = tempfile.mkstemp(suffix=".puisi")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(engine.encrypt(text, self.key, self.codebook, seek_index=True))
+            PROFILER.enable()
+            start = len(text) // 2
+            self.assertEqual(decrypt_range(path, self.key, self.codebook, start, start + 40), text[start:start + 40])
+            letters = sum(c.isalpha() for c in text)
+            self.assertLess(PROFILER.snapshot()["inverse"]["bytes"], letters // 50)
+        finally:
+            os.remove(path)
+
+    def test_04_legacy_and_invalid(self):
+        """Memastikan ciphertext codec v1 tetap bisa dipotong, sedangkan mode headerless dan kunci kosong ditolak."""
+        poetic_output, header_obj = core_encrypt(self.text, self.key, self.codebook, header_version=1)
+        legacy = (poetic_output + _header_to_zero_width(header_obj)).encode('utf-8')
+        self.assertEqual(decrypt_range(legacy, self.key, self.codebook, 10, 30, 'steganography'), self.text[10:30])
+        with self.assertRaises(ValueError):
+            decrypt_range(b"HALO", self.key, self.codebook, 0, 2, 'headerless')
+        with self.assertRaises(ValueError):
+            decrypt_range(b"bukan ciphertext", self.key, self.codebook, 0, 2)
+        with self.assertRaises(ValueError):
+            decrypt_range(engine.encrypt("Halo", self.key, self.codebook).encode('utf-8'), "", self.codebook, 0, 2)
+
+if __name__ == '__main__':
+    unittest.main()
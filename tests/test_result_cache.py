@@ -0,0 +1,202 @@
+# tests/test_result_cache.py
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import src.core.batch as batch
+import src.core.engine as engine
+import src.core.result_cache as result_cache
+from src.core.batch import encrypt_many
+from src.core.engine import MODES, clear_codebook_cache, run_cached, _mode_functions
+from src.core.result_cache import ResultCache, result_key
+from src.core.service import CipherService
+from tests.test_service import _request, _read_response
+
+class TestResultCache(unittest.TestCase):
+    """
+    Kelas tes untuk cache hasil beralamat isi (src/core/result_cache.py).
+    """
+    def setUp(self):
+        clear_codebook_cache()
+        self.key = "RAHASIA"
+        self.text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam! Lalu pulang ke rumahnya."
+        self.theme_path = "data/parikan_jowo_final.json"
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        clear_codebook_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def _caches(self):
+        return (ResultCache(), ResultCache(path=os.path.join(self.tmp_dir, "hasil.sqlite")))
+
+    def test_01_hits_return_same_result(self):
+        """Memastikan hit cache mengembalikan hasil yang sama tanpa menjalankan engine lagi, di memori maupun sqlite."""
+        for cache in self._caches():
+            for mode in MODES:
+                encrypt_func, decrypt_func = _mode_functions(mode)
+                text = "".join(c for c in self.text if c.isalpha()) if mode == 'headerless' else self.text
+                with self.subTest(backend=cache.stats()["backend"], mode=mode):
+                    ciphertext = run_cached(cache, 'encrypt', mode, text, self.key, self.theme_path)
+                    self.assertEqual(ciphertext, encrypt_func(text, self.key, self.theme_path))
+                    with mock.patch.object(engine, 'encrypt', side_effect=AssertionError("engine dipanggil")), \
+                         mock.patch.object(engine, 'encrypt_headerless', side_effect=AssertionError("engine dipanggil")), \
+                         mock.patch.object(engine, 'encrypt_steganography', side_effect=AssertionError("engine dipanggil")):
+                        self.assertEqual(run_cached(cache, 'encrypt', mode, text, self.key, self.theme_path), ciphertext)
+                    plaintext = run_cached(cache, 'decrypt', mode, ciphertext, self.key, self.theme_path)
+                    self.assertEqual(plaintext, decrypt_func(ciphertext, self.key, self.theme_path))
+                    # Kunci lain adalah entri lain.
+                    self.assertNotEqual(run_cached(cache, 'encrypt', mode, text, "KUNCILAIN", self.theme_path), ciphertext)
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (3, 9, 9))
+            cache.close()
+
+    def test_02_lru_bounds(self):
+        """Memastikan batas jumlah entri dan total byte ditegakkan dengan membuang entri yang paling lama tidak dipakai."""
+        fingerprint = bytes(8)
+        for path in (None, os.path.join(self.tmp_dir, "lru.sqlite")):
+            with self.subTest(path=path):
+                cache = ResultCache(max_entries=3, max_bytes=100, path=path)
+                keys = [result_key('encrypt', 'standard', fingerprint, "K", str(i)) for i in range(5)]
+                for key in keys[:3]:
+                    cache.put(key, fingerprint, "x" * 10)
+                self.assertEqual(cache.get(keys[0]), "x" * 10)
+                cache.put(keys[3], fingerprint, "x" * 10)
+                self.assertIsNone(cache.get(keys[1]))
+                self.assertEqual(cache.get(keys[0]), "x" * 10)
+                # 10 + 10 + 10 + 60 melewati 75 byte: entri 2 dan 3 keluar, entri 0 baru saja dibaca.
+                cache.max_bytes = 75
+                cache.put(keys[4], fingerprint, "é" * 30)
+                self.assertEqual(cache.stats()["bytes"], 70)
+                self.assertEqual([cache.get(key) is not None for key in keys], [True, False, False, False, True])
+                self.assertEqual(cache.stats()["evictions"], 3)
+                cache.put(keys[1], fingerprint, "y" * 1000)
+                self.assertIsNone(cache.get(keys[1]))
+                cache.close()
+        with self.assertRaises(ValueError):
+            ResultCache(max_entries=0)
+
+        # Batas antar-bagian kunci tidak bisa digeser; kunci dengan surrogate tunggal tetap bisa di-hash.
+        self.assertNotEqual(result_key('encrypt', 'standard', fingerprint, "A\x00B", "C"),
+                            result_key('encrypt', 'standard', fingerprint, "A", "B\x00C"))
+        self.assertEqual(len(result_key('encrypt', 'standard', fingerprint, "K\udc80", "teks")), 32)
+
+        # sqlite: total entri/byte dijaga trigger, put tidak memindai seluruh tabel.
+        path = os.path.join(self.tmp_dir, "meta.sqlite")
+        cache = ResultCache(max_entries=50, path=path)
+        statements = []
+        cache.store._conn.set_trace_callback(statements.append)
+        for i in range(40):
+            cache.put(result_key('encrypt', 'standard', fingerprint, "K", str(i % 30)), fingerprint, "x" * (i + 1))
+        self.assertFalse([sql for sql in statements if "COUNT(" in sql or "SUM(" in sql])
+        cache.store._conn.set_trace_callback(None)
+        expected = cache.store._conn.execute("SELECT COUNT(*), SUM(size) FROM results").fetchone()
+        self.assertEqual((len(cache.store), cache.store.nbytes), expected)
+        self.assertEqual(expected[0], 30)
+        cache.watch_theme("tema.json", fingerprint)
+        cache.watch_theme("tema.json", bytes([1]) * 8)
+        self.assertEqual((len(cache.store), cache.store.nbytes), (0, 0))
+        cache.close()
+
+    def test_03_theme_change_invalidates(self):
+        """Memastikan entri lama dibuang dan hasil baru dipakai setelah file tema berubah, juga lewat file sqlite."""
+        theme_path = os.path.join(self.tmp_dir, "tema.json")
+        shutil.copy(self.theme_path, theme_path)
+        cache_path = os.path.join(self.tmp_dir, "tema.sqlite")
+        cache = ResultCache(path=cache_path)
+        before = run_cached(cache, 'encrypt', 'headerless', "ABCD", self.key, theme_path)
+        self.assertEqual(run_cached(cache, 'encrypt', 'headerless', "ABCD", self.key, theme_path), before)
+        cache.close()
+
+        with open(theme_path, encoding='utf-8') as f:
+            data = json.load(f)
+        chunk = run_cached(None, 'decrypt', 'headerless', before, "A", theme_path)[:2]
+        data["dictionary"][chunk]["phrase"] = "Frasa anyar kanggo tes cache"
+        with open(theme_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        stat_result = os.stat(theme_path)
+        os.utime(theme_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+
+        cache = ResultCache(path=cache_path)
+        after = run_cached(cache, 'encrypt', 'headerless', "ABCD", self.key, theme_path)
+        self.assertIn("Frasa anyar kanggo tes cache", after)
+        self.assertEqual(after, _mode_functions('headerless')[0]("ABCD", self.key, theme_path))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"], stats["entries"]), (0, 1, 1, 1))
+        cache.close()
+
+    def test_04_batch_and_service(self):
+        """Memastikan batch hanya mengerjakan pesan yang belum ada di cache dan layanan menjawab ulangan dari cache."""
+        cache = ResultCache()
+        jobs = [(self.text, self.key), ("Pesan lain", self.key), (self.text, self.key)]
+        expected = [_mode_functions('standard')[0](text, key, self.theme_path) for text, key in jobs]
+        self.assertEqual(encrypt_many(jobs, self.theme_path, workers=1, cache=cache), expected)
+        self.assertEqual(len(cache.store), 2)
+        with mock.patch.object(batch, '_run_batch_job', side_effect=AssertionError("engine dipanggil")):
+            self.assertEqual(encrypt_many(jobs, self.theme_path, workers=1, cache=cache), expected)
+
+        payload = {"text": self.text, "key": self.key, "theme": "parikan_jowo_final"}
+        async def scenario(cache):
+            service = CipherService(theme_dir="data", workers=0, cache=cache)
+            await service.start(port=0)
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+                responses = []
+                for raw in [_request("POST", "/encrypt", payload)] * 3 + [_request("GET", "/metrics")]:
+                    writer.write(raw)
+                    await writer.drain()
+                    responses.append(await _read_response(reader))
+                writer.close()
+                return responses, service.stats()
+            finally:
+                await service.close()
+        for cache in self._caches():
+            with self.subTest(backend=cache.stats()["backend"]):
+                # Cache sqlite tidak boleh dibaca/ditulis dari thread event loop.
+                threads = []
+                store_get = cache.store.get
+                def recording_get(key):
+                    threads.append(threading.current_thread())
+                    return store_get(key)
+                with mock.patch.object(cache.store, 'get', recording_get):
+                    responses, stats = asyncio.run(scenario(cache))
+                self.assertEqual([body["result"] for _, body in responses[:3]], [expected[0]] * 3)
+                self.assertEqual((stats["cache"]["hits"], stats["cache"]["misses"]), (2, 1))
+                self.assertIn("wayang_cache_hits_total", responses[3][1])
+                on_loop = [thread is threading.main_thread() for thread in threads]
+                self.assertEqual(on_loop, [cache.path is None] * 3)
+
+    def test_05_format_version_in_key(self):
+        """Memastikan entri sqlite dari versi format engine lain tidak dipakai setelah upgrade."""
+        cache_path = os.path.join(self.tmp_dir, "versi.sqlite")
+        cache = ResultCache(path=cache_path)
+        with mock.patch.object(result_cache, 'ENGINE_FORMAT', "wayang-result/0/header-v1"):
+            run_cached(cache, 'encrypt', 'standard', self.text, self.key, self.theme_path)
+            old_key = result_key('encrypt', 'standard', b"\x00" * 32, self.key, self.text)
+        cache.close()
+        self.assertNotEqual(old_key, result_key('encrypt', 'standard', b"\x00" * 32, self.key, self.text))
+
+        cache = ResultCache(path=cache_path)
+        result = run_cached(cache, 'encrypt', 'standard', self.text, self.key, self.theme_path)
+        self.assertEqual(result, _mode_functions('standard')[0](self.text, self.key, self.theme_path))
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (0, 1))
+        cache.close()
+
+    def test_06_lone_surrogate_results(self):
+        """Memastikan hasil yang berisi surrogate tunggal bisa disimpan dan dibaca, di memori maupun sqlite."""
+        for cache in self._caches():
+            with self.subTest(backend=cache.stats()["backend"]):
+                text = "Halo \ud800 dunia"
+                ciphertext = run_cached(cache, 'encrypt', 'standard', text, self.key, self.theme_path)
+                self.assertEqual(run_cached(cache, 'decrypt', 'standard', ciphertext, self.key, self.theme_path), text)
+                self.assertEqual(run_cached(cache, 'decrypt', 'standard', ciphertext, self.key, self.theme_path), text)
+                self.assertEqual(cache.stats()["hits"], 1)
+                cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# tests/test_service.py
+
+import unittest
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from src.core.engine import encrypt, load_codebook, _mode_functions
+from src.core.result_cache import ResultCache
+from src.core.service import CipherService
+
+def _request(method, path, payload=None, close=False):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: tes\r\nContent-Length: {len(body)}\r\n"
+    if close:
+        head += "Connection: close\r\n"
+    return (head + "\r\n").encode('ascii') + body
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.lower()] = value.strip()
+    body = (await reader.readexactly(int(headers["content-length"]))).decode('utf-8')
+    return status, (json.loads(body) if headers["content-type"].startswith("application/json") else body)
+
+class TestCipherService(unittest.TestCase):
+    """
+    Kelas tes untuk layanan HTTP/JSON asyncio (`main.py serve`).
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.theme = "parikan_jowo_final"
+
+    def _exchange(self, raw_requests, count, profile=False, pipelined=True):
+        async def scenario():
+            service = CipherService(theme_dir="data", workers=0, default_theme=self.theme, profile=profile)
+            await service.start(port=0)
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+                if pipelined:
+                    # Semua request dikirim sekaligus sebelum membaca respons.
+                    writer.write(b"".join(raw_requests))
+                    await writer.drain()
+                    responses = [await _read_response(reader) for _ in range(count)]
+                else:
+                    responses = []
+                    for raw in raw_requests:
+                        writer.write(raw)
+                        await writer.drain()
+                        responses.append(await _read_response(reader))
+                writer.close()
+                return responses, service.stats()
+            finally:
+                await service.close()
+        return asyncio.run(scenario())
+
+    def test_01_pipelined_requests_keep_order(self):
+        """Memastikan request yang dipipeline dijawab sesuai urutan dan cocok dengan engine."""
+        texts = [f"Pesan nomor {i}, dikirim bersamaan!" for i in range(5)]
+        raw = [_request("POST", "/encrypt", {"text": t, "key": self.key}) for t in texts]
+        responses, _ = self._exchange(raw, len(raw))
+        codebook = load_codebook(f"data/{self.theme}.json")
+        for text, (status, payload) in zip(texts, responses):
+            self.assertEqual(status, 200)
+            self.assertEqual(payload["result"], encrypt(text, self.key, codebook))
+
+    def test_02_decrypt_round_trip_all_modes(self):
+        """Memastikan /decrypt membalik hasil /encrypt untuk setiap mode."""
+        codebook = load_codebook(f"data/{self.theme}.json")
+        cases = {"standard": "Halo Dunia 123!", "headerless": "HALODUNIAX", "steganography": "Rahasia, ya?"}
+        raw = [
+            _request("POST", "/decrypt", {"text": _mode_functions(mode)[0](text, self.key, codebook),
+                                          "key": self.key, "mode": mode})
+            for mode, text in cases.items()
+        ]
+        responses, _ = self._exchange(raw, len(raw))
+        for (mode, text), (status, payload) in zip(cases.items(), responses):
+            self.assertEqual(status, 200, payload)
+            expected = text.upper() if mode == "headerless" else text
+            self.assertEqual(payload["result"], expected)
+
+    def test_03_errors_and_stats(self):
+        """Memastikan request yang salah mendapat status 4xx dan tercatat di /stats."""
+        raw = [
+            _request("POST", "/encrypt", {"text": "abc"}),
+            _request("POST", "/encrypt", {"text": "abc", "key": self.key, "theme": "tidak_ada"}),
+            _request("GET", "/tidak-ada"),
+            _request("GET", "/encrypt"),
+            _request("GET", "/stats", close=True),
+        ]
+        responses, stats = self._exchange(raw, len(raw))
+        self.assertEqual([status for status, _ in responses], [400, 400, 404, 405, 200])
+        self.assertEqual(responses[-1][1]["errors"], 4)
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["by_endpoint"]["/encrypt"], 3)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_04_metrics_include_stages(self):
+        """Memastikan /metrics berformat Prometheus dan memuat statistik tahap saat profil aktif."""
+        raw = [
+            _request("POST", "/encrypt", {"text": "Halo Dunia!", "key": self.key}),
+            _request("GET", "/metrics", close=True),
+        ]
+        responses, _ = self._exchange(raw, len(raw), profile=True, pipelined=False)
+        status, text = responses[1]
+        self.assertEqual(status, 200)
+        self.assertIn("wayang_requests_total 2", text)
+        self.assertIn('wayang_endpoint_requests_total{endpoint="/encrypt"} 1', text)
+        self.assertIn('wayang_stage_calls_total{stage="vigenere"} 1', text)
+
+    def test_05_invalid_content_length_and_long_lines(self):
+        """Memastikan Content-Length negatif dan header yang terlalu panjang dijawab 4xx, bukan diputus."""
+        negative = b"POST /encrypt HTTP/1.1\r\nHost: tes\r\nContent-Length: -5\r\n\r\n"
+        responses, stats = self._exchange([negative], 1)
+        self.assertEqual(responses[0][0], 400)
+        self.assertEqual(stats["connections"], 1)
+        long_header = b"GET /stats HTTP/1.1\r\nX-Panjang: " + b"a" * (128 * 1024) + b"\r\n\r\n"
+        responses, _ = self._exchange([long_header], 1)
+        self.assertEqual(responses[0][0], 431)
+
+    def test_07_chunked_and_missing_length_close_connection(self):
+        """Memastikan body chunked dan POST tanpa Content-Length ditolak, koneksi ditutup, dan tercatat sebagai error."""
+        chunked = (b"POST /encrypt HTTP/1.1\r\nHost: tes\r\nTransfer-Encoding: chunked\r\n\r\n"
+                   b"4\r\nGET \r\n0\r\n\r\n")
+        no_length = b"POST /encrypt HTTP/1.1\r\nHost: tes\r\n\r\n"
+        for raw, status in ((chunked, 501), (no_length, 411)):
+            with self.subTest(status=status):
+                responses, stats = self._exchange([raw, _request("GET", "/stats")], 1)
+                self.assertEqual(responses[0][0], status)
+                self.assertEqual((stats["errors"], stats["requests"]), (1, 0))
+
+    def test_06_theme_edit_reloads_and_invalidates_cache(self):
+        """Memastikan tema yang diubah saat layanan berjalan langsung dipakai dan hasil cache tema lama tidak dipakai."""
+        theme_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, theme_dir)
+        theme_path = os.path.join(theme_dir, "tema.json")
+        shutil.copy(f"data/{self.theme}.json", theme_path)
+        request = _request("POST", "/encrypt", {"text": "ABCD", "key": self.key, "mode": "headerless"})
+
+        async def scenario():
+            service = CipherService(theme_dir=theme_dir, workers=0, cache=ResultCache())
+            await service.start(port=0)
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+                writer.write(request)
+                before = (await _read_response(reader))[1]["result"]
+                with open(theme_path, encoding='utf-8') as f:
+                    data = json.load(f)
+                chunk = _mode_functions('headerless')[1](before, "A", load_codebook(theme_path))[:2]
+                data["dictionary"][chunk]["phrase"] = "Frasa anyar kanggo tes layanan"
+                with open(theme_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                stat_result = os.stat(theme_path)
+                os.utime(theme_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+                writer.write(request)
+                after = (await _read_response(reader))[1]["result"]
+                writer.close()
+                return before, after, service.stats()
+            finally:
+                await service.close()
+        before, after, stats = asyncio.run(scenario())
+        self.assertIn("Frasa anyar kanggo tes layanan", after)
+        self.assertEqual(after, _mode_functions('headerless')[0]("ABCD", self.key, load_codebook(theme_path)))
+        self.assertNotEqual(before, after)
+        self.assertEqual((stats["cache"]["hits"], stats["cache"]["invalidations"]), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
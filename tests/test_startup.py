@@ -0,0 +1,86 @@
+# tests/test_startup.py
+
+import os
+import subprocess
+import sys
+import unittest
+import main
+from src.core.backends import HAS_NUMPY, NUMPY_IMPORT_MIN_CHARS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modul berat yang tidak boleh dimuat oleh `main.py encrypt` untuk pesan pendek.
+HEAVY_MODULES = ('numpy', 'concurrent.futures.process', 'multiprocessing', 'sqlite3', 'subprocess', 'asyncio')
+# Total waktu impor (ms) perintah encrypt singkat; terukur ~25 ms, sebelumnya ~85 ms.
+IMPORT_BUDGET_MS = 60
+
+def _run_importtime(args):
+    """Menjalankan main.py dengan -X importtime; mengembalikan {modul: waktu kumulatif µs} impor tingkat atas dan semua modul."""
+    env = dict(os.environ)
+    # Bytecode perlu ditulis agar run berikutnya mengukur impor dari cache, bukan kompilasi.
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', 'main.py'] + args, cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    top_level, modules = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        if not name.startswith('  '):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, modules
+
+class TestStartup(unittest.TestCase):
+    """
+    Kelas tes untuk waktu mulai CLI: impor berat ditunda sampai dibutuhkan.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.args = ['encrypt', 'Halo dunia', '-k', 'KUNCI']
+        _run_importtime(cls.args)  # pemanasan cache bytecode
+
+    def test_01_no_heavy_imports(self):
+        """Memastikan enkripsi pesan pendek dari CLI tidak memuat NumPy, process pool, sqlite, subprocess, atau asyncio."""
+        _, modules = _run_importtime(self.args)
+        self.assertIn('src.core.engine', modules)
+        for name in HEAVY_MODULES:
+            with self.subTest(module=name):
+                self.assertNotIn(name, modules)
+
+    def test_02_import_time_budget(self):
+        """Memastikan total waktu impor perintah encrypt singkat tetap di bawah anggaran."""
+        total_ms = min(sum(_run_importtime(self.args)[0].values()) for _ in range(3)) / 1000
+        self.assertLess(total_ms, IMPORT_BUDGET_MS, f"Impor CLI butuh {total_ms:.1f} ms")
+
+    def test_03_parser_per_command(self):
+        """Memastikan parser hanya membangun argumen subcommand yang dijalankan, dan parser lengkap tetap utuh."""
+        subparsers = main.build_parser('encrypt')._subparsers._group_actions[0].choices
+        self.assertEqual(set(subparsers), set(main.COMMANDS))
+        self.assertIn('--key', subparsers['encrypt']._option_string_actions)
+        self.assertNotIn('--key', subparsers['decrypt']._option_string_actions)
+
+        parser = main.build_parser()
+        args = parser.parse_args(['decrypt', 'sandi.txt', '-k', 'K', '--range', '3:9', '--headerless'])
+        self.assertEqual((args.command, args.range, args.headerless), ('decrypt', (3, 9), True))
+        args = parser.parse_args(['serve', '--cache-entries', '10'])
+        self.assertEqual(args.cache_entries, 10)
+        args = main.build_parser('batch').parse_args(['batch', 'encrypt', 'a.txt', '-o', 'hasil', '-k', 'K'])
+        self.assertEqual(args.inputs, ['a.txt'])
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy tidak terpasang")
+    def test_04_auto_backend_loads_numpy_for_large_input(self):
+        """Memastikan backend otomatis memuat NumPy hanya untuk input besar, dengan hasil yang sama."""
+        code = (
+            "import sys\n"
+            "from src.core.backends import get_backend\n"
+            "auto, translate = get_backend('auto'), get_backend('translate')\n"
+            "for size in (1000, %d):\n"
+            "    text = ('Halo Dunia, 12! ' * (size // 16 + 1))[:size]\n"
+            "    same = auto.split_runs(text) == translate.split_runs(text)\n"
+            "    print(same, 'numpy' in sys.modules)\n"
+        ) % NUMPY_IMPORT_MIN_CHARS
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split('\n')[:2], ["True False", "True True"])
+
+if __name__ == '__main__':
+    unittest.main()
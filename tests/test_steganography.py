@@ -0,0 +1,56 @@
+# tests/test_steganography.py
+
+import unittest
+import os
+from src.core.engine import (
+    STEGO_MARKER,
+    core_encrypt,
+    encrypt_steganography,
+    decrypt_steganography,
+    load_codebook,
+    _header_to_zero_width
+)
+
+class TestSteganographyCodec(unittest.TestCase):
+    """
+    Kelas tes untuk codec steganografi v2 dan kompatibilitas dengan codec v1.
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.codebook = load_codebook(os.path.join("data", "parikan_jowo_final.json"))
+        self.text = "Ini adalah teks kompleks dengan angka 123 dan simbol 😎! " * 10
+
+    def test_01_v2_round_trip(self):
+        """Memastikan payload v2 (dengan dan tanpa kompresi) bisa didekripsi."""
+        for compress in (True, False):
+            encrypted_output = encrypt_steganography(self.text, self.key, self.codebook, compress=compress)
+            self.assertTrue(encrypted_output.endswith(STEGO_MARKER))
+            self.assertEqual(decrypt_steganography(encrypted_output, self.key, self.codebook), self.text)
+
+    def test_02_legacy_v1_still_decodes(self):
+        """Memastikan ciphertext steganografi lama (1 bit per karakter) tetap terbaca."""
+        poetic_output, header_obj = core_encrypt(self.text, self.key, self.codebook, header_version=1)
+        legacy_output = poetic_output + _header_to_zero_width(header_obj)
+        self.assertEqual(decrypt_steganography(legacy_output, self.key, self.codebook), self.text)
+
+    def test_03_payload_is_denser_than_v1(self):
+        """Memastikan payload v2 jauh lebih kecil dari payload v1."""
+        poetic_output, header_obj = core_encrypt(self.text, self.key, self.codebook, header_version=1)
+        legacy_size = len(_header_to_zero_width(header_obj).encode('utf-8'))
+        new_size = len(encrypt_steganography(self.text, self.key, self.codebook).encode('utf-8')) - len(poetic_output.encode('utf-8'))
+        self.assertLess(new_size * 10, legacy_size)
+
+    def test_04_trailing_whitespace_is_tolerated(self):
+        """Memastikan baris baru tambahan dari aplikasi chat tidak merusak payload."""
+        encrypted_output = encrypt_steganography(self.text, self.key, self.codebook) + "\n\n"
+        self.assertEqual(decrypt_steganography(encrypted_output, self.key, self.codebook), self.text)
+
+    def test_05_truncated_payload_fail(self):
+        """Memastikan payload v2 yang terpotong menghasilkan ValueError."""
+        encrypted_output = encrypt_steganography(self.text, self.key, self.codebook)
+        truncated = encrypted_output[:-40] + encrypted_output[-13:]
+        with self.assertRaises(ValueError):
+            decrypt_steganography(truncated, self.key, self.codebook)
+
+if __name__ == '__main__':
+    unittest.main()
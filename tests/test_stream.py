@@ -0,0 +1,86 @@
+# tests/test_stream.py
+
+import unittest
+import io
+import os
+import tracemalloc
+from src.core.engine import (
+    encrypt_stream,
+    decrypt_stream,
+    encrypt_headerless,
+    core_encrypt,
+    load_codebook
+)
+
+class _RepeatingReader:
+    """Objek file palsu yang menghasilkan teks berulang tanpa menyimpannya utuh."""
+    def __init__(self, unit, total):
+        self.unit = unit
+        self.remaining = total
+
+    def read(self, size):
+        size = min(size, self.remaining)
+        self.remaining -= size
+        reps = size // len(self.unit) + 1
+        return (self.unit * reps)[:size]
+
+class TestStreaming(unittest.TestCase):
+    """
+    Kelas tes untuk API enkripsi/dekripsi stream.
+    """
+    def setUp(self):
+        self.key = "RAHASIA"
+        self.theme_path = os.path.join("data", "parikan_jowo_final.json")
+        self.text = "Baris pertama, angka 42!\nBaris Kedua; ganjil z.\n" * 40
+
+    def test_01_round_trip_across_chunk_sizes(self):
+        """Memastikan fase kunci, huruf ganjil, dan posisi bait terbawa antar potongan."""
+        reference_lines = core_encrypt(self.text, self.key, load_codebook(self.theme_path))[0].split("\n")
+        reference_lines = [line for line in reference_lines if line]
+        for chunk_size in (1, 3, 17, 64, 10_000):
+            with self.subTest(chunk_size=chunk_size):
+                stream_output = "".join(encrypt_stream(io.StringIO(self.text), self.key, self.theme_path, chunk_size=chunk_size))
+                poem_lines = [line for line in stream_output.split("\n") if line and not line.startswith("---POE")]
+                self.assertEqual(poem_lines, reference_lines)
+                decrypted = "".join(decrypt_stream(io.StringIO(stream_output), self.key, self.theme_path))
+                self.assertEqual(decrypted, self.text)
+
+    def test_02_headerless_stream_matches_wrapper(self):
+        """Memastikan stream headerless menghasilkan puisi yang sama dengan encrypt_headerless."""
+        original_text = "HARUSGENAP" * 30
+        stream_output = "".join(encrypt_stream(io.StringIO(original_text), self.key, self.theme_path, chunk_size=7, headerless=True))
+        self.assertEqual(stream_output.strip(), encrypt_headerless(original_text, self.key, self.theme_path))
+        decrypted = "".join(decrypt_stream(io.StringIO(stream_output), self.key, self.theme_path, headerless=True))
+        self.assertEqual(decrypted, original_text)
+
+    def test_03_missing_stream_marker_fail(self):
+        """Memastikan input yang bukan format stream menghasilkan ValueError."""
+        with self.assertRaises(ValueError):
+            list(decrypt_stream(io.StringIO("Rembulane katon ayu\n"), self.key, self.theme_path))
+
+    def test_05_frames_follow_read_size(self):
+        """Memastikan satu bingkai dibuat per potongan baca, bukan per chunk huruf tema."""
+        total = 256 * 1024
+        stream_output = "".join(encrypt_stream(_RepeatingReader("Halo dunia! ", total), self.key, self.theme_path))
+        frame_count = stream_output.count("---POE-FRAME---")
+        self.assertLessEqual(frame_count, total // (64 * 1024) + 1)
+
+    def test_04_peak_memory_is_flat(self):
+        """Memastikan puncak memori tidak tumbuh mengikuti ukuran input."""
+        load_codebook(self.theme_path)
+        unit = "Pesan arsip yang sangat panjang, nomor 7. "
+
+        def peak_for(total):
+            tracemalloc.start()
+            for _ in encrypt_stream(_RepeatingReader(unit, total), self.key, self.theme_path, chunk_size=16 * 1024):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        small = peak_for(128 * 1024)
+        large = peak_for(1024 * 1024)
+        self.assertLess(large, small * 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_wcb.py
+
+import unittest
+import os
+import json
+import pickle
+import shutil
+import tempfile
+from src.core.engine import (
+    Codebook,
+    MappedCodebook,
+    load_codebook,
+    clear_codebook_cache,
+    compile_theme,
+    encrypt,
+    decrypt
+)
+from src.core.wcb import MEMO_SIZE, CompiledCodebook, MappedPhrases, compiled_path_for
+
+class TestCompiledCodebook(unittest.TestCase):
+    """
+    Kelas tes untuk codebook biner terkompilasi (.wcb) yang dibaca lewat mmap.
+    """
+    def setUp(self):
+        clear_codebook_cache()
+        self.key = "RAHASIA"
+        self.tmp_dir = tempfile.mkdtemp()
+        self.theme_path = os.path.join(self.tmp_dir, "tema.json")
+        shutil.copy(os.path.join("data", "parikan_jowo_alus.json"), self.theme_path)
+        self.wcb_path = compiled_path_for(self.theme_path)
+
+    def tearDown(self):
+        clear_codebook_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_01_compiled_matches_json(self):
+        """Memastikan tabel maju dan balik .wcb sama persis dengan hasil parse JSON (termasuk frasa ganda)."""
+        compile_theme(self.theme_path)
+        parsed = Codebook.from_file(self.theme_path)
+        mapped = load_codebook(self.theme_path)
+        self.assertIsInstance(mapped, MappedCodebook)
+        self.assertEqual(list(mapped.phrases), parsed.phrases)
+        self.assertEqual(dict(mapped.inverse.items()), parsed.inverse)
+        self.assertEqual(mapped.metadata, parsed.metadata)
+        self.assertIsNone(mapped.inverse.get("bukan frasa"))
+
+        text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!"
+        ciphertext = encrypt(text, self.key, mapped)
+        self.assertEqual(ciphertext, encrypt(text, self.key, parsed))
+        self.assertEqual(decrypt(ciphertext, self.key, mapped), decrypt(ciphertext, self.key, parsed))
+
+    def test_02_missing_compiled_falls_back_to_json(self):
+        """Memastikan tema tanpa file .wcb tetap dimuat dari JSON tanpa membuat .wcb."""
+        codebook = load_codebook(self.theme_path)
+        self.assertNotIsInstance(codebook, MappedCodebook)
+        self.assertFalse(os.path.exists(self.wcb_path))
+
+    def test_03_stale_compiled_is_ignored(self):
+        """Memastikan .wcb yang basi diabaikan (tidak ditulis ulang) saat dimuat, dan dibangun ulang oleh compile_theme."""
+        compile_theme(self.theme_path)
+        with open(self.theme_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["dictionary"]["AA"]["phrase"] = "Frasa baru"
+        with open(self.theme_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        stale_mtime = os.stat(self.wcb_path).st_mtime_ns
+        codebook = load_codebook(self.theme_path)
+        self.assertNotIsInstance(codebook, MappedCodebook)
+        self.assertEqual(codebook.phrases[0], "Frasa baru")
+        self.assertEqual(os.stat(self.wcb_path).st_mtime_ns, stale_mtime)
+        compiled = CompiledCodebook(self.wcb_path)
+        self.assertFalse(compiled.matches_source(os.stat(self.theme_path)))
+        compiled.close()
+
+        compile_theme(self.theme_path)
+        compiled = CompiledCodebook(self.wcb_path)
+        self.assertTrue(compiled.matches_source(os.stat(self.theme_path)))
+        self.assertEqual(compiled.phrase_list()[0], "Frasa baru")
+        compiled.close()
+
+    def test_04_mapped_codebook_pickles(self):
+        """Memastikan codebook ter-mmap bisa dikirim ke proses worker."""
+        compile_theme(self.theme_path)
+        mapped = load_codebook(self.theme_path)
+        restored = pickle.loads(pickle.dumps(mapped))
+        self.assertEqual(list(restored.phrases), list(mapped.phrases))
+
+    def test_05_corrupt_compiled_fail(self):
+        """Memastikan file .wcb yang rusak menghasilkan ValueError."""
+        with open(self.wcb_path, 'wb') as f:
+            f.write(b"BUKAN WCB" * 10)
+        with self.assertRaises(ValueError):
+            CompiledCodebook(self.wcb_path)
+
+    def test_06_lazy_phrases_and_bounded_memo(self):
+        """Memastikan frasa .wcb tidak disalin utuh ke memori dan memo pencarian tidak tumbuh tanpa batas."""
+        compile_theme(self.theme_path)
+        parsed = Codebook.from_file(self.theme_path)
+        mapped = load_codebook(self.theme_path)
+        self.assertIsInstance(mapped.phrases, MappedPhrases)
+        self.assertEqual(len(mapped.phrases), len(parsed.phrases))
+        self.assertEqual((mapped.phrases[5], mapped.phrases[-1]), (parsed.phrases[5], parsed.phrases[-1]))
+        self.assertEqual(mapped.phrases[3:6], parsed.phrases[3:6])
+        with self.assertRaises(IndexError):
+            mapped.phrases[len(parsed.phrases)]
+
+        text = "Pada suatu hari, Raja JAWA membeli 12 ekor ayam!"
+        self.assertEqual(encrypt(text, self.key, mapped), encrypt(text, self.key, parsed))
+        self.assertLessEqual(mapped.phrases._decode.cache_info().currsize, 30)
+        for i in range(MEMO_SIZE + 100):
+            self.assertIsNone(mapped.inverse.get(f"bukan frasa {i}"))
+        self.assertEqual(mapped.inverse._lookup.cache_info().currsize, MEMO_SIZE)
+        self.assertIsNone(mapped.inverse.get(["bukan", "str"]))
+
+if __name__ == '__main__':
+    unittest.main()